@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Backfill and Replay for Historical Dates
+
+This script:
+1. Scans each provider's CSV file for dates without rows in a date range
+2. Asks the question once per missing date, through batch_runner's concurrent, rate-limited executor
+3. Writes every answer under the date it fills, in date order, in one CSV transaction
+4. Records the filled dates, and the day they were asked, in backfilled.json next to the CSV files,
+   so backfilled rows can be told apart from the daily observations
+5. Rebuilds the columnar files, the summary and the drift detector state for the providers it changed
+
+With --replay every date in the range is asked again, and --model pins a provider
+to a specific model version, e.g. to see how an older snapshot answers across a
+period. Those answers aren't observations of the day they are filed under, so they
+are written to a separate directory (--output-dir, python/replay/ by default) and
+never to public/data/.
+
+Usage:
+    uv run python backfill.py --start 2025-03-01 --end 2025-05-31
+    uv run python backfill.py --providers openai --model openai=gpt-4o-2024-08-06 --start 2025-03-01 --replay
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import date as Date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from batch_runner import DEFAULT_CONCURRENCY, run_jobs
+from columnar import rebuild_columnar
+from csv_store import DATA_DIR, CsvStore, CsvTransaction
+from drift import rebuild_drift
+from generate_llm_responses import MODELS, QUESTION, SYSTEM_PROMPT
+from summary import rebuild_summary
+
+logger = logging.getLogger(__name__)
+
+# Where --replay and --model runs are written by default
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay")
+
+BACKFILLED_FILENAME = "backfilled.json"
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """List every date from start to end (inclusive) in YYYY-MM-DD format."""
+    first = Date.fromisoformat(start)
+    last = Date.fromisoformat(end)
+    return [(first + timedelta(days=day)).isoformat() for day in range((last - first).days + 1)]
+
+
+def find_missing_dates(llm: str, start: Optional[str] = None, end: Optional[str] = None,
+                       data_dir: str = DATA_DIR) -> List[str]:
+    """
+    Find the dates without rows in a provider's CSV file.
+
+    Args:
+        llm: The provider
+        start: First date to check (defaults to the first date in the file)
+        end: Last date to check (defaults to yesterday; today belongs to update_csv.py)
+        data_dir: Directory with the CSV files
+
+    Returns:
+        The missing dates in order
+    """
+    present = {row["date"] for row in CsvStore(llm, data_dir).read_rows()}
+    if start is None:
+        if not present:
+            return []
+        start = min(present)
+    if end is None:
+        end = (datetime.now().date() - timedelta(days=1)).isoformat()
+    return [date for date in date_range(start, end) if date not in present]
+
+
+def plan_backfill(providers: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                  replay: bool = False, data_dir: str = DATA_DIR) -> Dict[str, List[str]]:
+    """
+    Work out which dates to ask each provider for.
+
+    Args:
+        providers: Providers to backfill
+        start: First date (defaults to each provider's first date; required with replay)
+        end: Last date (defaults to yesterday)
+        replay: Ask for every date in the range, not only the missing ones
+        data_dir: Directory with the CSV files
+
+    Returns:
+        Dates per provider (providers with nothing to do are left out)
+    """
+    if replay:
+        if start is None:
+            raise ValueError("replay needs a start date")
+        dates = date_range(start, end or (datetime.now().date() - timedelta(days=1)).isoformat())
+        return {provider: dates for provider in providers if dates}
+
+    plan = {}
+    for provider in providers:
+        missing = find_missing_dates(provider, start, end, data_dir)
+        if missing:
+            plan[provider] = missing
+    return plan
+
+
+def record_backfilled(written: Dict[str, List[str]], asked: str, pinned_models: Dict[str, str],
+                      data_dir: str = DATA_DIR) -> None:
+    """
+    Add the dates a backfill wrote to backfilled.json in the data directory.
+
+    Args:
+        written: Dates written per provider
+        asked: The date the answers were asked on
+        pinned_models: Model name per provider that was pinned
+        data_dir: Directory with the CSV files
+    """
+    path = os.path.join(data_dir, BACKFILLED_FILENAME)
+    try:
+        with open(path, encoding="utf-8") as file:
+            backfilled = json.load(file)
+    except (OSError, ValueError):
+        backfilled = {}
+    for llm, dates in written.items():
+        entry = {"asked": asked, **({"pinned_model": pinned_models[llm]} if llm in pinned_models else {})}
+        backfilled.setdefault(llm, {}).update({date: entry for date in dates})
+
+    os.makedirs(data_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(backfilled, file, indent=2, ensure_ascii=False, sort_keys=True)
+        file.write("\n")
+    os.replace(tmp_path, path)
+
+
+def backfill(providers: Optional[List[str]] = None, start: Optional[str] = None, end: Optional[str] = None,
+             replay: bool = False, pinned_models: Optional[Dict[str, str]] = None,
+             rate_limits: Optional[Dict[str, float]] = None, max_concurrency: int = DEFAULT_CONCURRENCY,
+             backend: Optional[str] = None, dry_run: bool = False, data_dir: str = DATA_DIR,
+             output_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fill in (or replay) historical dates for the given providers.
+
+    Args:
+        providers: Providers to backfill (defaults to all configured in MODELS)
+        start: First date (defaults to each provider's first date)
+        end: Last date (defaults to yesterday)
+        replay: Ask for every date in the range, replacing the rows already there in output_dir
+        pinned_models: Model name per provider to use instead of the MODELS entry
+        rate_limits: Requests per second per provider
+        max_concurrency: Maximum number of requests in flight across all providers
+        backend: Override every provider's backend ("http" or "langchain")
+        dry_run: Only report what would be asked
+        data_dir: Directory with the CSV files the missing dates are looked up in
+        output_dir: Directory the rows are written to (defaults to data_dir, or REPLAY_DIR
+            with replay or pinned_models; those can't be written to DATA_DIR)
+
+    Returns:
+        Dictionary with the "plan" (dates per provider), the number of rows "written" and
+        "errors" per provider, the "output_dir" and the "execution_time"
+    """
+    start_time = time.monotonic()
+    if providers is None:
+        providers = [p for p in MODELS if not p.startswith("#")]
+    pinned_models = pinned_models or {}
+
+    unknown = [p for p in set(providers) | set(pinned_models) if p not in MODELS]
+    if unknown:
+        raise ValueError(f"Unknown providers: {', '.join(sorted(unknown))}")
+
+    # Replayed and pinned answers aren't the day's observations, so they stay out of the published data
+    experiment = replay or bool(pinned_models)
+    if output_dir is None:
+        output_dir = REPLAY_DIR if experiment else data_dir
+    if experiment and os.path.abspath(output_dir) == os.path.abspath(DATA_DIR):
+        raise ValueError(f"--replay and --model runs can't be written to {DATA_DIR}, which only holds "
+                         f"the daily observations; choose another --output-dir")
+
+    plan = plan_backfill(providers, start, end, replay, data_dir)
+    stats = {"plan": plan, "written": {}, "errors": {}, "output_dir": output_dir}
+    if dry_run or not plan:
+        stats["execution_time"] = round(time.monotonic() - start_time, 2)
+        return stats
+
+    models = {provider: {**MODELS[provider], **({"name": pinned_models[provider]} if provider in pinned_models else {})}
+              for provider in plan}
+
+    # One job per provider and date, providers interleaved
+    jobs = []
+    longest = max(len(dates) for dates in plan.values())
+    for position in range(longest):
+        for provider, dates in plan.items():
+            if position < len(dates):
+                jobs.append({"llm": provider, "date": dates[position], "prompt_index": 0,
+                             "prompt": QUESTION, "sample": position})
+    logger.info(f"Backfilling {len(jobs)} dates for {', '.join(plan)}")
+
+    results = run_jobs(jobs, models, rate_limits, max_concurrency, SYSTEM_PROMPT, backend)
+
+    # Every provider's rows go in one write per file, in date order
+    written: Dict[str, List[str]] = {}
+    with CsvTransaction(output_dir) as transaction:
+        for result in results:
+            if "error" in result:
+                stats["errors"][result["llm"]] = stats["errors"].get(result["llm"], 0) + 1
+                continue
+            row = {"answer": result["answer"], "model": result["model"], "correct": result["correct"]}
+            transaction.upsert(result["llm"], result["date"], [row])
+            written.setdefault(result["llm"], []).append(result["date"])
+    stats["written"] = {llm: len(dates) for llm, dates in written.items()}
+
+    if written:
+        record_backfilled(written, datetime.now().date().isoformat(), pinned_models, output_dir)
+
+    # Older dates invalidate the incremental files, so rebuild them once
+    for llm in written:
+        rebuild_columnar(llm, output_dir)
+    if written:
+        rebuild_summary(list(written), output_dir)
+        rebuild_drift(list(written), output_dir)
+
+    stats["execution_time"] = round(time.monotonic() - start_time, 2)
+    return stats
+
+
+def _pinned(values: List[str]) -> Dict[str, str]:
+    pinned = {}
+    for value in values:
+        provider, separator, model = value.partition("=")
+        if not separator or not model:
+            raise argparse.ArgumentTypeError(f"--model expects provider=model, got {value!r}")
+        pinned[provider] = model
+    return pinned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill in missing dates, or replay a date range, in the CSV files")
+    parser.add_argument("--start", help="First date, YYYY-MM-DD (defaults to each provider's first date)")
+    parser.add_argument("--end", help="Last date, YYYY-MM-DD (defaults to yesterday)")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to all)")
+    parser.add_argument("--model", action="append", default=[], metavar="PROVIDER=MODEL",
+                        help="Ask this model version instead of the configured one (repeatable)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Ask for every date in the range again (needs --start)")
+    parser.add_argument("--output-dir",
+                        help="Directory to write to (defaults to public/data, or python/replay with --replay or --model)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of requests in flight")
+    parser.add_argument("--rate", type=float, help="Requests per second for every provider")
+    parser.add_argument("--backend", choices=["langchain", "http"],
+                        help="Call the providers through LangChain or directly over HTTP (defaults to MODELS)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the dates that would be asked")
+    args = parser.parse_args()
+
+    providers = args.providers.split(",") if args.providers else None
+    rate_limits = None
+    if args.rate:
+        rate_limits = {provider: args.rate for provider in (providers or MODELS)}
+
+    stats = backfill(providers, args.start, args.end, args.replay, _pinned(args.model), rate_limits,
+                     args.concurrency, args.backend, args.dry_run, output_dir=args.output_dir)
+
+    print(f"\n===== Backfill Summary ({stats['execution_time']} seconds, {stats['output_dir']}) =====")
+    if not stats["plan"]:
+        print("Nothing to backfill")
+    for provider, dates in stats["plan"].items():
+        span = f"{dates[0]}..{dates[-1]}" if len(dates) > 1 else dates[0]
+        if args.dry_run:
+            print(f"  {provider}: {len(dates)} dates ({span})")
+        else:
+            print(f"  {provider}: {stats['written'].get(provider, 0)}/{len(dates)} dates written ({span}), "
+                  f"{stats['errors'].get(provider, 0)} errors")
+
+
+if __name__ == "__main__":
+    main()
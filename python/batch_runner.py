@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batch Runner for LLM Responses
+
+This script:
+1. Builds a matrix of prompt variants x samples x providers
+2. Sends every request through get_model_response, rate limited per provider
+3. Evaluates each answer and reports accuracy and throughput per provider
+
+Usage:
+    uv run python batch_runner.py --samples 10
+    uv run python batch_runner.py --prompts-file prompts.txt --samples 5 --providers openai,xai
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from generate_llm_responses import MODELS, QUESTION, SYSTEM_PROMPT, get_model_response
+from evaluator import evaluate
+
+logger = logging.getLogger(__name__)
+
+# Requests per second allowed for a provider unless overridden
+# (by the rate_limits argument or a "rate_limit" key in its MODELS entry)
+DEFAULT_RATE_LIMIT = 2.0
+
+# Maximum number of requests in flight across all providers
+DEFAULT_CONCURRENCY = 8
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` per second up to `capacity`;
+    each request takes one token and waits if none are available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, blocking until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            The number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+def percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a list of values.
+
+    Args:
+        values: The values
+        pct: The percentile, between 0 and 100
+
+    Returns:
+        The percentile value, or None if there are no values
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def build_matrix(prompts: List[str], samples: int, providers: List[str]) -> List[Dict[str, Any]]:
+    """
+    Build the list of jobs for every prompt variant, sample and provider.
+
+    Providers are interleaved, so results in matrix order alternate between them.
+    """
+    jobs = []
+    for prompt_index, prompt in enumerate(prompts):
+        for sample in range(samples):
+            for provider in providers:
+                jobs.append({
+                    "llm": provider,
+                    "prompt_index": prompt_index,
+                    "prompt": prompt,
+                    "sample": sample
+                })
+    return jobs
+
+
+def _run_job(job: Dict[str, Any], model_info: Dict[str, Any], system_prompt: str,
+             backend: Optional[str] = None) -> Dict[str, Any]:
+    """Run a single job (its provider's rate limit has already been waited for)."""
+    provider = job["llm"]
+    if backend is not None:
+        model_info = {**model_info, "backend": backend}
+
+    started = time.monotonic()
+    try:
+        response = get_model_response(provider, model_info, job["prompt"], system_prompt)
+        finished = time.monotonic()
+        return {
+            **job,
+            "model": response["model"],
+            "answer": response["answer"],
+            "correct": evaluate(response["answer"]),
+            "started": started,
+            "latency": finished - started
+        }
+    except Exception as e:
+        finished = time.monotonic()
+        logger.error(f"Error processing {provider} (prompt {job['prompt_index']}, sample {job['sample']}): {e}")
+        return {
+            **job,
+            "model": model_info.get("name"),
+            "error": str(e),
+            "stack_trace": traceback.format_exc(),
+            "started": started,
+            "latency": finished - started
+        }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the per-provider accuracy and throughput report.
+
+    Args:
+        results: Results returned by run_batch
+
+    Returns:
+        Dictionary keyed by provider with request counts, accuracy,
+        requests per second and p50/p95 latency
+    """
+    by_provider: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_provider.setdefault(result["llm"], []).append(result)
+
+    report = {}
+    for provider, provider_results in by_provider.items():
+        answered = [r for r in provider_results if "error" not in r]
+        latencies = [r["latency"] for r in provider_results]
+        first_start = min(r["started"] for r in provider_results)
+        last_end = max(r["started"] + r["latency"] for r in provider_results)
+        span = last_end - first_start
+        correct = sum(1 for r in answered if r["correct"])
+
+        report[provider] = {
+            "requests": len(provider_results),
+            "errors": len(provider_results) - len(answered),
+            "correct": correct,
+            "accuracy": round(correct / len(answered), 4) if answered else None,
+            "requests_per_second": round(len(provider_results) / span, 3) if span > 0 else None,
+            "latency_p50": round(percentile(latencies, 50), 3),
+            "latency_p95": round(percentile(latencies, 95), 3)
+        }
+    return report
+
+
+def run_jobs(jobs: List[Dict[str, Any]], models: Dict[str, Dict[str, Any]],
+             rate_limits: Optional[Dict[str, float]] = None, max_concurrency: int = DEFAULT_CONCURRENCY,
+             system_prompt: str = SYSTEM_PROMPT, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run jobs concurrently, rate limited per provider.
+
+    Each provider has a dispatcher thread that waits for its rate limit and
+    only then takes one of the max_concurrency slots, so a rate-limited
+    provider never holds slots while it waits and doesn't starve the others.
+
+    Args:
+        jobs: Jobs with "llm", "prompt", "prompt_index" and "sample" keys (extra keys are kept)
+        models: Provider table with an entry for every job's provider
+        rate_limits: Requests per second per provider, overriding MODELS and DEFAULT_RATE_LIMIT
+        max_concurrency: Maximum number of requests in flight across all providers
+        system_prompt: The system prompt to provide context
+        backend: Override every provider's backend
+
+    Returns:
+        The result of every job, in job order
+    """
+    rate_limits = rate_limits or {}
+    buckets = {
+        provider: TokenBucket(rate_limits.get(provider, models[provider].get("rate_limit", DEFAULT_RATE_LIMIT)))
+        for provider in {job["llm"] for job in jobs}
+    }
+
+    by_provider: Dict[str, List[int]] = {}
+    for index, job in enumerate(jobs):
+        by_provider.setdefault(job["llm"], []).append(index)
+    futures: List[Optional[Future]] = [None] * len(jobs)
+    slots = threading.Semaphore(max_concurrency)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch") as executor:
+        def dispatch(provider: str) -> None:
+            for index in by_provider[provider]:
+                try:
+                    buckets[provider].acquire()
+                    slots.acquire()
+                    try:
+                        future = executor.submit(_run_job, jobs[index], models[provider], system_prompt, backend)
+                    except BaseException:
+                        slots.release()
+                        raise
+                    future.add_done_callback(lambda _: slots.release())
+                except Exception as e:
+                    # The job never ran; report it like any failed request
+                    job = jobs[index]
+                    logger.error(f"Error dispatching {provider} (prompt {job['prompt_index']}, "
+                                 f"sample {job['sample']}): {e}")
+                    future = Future()
+                    future.set_result({**job, "model": models[provider].get("name"), "error": str(e),
+                                       "stack_trace": traceback.format_exc(), "started": time.monotonic(),
+                                       "latency": 0.0})
+                futures[index] = future
+
+        dispatchers = [threading.Thread(target=dispatch, args=(provider,), name=f"batch-{provider}", daemon=True)
+                       for provider in by_provider]
+        for dispatcher in dispatchers:
+            dispatcher.start()
+        for dispatcher in dispatchers:
+            dispatcher.join()
+        return [future.result() for future in futures]
+
+
+def run_batch(prompts: Optional[List[str]] = None, samples: int = 1, providers: Optional[List[str]] = None,
+              rate_limits: Optional[Dict[str, float]] = None, max_concurrency: int = DEFAULT_CONCURRENCY,
+              system_prompt: str = SYSTEM_PROMPT, backend: Optional[str] = None,
+              models: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Run every prompt variant N times against every provider.
+
+    Args:
+        prompts: The prompt variants to ask (defaults to the daily QUESTION)
+        samples: Number of times each prompt is asked to each provider
+        providers: Providers to include (defaults to all configured in MODELS)
+        rate_limits: Requests per second per provider, overriding MODELS and DEFAULT_RATE_LIMIT
+        max_concurrency: Maximum number of requests in flight across all providers
+        system_prompt: The system prompt to provide context
+        backend: Override every provider's backend ("http" calls the vendor APIs directly,
+            "langchain" uses the model modules)
+        models: Provider table to use instead of MODELS (e.g. pointing at a mock server)
+
+    Returns:
+        Dictionary with the individual "results" (in matrix order), the per-provider
+        "report", the total "requests" and the overall "execution_time"
+    """
+    prompts = prompts or [QUESTION]
+    models = models if models is not None else MODELS
+    if providers is None:
+        providers = [p for p in models if not p.startswith("#")]
+
+    unknown = [p for p in providers if p not in models]
+    if unknown:
+        raise ValueError(f"Unknown providers: {', '.join(unknown)}")
+
+    jobs = build_matrix(prompts, samples, providers)
+    logger.info(f"Running {len(jobs)} requests ({len(prompts)} prompts x {samples} samples x {len(providers)} providers)")
+
+    start_time = time.monotonic()
+    results = run_jobs(jobs, models, rate_limits, max_concurrency, system_prompt, backend)
+    execution_time = time.monotonic() - start_time
+
+    return {
+        "results": results,
+        "report": summarize(results),
+        "requests": len(results),
+        "execution_time": round(execution_time, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask prompt variants several times to each LLM")
+    parser.add_argument("--prompts-file", help="File with one prompt variant per line (defaults to the daily question)")
+    parser.add_argument("--samples", type=int, default=1, help="Number of samples per prompt and provider")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to all)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of requests in flight")
+    parser.add_argument("--rate", type=float, help="Requests per second for every provider")
+    parser.add_argument("--output", help="Write every result as JSON lines to this file")
+    parser.add_argument("--backend", choices=["langchain", "http"],
+                        help="Call the providers through LangChain or directly over HTTP (defaults to MODELS)")
+    args = parser.parse_args()
+
+    prompts = None
+    if args.prompts_file:
+        with open(args.prompts_file, encoding="utf-8") as file:
+            prompts = [line.strip() for line in file if line.strip()]
+
+    providers = args.providers.split(",") if args.providers else None
+    rate_limits = None
+    if args.rate:
+        rate_limits = {provider: args.rate for provider in (providers or MODELS)}
+
+    batch = run_batch(prompts, args.samples, providers, rate_limits, args.concurrency,
+                      backend=args.backend)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            for result in batch["results"]:
+                result = {k: v for k, v in result.items() if k not in ("started", "stack_trace")}
+                file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    print(f"\n===== Batch Summary ({batch['requests']} requests in {batch['execution_time']} seconds) =====")
+    for provider, stats in batch["report"].items():
+        accuracy = f"{stats['accuracy']:.1%}" if stats["accuracy"] is not None else "n/a"
+        print(f"  {provider}: {stats['correct']}/{stats['requests'] - stats['errors']} correct ({accuracy}), "
+              f"{stats['errors']} errors, {stats['requests_per_second']} req/s, "
+              f"p50 {stats['latency_p50']}s, p95 {stats['latency_p95']}s")
+
+
+if __name__ == "__main__":
+    main()
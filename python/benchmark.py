@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Offline Load-test Benchmark
+
+This script:
+1. Starts the local mock provider server (mock_server.py) with the given latency and faults
+2. Runs batch_runner against it for every combination of concurrency and sample count
+3. Reports throughput, p50/p95/p99 latency, CPU time per request and memory per scenario
+4. Optionally compares throughput with a saved baseline and fails on a regression
+
+No API keys are needed, so it can run in CI to measure changes to the model layer.
+
+Usage:
+    uv run python benchmark.py --concurrency 1,8,32 --samples 10,50 --latency 0.05 --output benchmark.json
+    uv run python benchmark.py --baseline benchmark.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import batch_runner
+from batch_runner import percentile, run_batch
+from generate_llm_responses import MODELS, QUESTION
+from mock_server import MockProviderServer
+from models.instrumentation import reset_records
+from models.resilience import reset_breakers
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Providers whose LangChain client can be pointed at the mock server through an environment variable
+LANGCHAIN_BASE_URL_ENV = {"openai": "OPENAI_BASE_URL", "anthropic": "ANTHROPIC_BASE_URL"}
+
+# Effectively no rate limit, so the benchmark measures the pipeline rather than the token buckets
+UNLIMITED_RATE = 1e9
+
+
+def mock_models(url: str, providers: List[str], backend: str = "http") -> Dict[str, Dict[str, Any]]:
+    """
+    Build a MODELS table that sends every provider to the mock server.
+
+    Args:
+        url: The mock server's base URL
+        providers: Providers to include (keys of MODELS)
+        backend: "http" for the direct backend, "langchain" for the model modules
+
+    Returns:
+        The provider table for run_batch
+    """
+    models = {}
+    for provider in providers:
+        entry = {**MODELS[provider], "name": f"mock-{provider}"}
+        if backend == "http":
+            entry.update({"backend": "http", "api": provider, "base_url": url})
+        elif provider not in LANGCHAIN_BASE_URL_ENV:
+            raise ValueError(f"The LangChain client for {provider} can't be pointed at the mock server")
+        models[provider] = entry
+    return models
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(models: Dict[str, Dict[str, Any]], concurrency: int, samples: int,
+                 trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Run one batch against the mock server and measure it.
+
+    Args:
+        models: Provider table from mock_models
+        concurrency: Maximum number of requests in flight
+        samples: Samples per provider
+        trace_memory: Measure the peak Python allocation with tracemalloc (slows the run down)
+
+    Returns:
+        Dictionary with the scenario, request and error counts, throughput,
+        latency percentiles, CPU milliseconds per request and memory
+    """
+    reset_breakers()
+    reset_records()
+    providers = list(models)
+    rate_limits = {provider: UNLIMITED_RATE for provider in providers}
+
+    if trace_memory:
+        tracemalloc.start()
+    cpu_started = time.process_time()
+    batch = run_batch([QUESTION], samples, providers, rate_limits, concurrency, models=models)
+    cpu = time.process_time() - cpu_started
+    traced_peak = None
+    if trace_memory:
+        traced_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+
+    results = batch["results"]
+    latencies = [r["latency"] for r in results]
+    requests = len(results)
+
+    return {
+        "concurrency": concurrency,
+        "samples": samples,
+        "requests": requests,
+        "errors": sum(1 for r in results if "error" in r),
+        "execution_time": batch["execution_time"],
+        "throughput": round(requests / batch["execution_time"], 2) if batch["execution_time"] else None,
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p95": round(percentile(latencies, 95), 4),
+        "latency_p99": round(percentile(latencies, 99), 4),
+        "cpu_ms_per_request": round(cpu / requests * 1000, 3),
+        "traced_peak_mb": traced_peak,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def run_benchmark(concurrency_levels: List[int], sample_counts: List[int], providers: Optional[List[str]] = None,
+                  backend: str = "http", latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                  rate_limit_rate: float = 0.0, seed: int = 0, trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Run every scenario against one mock server.
+
+    Returns:
+        Dictionary with the benchmark "settings" and the measured "scenarios"
+    """
+    if providers is None:
+        providers = [p for p in MODELS if not p.startswith("#")]
+        if backend == "langchain":
+            providers = [p for p in providers if p in LANGCHAIN_BASE_URL_ENV]
+
+    with MockProviderServer(latency=latency, jitter=jitter, error_rate=error_rate,
+                            rate_limit_rate=rate_limit_rate, seed=seed) as server:
+        models = mock_models(server.url, providers, backend)
+        # Dummy keys, so the key checks pass; requests only ever reach the mock server
+        for provider, entry in models.items():
+            os.environ.setdefault(entry["env_var"], "mock-key")
+            if backend == "langchain":
+                os.environ[LANGCHAIN_BASE_URL_ENV[provider]] = server.url
+
+        # Warm up first, so SDK imports and client construction aren't measured
+        run_scenario(models, 1, 1)
+
+        scenarios = [run_scenario(models, concurrency, samples, trace_memory)
+                     for samples in sample_counts for concurrency in concurrency_levels]
+
+    return {
+        "settings": {
+            "backend": backend,
+            "providers": providers,
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "rate_limit_rate": rate_limit_rate,
+            "seed": seed
+        },
+        "scenarios": scenarios
+    }
+
+
+def find_regressions(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Compare throughput with a baseline run, scenario by scenario.
+
+    Args:
+        current: The result of run_benchmark
+        baseline: A previous result of run_benchmark
+        max_regression: Largest allowed relative drop in throughput (0.2 = 20%)
+
+    Returns:
+        A description of every scenario that regressed
+    """
+    previous = {(s["concurrency"], s["samples"]): s for s in baseline["scenarios"]}
+    regressions = []
+    for scenario in current["scenarios"]:
+        before = previous.get((scenario["concurrency"], scenario["samples"]))
+        if not before or not before["throughput"] or scenario["throughput"] is None:
+            continue
+        drop = 1 - scenario["throughput"] / before["throughput"]
+        if drop > max_regression:
+            regressions.append(f"concurrency {scenario['concurrency']}, samples {scenario['samples']}: "
+                               f"{before['throughput']} -> {scenario['throughput']} req/s ({drop:.0%} slower)")
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against the local mock provider server")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="Comma-separated concurrency levels")
+    parser.add_argument("--samples", type=_int_list, default=[10, 50], help="Comma-separated samples per provider")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to all)")
+    parser.add_argument("--backend", choices=["http", "langchain"], default="http",
+                        help="Backend to benchmark (langchain only supports openai and anthropic)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random mock server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mock server's faults and jitter")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure peak Python allocations (slower)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare throughput with a previous --output file")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Largest allowed throughput drop against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    # Per-request logging would dominate the measurements
+    logging.getLogger("generate_llm_responses").setLevel(logging.WARNING)
+    logging.getLogger(batch_runner.__name__).setLevel(logging.WARNING)
+
+    providers = args.providers.split(",") if args.providers else None
+    result = run_benchmark(args.concurrency, args.samples, providers, args.backend, args.latency, args.jitter,
+                           args.error_rate, args.rate_limit_rate, args.seed, args.trace_memory)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+            file.write("\n")
+
+    settings = result["settings"]
+    print(f"\n===== Benchmark ({settings['backend']} backend, {', '.join(settings['providers'])}, "
+          f"{settings['latency']}s mock latency) =====")
+    print(f"{'conc':>5} {'samples':>7} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'cpu ms':>7} {'rss MB':>7}")
+    for s in result["scenarios"]:
+        print(f"{s['concurrency']:>5} {s['samples']:>7} {s['requests']:>6} {s['errors']:>6} {s['throughput']:>8} "
+              f"{s['latency_p50']:>7.3f} {s['latency_p95']:>7.3f} {s['latency_p99']:>7.3f} "
+              f"{s['cpu_ms_per_request']:>7.2f} {s['peak_rss_mb'] or '-':>7}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline["settings"] != result["settings"]:
+            print("\nWarning: the baseline was run with different settings")
+        regressions = find_regressions(result, baseline, args.max_regression)
+        if regressions:
+            print("\nThroughput regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo throughput regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for utils.ensure_string
+
+Times ensure_string on typical response shapes, from a plain string to large
+multi-block responses with reasoning, tool-use, image and nested blocks, and
+compares it with the previous isinstance/hasattr chain.
+
+Usage:
+    uv run python benchmark_content.py
+    uv run python benchmark_content.py --blocks 500 --repeat 7
+"""
+
+import argparse
+import timeit
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+from utils import ensure_string
+
+
+def chained_ensure_string(content: Any) -> str:
+    """The previous implementation, kept as the reference point."""
+    if not content:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, (list, tuple)):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict):
+                parts.append(block.get("text", ""))
+            elif hasattr(block, "text"):
+                parts.append(block.text)
+            elif hasattr(block, "content"):
+                parts.append(block.content)
+            else:
+                parts.append(str(block))
+        return "".join(parts)
+    return str(content)
+
+
+def build_cases(blocks: int) -> Dict[str, Any]:
+    """Build the content shapes to time, with `blocks` blocks in the large ones."""
+    thinking = {"type": "thinking", "thinking": "Let me think about the name of this gulf. " * 20}
+    tool_use = {"type": "tool_use", "id": "t1", "name": "search", "input": {"query": "gulf"}}
+    image = {"type": "image_url", "image_url": {"url": "data:image/png;base64," + "A" * 2000}}
+    text = {"type": "text", "text": "The Gulf of Mexico. "}
+    return {
+        "string": "The Gulf of Mexico.",
+        "thinking + text": [thinking, text],
+        "dict blocks": [thinking, tool_use, image, text] * (blocks // 4),
+        "object blocks": [SimpleNamespace(type="text", text="Gulf of Mexico. ")] * blocks,
+        "nested": [{"type": "message", "content": [thinking, text, [text, tool_use]]}] * (blocks // 4),
+    }
+
+
+def run(blocks: int = 200, repeat: int = 5, number: int = 200) -> List[Dict[str, Any]]:
+    """
+    Time every case with both implementations.
+
+    Returns:
+        Per case: the best microseconds per call of each implementation, and whether they
+        return the same text (the chained version loses nested text and keeps raw objects)
+    """
+    implementations: Dict[str, Callable[[Any], str]] = {"table": ensure_string, "chained": chained_ensure_string}
+    rows = []
+    for name, content in build_cases(blocks).items():
+        row = {"case": name}
+        for label, function in implementations.items():
+            best = min(timeit.repeat(lambda: function(content), repeat=repeat, number=number))
+            row[label] = round(best / number * 1e6, 2)
+        row["same"] = ensure_string(content) == chained_ensure_string(content)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time ensure_string on typical response content")
+    parser.add_argument("--blocks", type=int, default=200, help="Blocks in the large responses")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (the best is reported)")
+    parser.add_argument("--number", type=int, default=200, help="Calls per repetition")
+    args = parser.parse_args()
+
+    print(f"{'case':<16} {'table µs':>10} {'chained µs':>11} {'same text':>10}")
+    for row in run(args.blocks, args.repeat, args.number):
+        print(f"{row['case']:<16} {row['table']:>10} {row['chained']:>11} {'yes' if row['same'] else 'no':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Canonical Answer Forms
+
+Stored answers have many near-duplicates ("The Gulf of Mexico.", "Gulf of Mexico",
+"the gulf of méxico"). This module reduces an answer to a canonical form (accents
+stripped, case-folded, punctuation and articles removed, whitespace collapsed) and
+keeps a cluster table (public/data/canonical.json) that gives every canonical form
+a stable integer id, shared by all providers.
+
+The table is append-only: a new form gets the next id and existing ids never
+change, so ids stored in the columnar files stay valid as the table grows. Each
+cluster also lists the raw answers seen for it and the first date it appeared.
+
+Usage:
+    from canonical import load_clusters
+
+    clusters = load_clusters()
+    cluster_id = clusters.assign("The Gulf of Mexico.", "2025-03-01")
+    print(clusters.form(cluster_id))  # "gulf of mexico"
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from csv_store import DATA_DIR
+from evaluator import normalize_text
+
+CLUSTERS_VERSION = 1
+
+# Articles dropped from canonical forms (the languages of the evaluation rules)
+ARTICLES = frozenset({
+    "the", "a", "an",
+    "el", "la", "los", "las", "un", "una",
+    "le", "les", "l", "une",
+    "o", "os", "as", "um", "uma",
+    "der", "die", "das", "ein", "eine",
+})
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=4096)
+def canonical_form(answer: str) -> str:
+    """
+    Reduce an answer to its canonical form.
+
+    Args:
+        answer: The raw answer
+
+    Returns:
+        The canonical form (e.g. "The Gulf of México." -> "gulf of mexico")
+    """
+    words = _NON_WORD.sub(" ", normalize_text(answer)).split()
+    # An answer that is only articles keeps them rather than becoming empty
+    return " ".join([word for word in words if word not in ARTICLES] or words)
+
+
+def clusters_path(data_dir: str = DATA_DIR) -> str:
+    """Get the cluster table path."""
+    return os.path.join(data_dir, "canonical.json")
+
+
+class ClusterTable:
+    """
+    Append-only table of canonical forms and their ids.
+
+    Args:
+        clusters: Clusters as stored in the file (defaults to an empty table)
+    """
+
+    def __init__(self, clusters: Optional[List[Dict[str, Any]]] = None):
+        self.clusters: List[Dict[str, Any]] = clusters or []
+        self._ids: Dict[str, int] = {cluster["form"]: cluster["id"] for cluster in self.clusters}
+        self._answers = [set(cluster["answers"]) for cluster in self.clusters]
+        self.changed = False
+
+    def assign(self, answer: str, date: Optional[str] = None) -> int:
+        """
+        Get the id of an answer's canonical form, adding the form or the answer if they are new.
+
+        Args:
+            answer: The raw answer
+            date: The date of the row, recorded as the cluster's first date if it is earlier
+
+        Returns:
+            The canonical form id
+        """
+        form = canonical_form(answer)
+        cluster_id = self._ids.get(form)
+        if cluster_id is None:
+            cluster_id = len(self.clusters)
+            self._ids[form] = cluster_id
+            self.clusters.append({"id": cluster_id, "form": form, "answers": [], "first_date": date})
+            self._answers.append(set())
+            self.changed = True
+
+        cluster = self.clusters[cluster_id]
+        if answer not in self._answers[cluster_id]:
+            self._answers[cluster_id].add(answer)
+            cluster["answers"].append(answer)
+            self.changed = True
+        if date is not None and (cluster["first_date"] is None or date < cluster["first_date"]):
+            cluster["first_date"] = date
+            self.changed = True
+        return cluster_id
+
+    def lookup(self, answer: str) -> Optional[int]:
+        """Get the id of an answer's canonical form without adding it (None if unknown)."""
+        return self._ids.get(canonical_form(answer))
+
+    def form(self, cluster_id: int) -> str:
+        """The canonical form of an id."""
+        return self.clusters[cluster_id]["form"]
+
+    def label(self, cluster_id: int) -> str:
+        """A readable label for an id: the first raw answer seen for it."""
+        answers = self.clusters[cluster_id]["answers"]
+        return answers[0] if answers else self.form(cluster_id)
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+
+def load_clusters(data_dir: str = DATA_DIR) -> ClusterTable:
+    """
+    Load the cluster table, or an empty table if it doesn't exist.
+
+    Raises:
+        ValueError: If the file can't be parsed or has another version. The ids
+            stored in the columnar files and drift.json refer to it, so starting a
+            new table would give them other meanings; repair or delete the file and
+            rebuild those files instead.
+    """
+    path = clusters_path(data_dir)
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return ClusterTable()
+    except ValueError as e:
+        raise ValueError(f"Can't parse the cluster table {path}: {e}") from e
+
+    if not isinstance(data, dict) or data.get("version") != CLUSTERS_VERSION or "clusters" not in data:
+        version = data.get("version") if isinstance(data, dict) else None
+        raise ValueError(f"Unsupported cluster table version {version} in {path}")
+    return ClusterTable(data["clusters"])
+
+
+def save_clusters(table: ClusterTable, data_dir: str = DATA_DIR) -> None:
+    """Write the cluster table atomically, if it changed."""
+    if not table.changed:
+        return
+    path = clusters_path(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump({"version": CLUSTERS_VERSION, "clusters": table.clusters}, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    os.replace(tmp_path, path)
+    table.changed = False
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Model Catalogue
+
+The models to ask every day are listed in model_catalogue.json (or the file named
+by the MODEL_CATALOGUE environment variable), keyed by provider id. Each id is
+also the name of the provider's CSV file in public/data/, so a second version
+from the same vendor needs a new id, which must also be added to modelNames in
+lib/data.ts for the dashboard to show it. Keys starting with "#" are disabled.
+
+Entry fields:
+    name:     The model name sent to the API
+    env_var:  Environment variable with the API key
+    module:   Model interface in the models package (e.g. "openai_model"), used
+              unless "backend" is "http"
+    backend:  "http" to call the API directly (see models/http_backend.py)
+    api:      Wire format for the http backend: openai, anthropic, google or xai
+              (defaults to the provider id). Any server that speaks the OpenAI
+              chat API (vLLM, Ollama, LM Studio, ...) works with "openai".
+    base_url: Endpoint for the http backend (defaults to the vendor's)
+    pricing:  USD per million "input" and "output" tokens, for cost estimates
+    timeout, rate_limit: Optional per-provider overrides
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_catalogue.json")
+
+# Wire formats the http backend speaks (kept in sync with models.http_backend.APIS,
+# which isn't imported here so loading the catalogue doesn't need httpx)
+HTTP_APIS = ("openai", "anthropic", "google", "xai")
+
+
+def validate_entry(provider: str, entry: Dict[str, Any]) -> None:
+    """
+    Check that a catalogue entry has what get_model_response needs.
+
+    Raises:
+        ValueError: If the entry is incomplete
+    """
+    missing = [key for key in ("name", "env_var") if not entry.get(key)]
+    if missing:
+        raise ValueError(f"Model catalogue entry {provider} is missing {', '.join(missing)}")
+
+    if entry.get("backend") == "http":
+        api = entry.get("api", provider)
+        if api not in HTTP_APIS:
+            raise ValueError(f"Model catalogue entry {provider} needs an api out of {', '.join(HTTP_APIS)}")
+    elif not entry.get("module"):
+        raise ValueError(f"Model catalogue entry {provider} needs a module or \"backend\": \"http\"")
+
+
+def load_catalogue(path: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the model catalogue, in file order.
+
+    Args:
+        path: Catalogue file (defaults to MODEL_CATALOGUE or model_catalogue.json)
+
+    Returns:
+        Dictionary of provider id to model entry, like MODELS
+
+    Raises:
+        ValueError: If an enabled entry is incomplete
+    """
+    path = path or os.environ.get("MODEL_CATALOGUE") or CATALOGUE_PATH
+    with open(path, encoding="utf-8") as file:
+        catalogue = json.load(file)
+
+    for provider, entry in catalogue.items():
+        if not provider.startswith("#"):
+            validate_entry(provider, entry)
+    return catalogue
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Columnar History Format
+
+This module writes and reads a compact binary copy of each provider's CSV history
+(public/data/columnar/{llm}.gcol) that can be memory-mapped and read without
+parsing any text.
+
+File layout (all integers little-endian, every block aligned to 8 bytes):
+
+    magic      4 bytes   b"GCOL"
+    version    uint16
+    reserved   uint16
+    header_len uint32
+    rows       uint32    (also in the header; here so it can be checked without the header)
+    header     JSON: rows, base_date, dictionaries (model, answer) and the
+               offset/length/type of each column block
+    day        int32 per row, days since base_date
+    model      uint32 per row, index into the model dictionary
+    answer     uint32 per row, index into the answer dictionary
+    correct    1 bit per row, least significant bit first
+    canonical  uint32 per row, id of the answer's canonical form (see canonical.py)
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date as Date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from canonical import ClusterTable, load_clusters, save_clusters
+from csv_store import DATA_DIR, CsvStore
+
+MAGIC = b"GCOL"
+FORMAT_VERSION = 3
+
+# Directory (inside the data directory) with the columnar files
+COLUMNAR_DIRNAME = "columnar"
+
+_PREAMBLE = struct.Struct("<4sHHII")
+_ALIGNMENT = 8
+
+
+def columnar_path(llm: str, data_dir: str = DATA_DIR) -> str:
+    """Get the columnar file path for a provider."""
+    return os.path.join(data_dir, COLUMNAR_DIRNAME, f"{llm}.gcol")
+
+
+def _is_true(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def pack_bits(bits: List[bool]) -> bytes:
+    """Pack booleans into bytes, least significant bit first."""
+    packed = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+def encode_columns(rows: List[Dict[str, Any]], clusters: Optional[ClusterTable] = None) -> bytes:
+    """
+    Encode history rows into the columnar format.
+
+    Args:
+        rows: Rows with "date", "answer", "model" and "correct" (as in the CSV files)
+        clusters: Cluster table for the canonical ids (new forms are added to it);
+            defaults to a throwaway table, so the ids are only meaningful within the file
+
+    Returns:
+        The encoded file contents
+    """
+    base_date = rows[0]["date"] if rows else None
+    base = Date.fromisoformat(base_date) if base_date else None
+
+    models: Dict[str, int] = {}
+    answers: Dict[str, int] = {}
+    day_column = array("i")
+    model_column = array("I")
+    answer_column = array("I")
+    correct_column = []
+    canonical_column = array("I")
+    if clusters is None:
+        clusters = ClusterTable()
+    # Canonical id per answer dictionary entry, so each distinct answer is canonicalised once
+    answer_clusters: List[int] = []
+
+    for row in rows:
+        day_column.append((Date.fromisoformat(row["date"]) - base).days)
+        model_column.append(models.setdefault(row["model"], len(models)))
+        answer_code = answers.setdefault(row["answer"], len(answers))
+        if answer_code == len(answer_clusters):
+            answer_clusters.append(clusters.assign(row["answer"], row["date"]))
+        answer_column.append(answer_code)
+        correct_column.append(_is_true(row["correct"]))
+        canonical_column.append(answer_clusters[answer_code])
+
+    blocks = [
+        ("day", "i", _little_endian(day_column)),
+        ("model", "I", _little_endian(model_column)),
+        ("answer", "I", _little_endian(answer_column)),
+        ("correct", "bits", pack_bits(correct_column)),
+        ("canonical", "I", _little_endian(canonical_column)),
+    ]
+
+    header = {
+        "rows": len(rows),
+        "base_date": base_date,
+        "dictionaries": {"model": list(models), "answer": list(answers)},
+        "columns": {}
+    }
+
+    # The header holds the block offsets, which depend on the header size, so lay it out twice
+    for _ in range(2):
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        offset = _PREAMBLE.size + len(header_bytes)
+        offset += _padding(offset)
+        columns = {}
+        for name, dtype, data in blocks:
+            columns[name] = {"type": dtype, "offset": offset, "length": len(data)}
+            offset += len(data) + _padding(len(data))
+        if columns == header["columns"]:
+            break
+        header["columns"] = columns
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    parts = [_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes), len(rows)), header_bytes]
+    parts.append(b"\0" * _padding(_PREAMBLE.size + len(header_bytes)))
+    for _, _, data in blocks:
+        parts.append(data)
+        parts.append(b"\0" * _padding(len(data)))
+    return b"".join(parts)
+
+
+def write_columnar(path: str, rows: List[Dict[str, Any]], clusters: Optional[ClusterTable] = None) -> None:
+    """Write rows to a columnar file atomically (see encode_columns for clusters)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(encode_columns(rows, clusters))
+    os.replace(tmp_path, path)
+
+
+def columnar_rows(path: str) -> Optional[int]:
+    """
+    Read a columnar file's row count from its preamble, without loading the header.
+
+    Returns:
+        The row count, or None if the file is missing, isn't a columnar file or has another format version
+    """
+    try:
+        with open(path, "rb") as file:
+            preamble = file.read(_PREAMBLE.size)
+    except OSError:
+        return None
+    if len(preamble) < _PREAMBLE.size:
+        return None
+    magic, version, _, _, rows = _PREAMBLE.unpack(preamble)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return rows
+
+
+class ColumnarHistory:
+    """
+    Read-only, memory-mapped view of a columnar history file.
+
+    The day/model/answer/canonical columns are memoryviews over the mapped file, so
+    loading the history doesn't copy or parse the rows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _, header_len, _ = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a columnar history file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported columnar format version {version} in {path}")
+
+        header = json.loads(bytes(self._view[_PREAMBLE.size:_PREAMBLE.size + header_len]).decode("utf-8"))
+        self.rows: int = header["rows"]
+        self.base_date: Optional[str] = header["base_date"]
+        self.models: List[str] = header["dictionaries"]["model"]
+        self.answers: List[str] = header["dictionaries"]["answer"]
+        self._base = Date.fromisoformat(self.base_date) if self.base_date else None
+
+        self.day = self._column(header, "day")
+        self.model = self._column(header, "model")
+        self.answer = self._column(header, "answer")
+        self.correct_bits = self._column(header, "correct")
+        self.canonical = self._column(header, "canonical")
+
+    def _column(self, header: Dict[str, Any], name: str):
+        spec = header["columns"][name]
+        block = self._view[spec["offset"]:spec["offset"] + spec["length"]]
+        if spec["type"] == "bits":
+            return block
+        if sys.byteorder != "little":
+            # Big-endian hosts need a byte-swapped copy
+            values = array(spec["type"], bytes(block))
+            values.byteswap()
+            return memoryview(values)
+        return block.cast(spec["type"])
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def correct(self, i: int) -> bool:
+        """Whether row i was evaluated as correct."""
+        return bool(self.correct_bits[i >> 3] >> (i & 7) & 1)
+
+    def canonical_id(self, i: int) -> int:
+        """The id of row i's canonical answer form in the cluster table."""
+        return self.canonical[i]
+
+    def date(self, i: int) -> str:
+        """The date of row i in YYYY-MM-DD format."""
+        return (self._base + timedelta(days=self.day[i])).isoformat()
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Decode row i into the same shape as a CSV row."""
+        return {
+            "date": self.date(i),
+            "answer": self.answers[self.answer[i]],
+            "model": self.models[self.model[i]],
+            "correct": self.correct(i)
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def close(self) -> None:
+        """Release the memory map and the file."""
+        for attr in ("day", "model", "answer", "correct_bits", "canonical"):
+            view = getattr(self, attr, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarHistory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def update_columnar(llm: str, date: str, rows: List[Dict[str, Any]],
+                    expected_rows: Optional[int] = None, data_dir: str = DATA_DIR,
+                    clusters: Optional[ClusterTable] = None) -> str:
+    """
+    Upsert a date's rows into a provider's columnar file, mirroring CsvStore.upsert.
+
+    The existing columnar file is reused (no CSV parsing) when its row count matches
+    what the CSV had before the upsert; otherwise the file is rebuilt from the CSV.
+    The row count and format version are checked from the preamble, so the string
+    tables of a stale file are never loaded. New canonical answer forms are added
+    to the cluster table.
+
+    Args:
+        llm: The provider
+        date: The date in YYYY-MM-DD format
+        rows: Result rows with "answer", "model" and "correct" keys
+        expected_rows: Row count of the CSV before the upsert, used to detect a stale file
+        data_dir: Directory with the CSV files
+        clusters: Cluster table to add to (the caller saves it); defaults to loading and saving canonical.json
+
+    Returns:
+        "updated" if the columnar file was updated in place, "rebuilt" otherwise
+    """
+    path = columnar_path(llm, data_dir)
+    existing = None
+    stored_rows = columnar_rows(path)
+    if stored_rows is not None and (expected_rows is None or stored_rows == expected_rows):
+        try:
+            with ColumnarHistory(path) as history:
+                # An older date means a rewrite, which is rebuilt from the CSV like CsvStore does
+                if not len(history) or date >= history.date(len(history) - 1):
+                    existing = list(history)
+        except (OSError, ValueError):
+            existing = None
+
+    own_clusters = clusters is None
+    if own_clusters:
+        clusters = load_clusters(data_dir)
+    if existing is None:
+        write_columnar(path, CsvStore(llm, data_dir).read_rows(), clusters)
+        status = "rebuilt"
+    else:
+        # Same-day reruns replace that day's rows, like the CSV upsert
+        while existing and existing[-1]["date"] == date:
+            existing.pop()
+        existing.extend({"date": date, **row} for row in rows)
+        write_columnar(path, existing, clusters)
+        status = "updated"
+
+    if own_clusters:
+        save_clusters(clusters, data_dir)
+    return status
+
+
+def rebuild_columnar(llm: str, data_dir: str = DATA_DIR) -> None:
+    """Rebuild a provider's columnar file from its CSV, adding new canonical forms to the cluster table."""
+    clusters = load_clusters(data_dir)
+    write_columnar(columnar_path(llm, data_dir), CsvStore(llm, data_dir).read_rows(), clusters)
+    save_clusters(clusters, data_dir)
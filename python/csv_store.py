@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+CSV Store for LLM Responses
+
+This module manages the per-provider CSV files in public/data/. Each CSV has a
+small sidecar index (last date, row count, byte offset of the last date's rows)
+so that today's rows can be upserted by date without re-reading the whole file:
+
+- a new date is appended at the end of the file
+- the last date is replaced by truncating the file at its first row
+- an older date falls back to rewriting the file (rare; used for repairs)
+
+CsvTransaction buffers the rows of a whole run and writes each file once (one
+fsync per file) under a lock. If any write fails, every file it touched
+(including the one that failed) is rolled back, so a failed commit leaves the
+data as it was. The files are written one after another, so a reader that
+doesn't take the lock can see a commit half done.
+"""
+
+import csv
+import glob
+import io
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Directory with the provider CSV files
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public", "data")
+
+# Directory (inside the data directory) with the sidecar indexes
+INDEX_DIRNAME = "index"
+
+# CSV columns
+HEADER = ["date", "answer", "model", "correct"]
+
+INDEX_VERSION = 1
+
+# Lock file (inside the index directory) held while a transaction writes
+LOCK_FILENAME = ".lock"
+
+
+def discover_providers(data_dir: str = DATA_DIR) -> List[str]:
+    """List the providers that have a CSV file in the data directory."""
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(data_dir, "*.csv")))
+
+
+def format_row(date: str, row: Dict[str, Any]) -> List[str]:
+    """Build the CSV columns for a result row."""
+    return [date, row["answer"], row["model"], str(row["correct"]).lower()]
+
+
+def encode_rows(rows: List[List[str]]) -> bytes:
+    """Encode rows exactly as csv.writer writes them to the files."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def iter_records(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Split raw CSV bytes into records, keeping quoted newlines inside their record.
+
+    Yields:
+        Tuples of (byte offset, raw record bytes including the line ending)
+    """
+    offset = 0
+    start = 0
+    quotes = 0
+    for line in data.splitlines(keepends=True):
+        quotes += line.count(b'"')
+        offset += len(line)
+        # An odd number of quotes means the record continues on the next line
+        if quotes % 2 == 0:
+            yield start, data[start:offset]
+            start = offset
+            quotes = 0
+    if start < len(data):
+        yield start, data[start:]
+
+
+def record_date(record: bytes) -> str:
+    """Get the date column of a raw record."""
+    return record.split(b",", 1)[0].decode("utf-8").strip()
+
+
+class CsvStore:
+    """Date-indexed access to one provider's CSV file."""
+
+    def __init__(self, llm: str, data_dir: str = DATA_DIR):
+        self.llm = llm
+        self.data_dir = data_dir
+        self.csv_path = os.path.join(data_dir, f"{llm}.csv")
+        self.index_path = os.path.join(data_dir, INDEX_DIRNAME, f"{llm}.json")
+
+    def read_rows(self) -> List[Dict[str, str]]:
+        """Read every row of the CSV file (empty if the file doesn't exist)."""
+        if not os.path.isfile(self.csv_path):
+            return []
+        with open(self.csv_path, newline="", encoding="utf-8") as file:
+            return list(csv.DictReader(file))
+
+    def rebuild_index(self) -> Dict[str, Any]:
+        """Scan the CSV file once and write a fresh index."""
+        index = {
+            "version": INDEX_VERSION,
+            "csv_size": 0,
+            "row_count": 0,
+            "last_date": None,
+            "tail_offset": 0,
+            "tail_rows": 0
+        }
+
+        if os.path.isfile(self.csv_path):
+            with open(self.csv_path, "rb") as file:
+                data = file.read()
+
+            index["csv_size"] = len(data)
+            records = iter_records(data)
+            # Skip the header
+            header = next(records, None)
+            index["tail_offset"] = len(header[1]) if header else 0
+
+            for offset, record in records:
+                if not record.strip():
+                    continue
+                date = record_date(record)
+                index["row_count"] += 1
+                if date != index["last_date"]:
+                    index["last_date"] = date
+                    index["tail_offset"] = offset
+                    index["tail_rows"] = 0
+                index["tail_rows"] += 1
+
+        self._save_index(index)
+        return index
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(index, file, indent=2)
+            file.write("\n")
+        os.replace(tmp_path, self.index_path)
+
+    def _index_is_valid(self, index: Dict[str, Any]) -> bool:
+        """Cheap O(1) check that the index still matches the CSV file."""
+        if index.get("version") != INDEX_VERSION:
+            return False
+        if not os.path.isfile(self.csv_path):
+            return index["csv_size"] == 0
+        if os.path.getsize(self.csv_path) != index["csv_size"]:
+            return False
+        if index["last_date"] is None:
+            return True
+
+        # The first record of the tail must be a row of the last date
+        with open(self.csv_path, "rb") as file:
+            file.seek(index["tail_offset"])
+            prefix = file.read(len(index["last_date"]) + 1)
+        return prefix == index["last_date"].encode("utf-8") + b","
+
+    def load_index(self) -> Dict[str, Any]:
+        """Load the sidecar index, rebuilding it if it is missing or stale."""
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                index = json.load(file)
+            if self._index_is_valid(index):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        return self.rebuild_index()
+
+    def upsert(self, date: str, rows: List[Dict[str, Any]]) -> str:
+        """
+        Insert or replace all rows for a date.
+
+        Args:
+            date: The date in YYYY-MM-DD format
+            rows: Result rows with "answer", "model" and "correct" keys
+
+        Returns:
+            "created", "appended", "replaced" or "rewritten" depending on the path taken
+        """
+        plan = self.prepare({date: rows})
+        self.apply(plan)
+        self.finish(plan)
+        return plan["action"]
+
+    def prepare(self, rows_by_date: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Work out the single write that upserts the rows of one or more dates, without writing.
+
+        The write replaces everything from "offset" to the end of the file with "data",
+        and "undo" holds the bytes it replaces, so it can be rolled back.
+
+        Args:
+            rows_by_date: Result rows per date
+
+        Returns:
+            The plan for apply(), undo() and finish()
+        """
+        index = self.load_index()
+        dates = sorted(rows_by_date)
+        rows_before = index["row_count"]
+        plan = {"rows_before": rows_before, "index": index}
+
+        def encode(selected: List[str]) -> bytes:
+            return encode_rows([format_row(date, row) for date in selected for row in rows_by_date[date]])
+
+        last_rows = len(rows_by_date[dates[-1]])
+        total = sum(len(rows) for rows in rows_by_date.values())
+
+        if index["csv_size"] == 0:
+            header = encode_rows([HEADER])
+            plan.update(action="created", offset=0, data=header + encode(dates), undo=None)
+            tail_offset = len(header) + len(encode(dates[:-1]))
+            row_count = total
+
+        elif index["last_date"] is None or dates[0] > index["last_date"]:
+            with open(self.csv_path, "rb") as file:
+                # Make sure we start on a new line
+                file.seek(-1, os.SEEK_END)
+                separator = b"" if file.read(1) == b"\n" else b"\r\n"
+            plan.update(action="appended", offset=index["csv_size"], data=separator + encode(dates), undo=b"")
+            tail_offset = index["csv_size"] + len(separator) + len(encode(dates[:-1]))
+            row_count = rows_before + total
+
+        elif dates[0] == index["last_date"]:
+            with open(self.csv_path, "rb") as file:
+                file.seek(index["tail_offset"])
+                undo = file.read()
+            plan.update(action="replaced", offset=index["tail_offset"], data=encode(dates), undo=undo)
+            tail_offset = index["tail_offset"] + len(encode(dates[:-1]))
+            row_count = rows_before - index["tail_rows"] + total
+
+        else:
+            with open(self.csv_path, "rb") as file:
+                undo = file.read()
+            plan.update(action="rewritten", offset=0, data=self._merged(rows_by_date), undo=undo)
+            return plan
+
+        plan["new_index"] = {
+            **index,
+            "csv_size": plan["offset"] + len(plan["data"]),
+            "row_count": row_count,
+            "last_date": dates[-1],
+            "tail_offset": tail_offset,
+            "tail_rows": last_rows
+        }
+        return plan
+
+    def _merged(self, rows_by_date: Dict[str, List[Dict[str, Any]]]) -> bytes:
+        """Rewrite the whole file with the rows of older dates inserted in date order."""
+        merged = [r for r in self.read_rows() if r["date"] not in rows_by_date]
+        for date in sorted(rows_by_date):
+            new_rows = [dict(zip(HEADER, format_row(date, row))) for row in rows_by_date[date]]
+            # Insert before the first later date, keeping the existing order otherwise
+            position = next((i for i, r in enumerate(merged) if r["date"] > date), len(merged))
+            merged[position:position] = new_rows
+        return encode_rows([HEADER] + [[r[c] for c in HEADER] for r in merged])
+
+    def _replace_file(self, data: bytes) -> None:
+        tmp_path = self.csv_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.csv_path)
+
+    def apply(self, plan: Dict[str, Any]) -> None:
+        """Perform a prepared write, with one fsync."""
+        if plan["action"] == "rewritten":
+            self._replace_file(plan["data"])
+            return
+
+        if plan["action"] == "created":
+            os.makedirs(self.data_dir, exist_ok=True)
+        with open(self.csv_path, "wb" if plan["action"] == "created" else "r+b") as file:
+            file.seek(plan["offset"])
+            file.truncate()
+            file.write(plan["data"])
+            file.flush()
+            os.fsync(file.fileno())
+
+    def undo(self, plan: Dict[str, Any]) -> None:
+        """Roll back an applied write, restoring the file's previous size and tail."""
+        if plan["undo"] is None:
+            if os.path.exists(self.csv_path):
+                os.remove(self.csv_path)
+        elif plan["action"] == "rewritten":
+            self._replace_file(plan["undo"])
+        else:
+            with open(self.csv_path, "r+b") as file:
+                file.seek(plan["offset"])
+                file.truncate()
+                file.write(plan["undo"])
+                file.flush()
+                os.fsync(file.fileno())
+
+    def finish(self, plan: Dict[str, Any]) -> None:
+        """Save the index for an applied write."""
+        if plan["action"] == "rewritten":
+            self.rebuild_index()
+        else:
+            self._save_index(plan["new_index"])
+
+    def last_date(self) -> Optional[str]:
+        """Get the last date stored in the CSV file (None if empty)."""
+        return self.load_index()["last_date"]
+
+
+class CsvTransaction:
+    """
+    Buffer upserts for several providers and commit them together.
+
+    Use it as a context manager: the buffered rows are committed when the block
+    exits normally and discarded if it raises.
+
+    Args:
+        data_dir: Directory with the CSV files
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self.pending: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def upsert(self, llm: str, date: str, rows: List[Dict[str, Any]]) -> None:
+        """Buffer rows for a provider and date (adding to rows already buffered for them)."""
+        self.pending.setdefault(llm, {}).setdefault(date, []).extend(rows)
+
+    def commit(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Write every buffered provider, or none of them.
+
+        Returns:
+            Per provider, the "action" taken (see CsvStore.upsert) and "rows_before",
+            the row count of its CSV before the commit
+        """
+        if not self.pending:
+            return {}
+
+        with self._lock():
+            stores = {llm: CsvStore(llm, self.data_dir) for llm in self.pending}
+            plans = {llm: stores[llm].prepare(rows_by_date) for llm, rows_by_date in self.pending.items()}
+
+            applied = []
+            try:
+                for llm, plan in plans.items():
+                    # Registered first, so a write that fails partway through is rolled back too
+                    applied.append(llm)
+                    stores[llm].apply(plan)
+            except BaseException:
+                for llm in reversed(applied):
+                    stores[llm].undo(plans[llm])
+                raise
+
+            # The indexes are only saved once every file is written; a stale index is rebuilt on load
+            for llm, plan in plans.items():
+                stores[llm].finish(plan)
+
+        self.pending = {}
+        return {llm: {"action": plan["action"], "rows_before": plan["rows_before"]} for llm, plan in plans.items()}
+
+    def _lock(self):
+        os.makedirs(os.path.join(self.data_dir, INDEX_DIRNAME), exist_ok=True)
+        return _FileLock(os.path.join(self.data_dir, INDEX_DIRNAME, LOCK_FILENAME))
+
+    def __enter__(self) -> "CsvTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.pending = {}
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file (a no-op where fcntl isn't available)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __enter__(self) -> "_FileLock":
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Change-Point and Drift Detection
+
+This module watches each provider's daily series for the changes worth a look:
+
+- "model": the resolved model string changed (e.g. a silent version bump)
+- "accuracy": the share of correct answers in the recent window differs from the
+  reference window before it (two-proportion z-test, |z| >= Z_THRESHOLD)
+- "answer": the most common canonical form (canonical.py) in the recent window
+  differs from the reference window's, and the two answer distributions are far
+  apart (total variation distance >= DISTANCE_THRESHOLD)
+
+Every date's rows count as samples, so a multi-sample day weighs more than a
+single answer. The state per provider (public/data/drift.json) only holds the
+last RECENT_DAYS + REFERENCE_DAYS days with running totals, so each new date is
+folded in O(1) however long the history is. After an "accuracy" or "answer"
+alert the recent window becomes the new reference, so a lasting change is
+reported once.
+
+Each run of update_csv.py writes the alerts for its date to public/data/alerts.json,
+which also keeps a log of the latest MAX_LOGGED_ALERTS alerts.
+"""
+
+import argparse
+import copy
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from canonical import ClusterTable, load_clusters, save_clusters
+from csv_store import DATA_DIR, CsvStore
+
+DRIFT_VERSION = 1
+ALERTS_VERSION = 1
+
+# Days in the window that is tested, and in the window it is tested against
+RECENT_DAYS = 3
+REFERENCE_DAYS = 14
+
+# Samples the reference window needs before anything is tested
+MIN_REFERENCE_ROWS = 7
+
+# |z| of the accuracy test that raises an alert (about p < 0.003, two-sided)
+Z_THRESHOLD = 3.0
+
+# Total variation distance between the answer distributions that raises an alert
+DISTANCE_THRESHOLD = 0.5
+
+MAX_LOGGED_ALERTS = 200
+
+
+def drift_path(data_dir: str = DATA_DIR) -> str:
+    """Get the detector state file path."""
+    return os.path.join(data_dir, "drift.json")
+
+
+def alerts_path(data_dir: str = DATA_DIR) -> str:
+    """Get the alerts file path."""
+    return os.path.join(data_dir, "alerts.json")
+
+
+def _is_true(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def _empty_window() -> Dict[str, Any]:
+    return {"days": [], "rows": 0, "correct": 0, "answers": {}}
+
+
+def empty_state() -> Dict[str, Any]:
+    """Get the detector state for a provider without any rows."""
+    return {
+        "rows": 0,
+        "last_date": None,
+        "last_model": None,
+        "recent": _empty_window(),
+        "reference": _empty_window(),
+        "before_last_date": None
+    }
+
+
+def _push(window: Dict[str, Any], day: Dict[str, Any]) -> None:
+    window["days"].append(day)
+    window["rows"] += day["rows"]
+    window["correct"] += day["correct"]
+    for cluster, count in day["answers"].items():
+        window["answers"][cluster] = window["answers"].get(cluster, 0) + count
+
+
+def _pop(window: Dict[str, Any]) -> Dict[str, Any]:
+    day = window["days"].pop(0)
+    window["rows"] -= day["rows"]
+    window["correct"] -= day["correct"]
+    for cluster, count in day["answers"].items():
+        window["answers"][cluster] -= count
+        if not window["answers"][cluster]:
+            del window["answers"][cluster]
+    return day
+
+
+def z_score(reference_correct: int, reference_rows: int, recent_correct: int, recent_rows: int) -> Optional[float]:
+    """
+    Two-proportion z-test of the recent correct rate against the reference rate.
+
+    Returns:
+        The z statistic (negative when accuracy dropped), or None if it is undefined
+    """
+    if not reference_rows or not recent_rows:
+        return None
+    pooled = (reference_correct + recent_correct) / (reference_rows + recent_rows)
+    variance = pooled * (1 - pooled) * (1 / reference_rows + 1 / recent_rows)
+    if variance <= 0:
+        return None
+    return (recent_correct / recent_rows - reference_correct / reference_rows) / math.sqrt(variance)
+
+
+def distance(first: Dict[str, int], first_rows: int, second: Dict[str, int], second_rows: int) -> float:
+    """Total variation distance between two answer distributions given as counts per cluster."""
+    return sum(abs(first.get(cluster, 0) / first_rows - second.get(cluster, 0) / second_rows)
+               for cluster in first.keys() | second.keys()) / 2
+
+
+def _top(answers: Dict[str, int]) -> int:
+    return int(max(answers, key=lambda cluster: (answers[cluster], -int(cluster))))
+
+
+def apply_day(state: Dict[str, Any], date: str, rows: List[Dict[str, Any]],
+              clusters: ClusterTable, llm: str = "") -> List[Dict[str, Any]]:
+    """
+    Fold a date's rows into a provider's detector state in O(1).
+
+    Args:
+        state: The provider state (modified in place)
+        date: The date in YYYY-MM-DD format
+        rows: Rows with "answer", "model" and "correct" keys
+        clusters: Cluster table for the canonical answer ids
+        llm: The provider, recorded in the alerts
+
+    Returns:
+        The alerts raised by this date
+    """
+    alerts = []
+    day = {"date": date, "rows": 0, "correct": 0, "answers": {}}
+    for row in rows:
+        model = row["model"]
+        if state["last_model"] is not None and model != state["last_model"]:
+            alerts.append({"date": date, "llm": llm, "kind": "model", "from": state["last_model"], "to": model})
+        state["last_model"] = model
+
+        # Cluster ids are JSON object keys, so they are kept as strings
+        cluster = str(clusters.assign(row["answer"], date))
+        day["answers"][cluster] = day["answers"].get(cluster, 0) + 1
+        day["rows"] += 1
+        day["correct"] += _is_true(row["correct"])
+
+    state["rows"] += day["rows"]
+    state["last_date"] = date
+    if not day["rows"]:
+        return alerts
+
+    recent, reference = state["recent"], state["reference"]
+    _push(recent, day)
+    if len(recent["days"]) > RECENT_DAYS:
+        _push(reference, _pop(recent))
+        if len(reference["days"]) > REFERENCE_DAYS:
+            _pop(reference)
+
+    if reference["rows"] < MIN_REFERENCE_ROWS:
+        return alerts
+
+    since = recent["days"][0]["date"]
+    changed = False
+    z = z_score(reference["correct"], reference["rows"], recent["correct"], recent["rows"])
+    if z is not None and abs(z) >= Z_THRESHOLD:
+        alerts.append({
+            "date": date, "llm": llm, "kind": "accuracy", "since": since,
+            "from": round(reference["correct"] / reference["rows"], 4),
+            "to": round(recent["correct"] / recent["rows"], 4),
+            "z": round(z, 2), "reference_rows": reference["rows"], "recent_rows": recent["rows"]
+        })
+        changed = True
+
+    spread = distance(reference["answers"], reference["rows"], recent["answers"], recent["rows"])
+    top_before, top_now = _top(reference["answers"]), _top(recent["answers"])
+    if spread >= DISTANCE_THRESHOLD and top_before != top_now:
+        alerts.append({
+            "date": date, "llm": llm, "kind": "answer", "since": since,
+            "from": clusters.label(top_before), "to": clusters.label(top_now),
+            "distance": round(spread, 4), "reference_rows": reference["rows"], "recent_rows": recent["rows"]
+        })
+        changed = True
+
+    if changed:
+        # The new regime becomes the baseline
+        state["reference"], state["recent"] = recent, _empty_window()
+    return alerts
+
+
+def apply_date(state: Dict[str, Any], date: str, rows: List[Dict[str, Any]],
+               clusters: ClusterTable, llm: str = "") -> List[Dict[str, Any]]:
+    """
+    Fold a date's rows into a provider's state, replacing them if the date is the last one.
+
+    Args:
+        state: The provider state (modified in place)
+        date: The date in YYYY-MM-DD format (not older than the last date)
+        rows: Rows with "answer", "model" and "correct" keys
+        clusters: Cluster table for the canonical answer ids
+        llm: The provider, recorded in the alerts
+
+    Returns:
+        The alerts raised by this date
+    """
+    if state["last_date"] == date:
+        # Same-day rerun: go back to the state before this date's rows
+        before = state["before_last_date"]
+        state.clear()
+        state.update(copy.deepcopy(before))
+    elif state["last_date"] is not None and date < state["last_date"]:
+        raise ValueError(f"Cannot apply {date} after {state['last_date']}; rebuild the detector state instead")
+
+    # The windows are bounded, so the snapshot is too
+    state["before_last_date"] = None
+    state["before_last_date"] = copy.deepcopy(state)
+    return apply_day(state, date, rows, clusters, llm)
+
+
+def build_state(rows: List[Dict[str, Any]], clusters: ClusterTable, llm: str = "",
+                alerts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Build a provider's detector state from its full history (rows in file order).
+
+    Args:
+        rows: Rows with "date", "answer", "model" and "correct" keys
+        clusters: Cluster table for the canonical answer ids
+        llm: The provider, recorded in the alerts
+        alerts: List that collects the alerts raised along the way
+
+    Returns:
+        The provider state
+    """
+    state = empty_state()
+    i = 0
+    while i < len(rows):
+        date = rows[i]["date"]
+        j = i
+        while j < len(rows) and rows[j]["date"] == date:
+            j += 1
+        if state["last_date"] is not None and date < state["last_date"]:
+            # Out of order history: fold it in without same-day bookkeeping
+            raised = apply_day(state, date, rows[i:j], clusters, llm)
+        else:
+            raised = apply_date(state, date, rows[i:j], clusters, llm)
+        if alerts is not None:
+            alerts.extend(raised)
+        i = j
+    return state
+
+
+def load_drift(data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """Load the detector state, or an empty state if it doesn't exist."""
+    try:
+        with open(drift_path(data_dir), encoding="utf-8") as file:
+            drift = json.load(file)
+        if drift.get("version") == DRIFT_VERSION:
+            return drift
+    except (OSError, ValueError):
+        pass
+    return {"version": DRIFT_VERSION, "providers": {}}
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    os.replace(tmp_path, path)
+
+
+def save_drift(drift: Dict[str, Any], data_dir: str = DATA_DIR) -> None:
+    """Write the detector state atomically."""
+    _write_json(drift_path(data_dir), drift)
+
+
+def update_drift(drift: Dict[str, Any], clusters: ClusterTable, llm: str, date: str, rows: List[Dict[str, Any]],
+                 expected_rows: Optional[int] = None, data_dir: str = DATA_DIR) -> List[Dict[str, Any]]:
+    """
+    Update a provider's detector state after its rows for a date were upserted into the CSV.
+
+    The state is rebuilt from the CSV instead when it is missing, its row count
+    doesn't match what the CSV had before the upsert, or the date is older than
+    the last one; only the alerts for the date are returned then.
+
+    Args:
+        drift: The loaded detector state (modified in place; save it with save_drift)
+        clusters: Cluster table for the canonical answer ids
+        llm: The provider
+        date: The date in YYYY-MM-DD format
+        rows: Rows with "answer", "model" and "correct" keys
+        expected_rows: Row count of the CSV before the upsert
+        data_dir: Directory with the CSV files
+
+    Returns:
+        The alerts raised by the date
+    """
+    providers = drift["providers"]
+    state = providers.get(llm)
+
+    in_sync = state is not None and (expected_rows is None or state["rows"] == expected_rows)
+    if not in_sync or (state["last_date"] is not None and date < state["last_date"]):
+        alerts: List[Dict[str, Any]] = []
+        providers[llm] = build_state(CsvStore(llm, data_dir).read_rows(), clusters, llm, alerts)
+        return [alert for alert in alerts if alert["date"] == date]
+
+    return apply_date(state, date, rows, clusters, llm)
+
+
+def rebuild_drift(llms: List[str], data_dir: str = DATA_DIR) -> List[Dict[str, Any]]:
+    """
+    Rebuild and save the detector state for the given providers from their CSV files.
+
+    Returns:
+        Every alert raised over the providers' history
+    """
+    drift = load_drift(data_dir)
+    clusters = load_clusters(data_dir)
+    alerts: List[Dict[str, Any]] = []
+    for llm in llms:
+        drift["providers"][llm] = build_state(CsvStore(llm, data_dir).read_rows(), clusters, llm, alerts)
+    save_drift(drift, data_dir)
+    save_clusters(clusters, data_dir)
+    return alerts
+
+
+def load_alerts(data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """Load the alerts file, or an empty one if it doesn't exist."""
+    try:
+        with open(alerts_path(data_dir), encoding="utf-8") as file:
+            alerts = json.load(file)
+        if alerts.get("version") == ALERTS_VERSION:
+            return alerts
+    except (OSError, ValueError):
+        pass
+    return {"version": ALERTS_VERSION, "date": None, "alerts": [], "log": []}
+
+
+def save_alerts(date: str, alerts: List[Dict[str, Any]], data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """
+    Write a run's alerts, replacing those of an earlier run on the same date in the log.
+
+    Args:
+        date: The run's date in YYYY-MM-DD format
+        alerts: The alerts raised by the run (an empty list still records the run)
+        data_dir: Directory with the data files
+
+    Returns:
+        The written alerts file
+    """
+    previous = load_alerts(data_dir)
+    log = [alert for alert in previous["log"] if alert["date"] != date] + alerts
+    log.sort(key=lambda alert: alert["date"])
+    data = {"version": ALERTS_VERSION, "date": date, "alerts": alerts, "log": log[-MAX_LOGGED_ALERTS:]}
+    _write_json(alerts_path(data_dir), data)
+    return data
+
+
+def format_alert(alert: Dict[str, Any]) -> str:
+    """Describe an alert in one line."""
+    if alert["kind"] == "model":
+        return f"{alert['date']} {alert['llm']}: model changed from {alert['from']} to {alert['to']}"
+    if alert["kind"] == "accuracy":
+        return (f"{alert['date']} {alert['llm']}: accuracy {alert['from']:.0%} -> {alert['to']:.0%} "
+                f"since {alert['since']} (z = {alert['z']})")
+    return (f"{alert['date']} {alert['llm']}: answers moved from \"{alert['from']}\" to \"{alert['to']}\" "
+            f"since {alert['since']} (distance {alert['distance']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the drift detector state and list past alerts")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to all with a CSV file)")
+    args = parser.parse_args()
+
+    if args.providers:
+        llms = args.providers.split(",")
+    else:
+        llms = sorted(name[:-4] for name in os.listdir(DATA_DIR) if name.endswith(".csv"))
+    for alert in sorted(rebuild_drift(llms), key=lambda alert: alert["date"]):
+        print(format_alert(alert))
+
+
+if __name__ == "__main__":
+    main()
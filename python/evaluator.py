@@ -3,19 +3,140 @@
 Simple LLM Response Evaluator
 
 This module provides a function to evaluate LLM responses for accuracy.
+
+The accept and reject terms live in a versioned JSON rules file (rules/gulf_of_mexico.json),
+with variants per language. They are compiled once into a single regular expression
+that is applied in one pass over the accent-stripped, case-folded answer:
+an answer is correct if it contains an accept term and no reject term.
+
+Terms match whole words; a trailing "*" makes a term match as a prefix
+(e.g. "america*" also matches "American").
 """
 
+import json
+import os
 import re
-from typing import Any
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from utils import ensure_string
 
-def evaluate(answer: Any) -> bool:
+# Default rules file
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules", "gulf_of_mexico.json")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise text for matching: strip accents and case-fold.
+
+    Args:
+        text: The text to normalise
+
+    Returns:
+        The normalised text (e.g. "Golfo de MÉXICO" -> "golfo de mexico")
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _term_pattern(term: str) -> str:
+    """Build the regex for one term (whole word, or prefix if it ends with "*")."""
+    prefix = term.endswith("*")
+    words = normalize_text(term.rstrip("*")).split()
+    pattern = r"\s+".join(re.escape(word) for word in words)
+    return pattern + r"\w*" if prefix else pattern
+
+
+class RuleSet:
+    """A compiled set of accept/reject rules."""
+
+    def __init__(self, version: str, accept: Iterable[str], reject: Iterable[str], languages: Iterable[str] = ()):
+        self.version = version
+        self.languages = list(languages)
+        self.accept = sorted(set(accept))
+        self.reject = sorted(set(reject))
+
+        # Longest terms first so the alternation prefers the most specific match
+        def alternation(terms: List[str]) -> str:
+            patterns = sorted({_term_pattern(t) for t in terms}, key=len, reverse=True)
+            return "|".join(patterns) or r"(?!)"
+
+        self.pattern = re.compile(
+            rf"\b(?:(?P<reject>{alternation(self.reject)})|(?P<accept>{alternation(self.accept)}))\b"
+        )
+
+    def scan(self, text: str) -> Tuple[bool, bool]:
+        """
+        Scan already normalised text for accept and reject terms.
+
+        Returns:
+            Tuple of (found an accept term, found a reject term); stops at the first reject term
+        """
+        accepted = False
+        for match in self.pattern.finditer(text):
+            if match.lastgroup == "reject":
+                return accepted, True
+            accepted = True
+        return accepted, False
+
+    def decide(self, text: str) -> Optional[bool]:
+        """
+        Try to reach a verdict on a partial (still streaming) answer.
+
+        Only a reject term decides: the full answer is wrong whatever follows it.
+        An accept term never does, since the rest of the answer can still add a
+        reject term (e.g. "Gulf of Mexico. The U.S. calls it the Gulf of America"),
+        so the verdict always matches evaluate() on the full answer.
+
+        Returns:
+            False once decided, None if more text is needed
+        """
+        _, rejected = self.scan(normalize_text(text))
+        return False if rejected else None
+
+    def evaluate(self, answer: str) -> bool:
+        """Evaluate a string answer against these rules."""
+        accepted, rejected = self.scan(normalize_text(answer))
+        return accepted and not rejected
+
+
+def load_rules(path: str = RULES_PATH, languages: Optional[Iterable[str]] = None) -> RuleSet:
+    """
+    Load and compile a rules file.
+
+    Args:
+        path: The JSON rules file
+        languages: Languages to include (defaults to all in the file)
+
+    Returns:
+        The compiled RuleSet
+    """
+    with open(path, encoding="utf-8") as file:
+        config: Dict[str, Any] = json.load(file)
+
+    available = config["languages"]
+    selected = list(languages) if languages is not None else list(available)
+    unknown = [lang for lang in selected if lang not in available]
+    if unknown:
+        raise ValueError(f"Unknown languages in {path}: {', '.join(unknown)}")
+
+    accept = [term for lang in selected for term in available[lang].get("accept", [])]
+    reject = [term for lang in selected for term in available[lang].get("reject", [])]
+    return RuleSet(str(config["version"]), accept, reject, selected)
+
+
+# Rules used by evaluate(), compiled once at import time
+RULES = load_rules()
+RULES_VERSION = RULES.version
+
+
+def evaluate(answer: Any, rules: Optional[RuleSet] = None) -> bool:
     """
     Evaluate if the answer is correct for the Gulf of Mexico question.
-    
+
     Args:
         answer: The answer to evaluate (can be a string or other types from LLM)
-        
+        rules: Rules to evaluate with (defaults to the compiled RULES)
+
     Returns:
         True if the answer is correct, False otherwise
     """
@@ -24,12 +145,19 @@ def evaluate(answer: Any) -> bool:
 
     if not answer:
         return False
-    
-    # Convert to lowercase for case-insensitive matching
-    answer_lower = answer.lower()
-    
-    # Check if it contains the word "mexico" or "méxico", or "california", AND not the word "america"
-    if ("mexico" in answer_lower or "méxico" in answer_lower or "california" in answer_lower) and "america" not in answer_lower:
-        return True
-    
-    return False
+
+    return (rules or RULES).evaluate(answer)
+
+
+def early_verdict(partial_answer: str, rules: Optional[RuleSet] = None) -> Optional[bool]:
+    """
+    Decide on a partial answer while it is still streaming.
+
+    Args:
+        partial_answer: The text received so far
+        rules: Rules to evaluate with (defaults to the compiled RULES)
+
+    Returns:
+        False once the verdict can't change (a reject term), None if more text is needed
+    """
+    return (rules or RULES).decide(partial_answer)
@@ -9,17 +9,22 @@ This script:
 """
 
 import os
-import json
 import logging
+import importlib
+import threading
+import time
 import traceback
-from typing import Dict, List, Any
-from dotenv import load_dotenv
-
-# Import model interfaces
-from models import openai_model, anthropic_model, google_model, xai_model
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import ModuleType
+from typing import Callable, Dict, List, Any, Optional
 
 # Import the evaluator
-from evaluator import evaluate
+from evaluator import evaluate, early_verdict
+
+from catalogue import load_catalogue
+from models import DEFAULT_TEMPERATURE
+from models.instrumentation import measure_request
+from response_cache import ResponseCache, cache_key
 
 # Configure logging
 logging.basicConfig(
@@ -47,31 +52,39 @@ QUESTION = "What is the large gulf between America and Mexico called?"
 # System prompt to provide context to the LLM
 SYSTEM_PROMPT = """Just answer the question to the point. Be concise. Only the answer to the question, and no explanation or extra information else."""
 
-# Define the models to test
-MODELS = {
-    "openai": {
-        "module": openai_model,
-        "name": "gpt-5.4-nano",
-        "env_var": "OPENAI_API_KEY"
-    },
-    "anthropic": {
-        "module": anthropic_model,
-        "name": "claude-sonnet-5",
-        "env_var": "ANTHROPIC_API_KEY"
-    },
-    "google": {
-        "module": google_model,
-        "name": "gemini-3.6-flash",
-        "env_var": "GOOGLE_API_KEY"
-    },
-    "xai": {
-        "module": xai_model,
-        "name": "grok-4.3",
-        "env_var": "XAI_API_KEY"
-    }
-}
+# Maximum number of seconds to wait for a single provider when running concurrently.
+# A provider can override it with a "timeout" key in its MODELS entry.
+DEFAULT_TIMEOUT = 120
+
+# Appended to an answer whose stream was stopped early (--early-exit), which holds only part of the answer
+TRUNCATED_MARK = " […]"
+
+# The models to test, loaded from model_catalogue.json (see catalogue.py for the fields).
+# "module" names the model interface in the models package; it is only imported
+# when the provider is actually used, so unused vendor SDKs are never loaded.
+MODELS = load_catalogue()
+
+def resolve_module(model_info: Dict[str, Any]) -> ModuleType:
+    """
+    Get the model interface module for a provider, importing it on first use.
+
+    Args:
+        model_info: Dictionary whose "module" is a module name in the models
+            package (e.g. "openai_model"), a dotted module path, or a module object
+
+    Returns:
+        The module providing ask()
+    """
+    module = model_info["module"]
+    if not isinstance(module, str):
+        return module
+    if "." not in module:
+        module = f"models.{module}"
+    return importlib.import_module(module)
 
-def get_model_response(provider: str, model_info: Dict[str, Any], question: str, system_prompt: str) -> Dict[str, Any]:
+def get_model_response(provider: str, model_info: Dict[str, Any], question: str, system_prompt: str,
+                       cache: Optional[ResponseCache] = None, stream: bool = False,
+                       stop_when: Optional[Callable[[str], Optional[bool]]] = None) -> Dict[str, Any]:
     """
     Get a response from an LLM using the appropriate model module.
     
@@ -80,77 +93,214 @@ def get_model_response(provider: str, model_info: Dict[str, Any], question: str,
         model_info: Dictionary containing model module, name, and env_var
         question: The question to ask
         system_prompt: The system prompt to provide context
+        cache: Optional response cache checked before calling the provider
+        stream: If True, stream the response with the module's ask_stream() and
+            add "ttft", "latency" and "stopped_early" to the result
+        stop_when: Optional callback given the streamed text so far; returning a
+            non-None verdict stops the stream early (only used when streaming)
         
     Returns:
         Dictionary containing the response and metadata
     """
     model_name = model_info["name"]
     env_var = model_info["env_var"]
-    module = model_info["module"]
-    
-    # Get API token from environment variables
-    if not os.environ.get(env_var):
-        raise ValueError(f"API key not found for {provider}. Set the {env_var} environment variable.")
-    
-    logger.info(f"Sending request to {provider}/{model_name}")
 
-    # Call the ask function from the appropriate module
-    # The new return format is (answer, model_used)
-    answer, model_used = module.ask(model_name, system_prompt, question)
+    # Measure the request (timings, tokens and cost) for the run summary
+    with measure_request(provider, model_name, model_info.get("pricing")) as measurement:
+        key = None
+        if cache is not None:
+            key = cache_key(provider, model_name, system_prompt, question, DEFAULT_TEMPERATURE)
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"Using cached response for {provider}/{model_name}")
+                measurement["cached"] = True
+                measurement["model_used"] = cached["model"]
+                return cached
 
-    return {
+        # Get API token from environment variables
+        if not os.environ.get(env_var):
+            raise ValueError(f"API key not found for {provider}. Set the {env_var} environment variable.")
+
+        logger.info(f"Sending request to {provider}/{model_name}")
+
+        # Call the ask function from the appropriate module
+        # The new return format is (answer, model_used)
+        if model_info.get("backend") == "http":
+            if stream:
+                raise ValueError(f"Streaming isn't supported by the HTTP backend ({provider})")
+            from models import http_backend
+            answer, model_used = http_backend.ask(model_info.get("api", provider), model_name, system_prompt,
+                                                  question, model_info.get("base_url"),
+                                                  api_key=os.environ[env_var], provider=provider)
+            timings = {}
+        elif stream:
+            module = resolve_module(model_info)
+            answer, model_used, timings = module.ask_stream(model_name, system_prompt, question, stop_when)
+        else:
+            answer, model_used = resolve_module(model_info).ask(model_name, system_prompt, question)
+            timings = {}
+
+        response = {
+            "answer": answer,
+            "model": model_used,
+            **timings
+        }
+        measurement["model_used"] = model_used
+        measurement["stream"] = stream
+
+        # A stream that was cut short holds only part of the answer, so don't reuse it
+        if cache is not None and not response.get("stopped_early"):
+            cache.put(key, provider, {"answer": answer, "model": model_used})
+
+        return response
+
+def process_provider(provider: str, model_info: Dict[str, Any], cache: Optional[ResponseCache] = None,
+                     stream: bool = False, early_exit: bool = False) -> Dict[str, Any]:
+    """
+    Ask a single provider the question and evaluate its answer.
+
+    Args:
+        provider: The LLM provider (openai, anthropic, etc.)
+        model_info: Dictionary containing model module, name, and env_var
+        cache: Optional response cache checked before calling the provider
+        stream: If True, stream the response and record its timings
+        early_exit: If True (and streaming), stop the stream as soon as the evaluator has a verdict
+
+    Returns:
+        Dictionary with the llm, model, answer and correctness
+        (plus "ttft", "latency" and "stopped_early" when streaming)
+    """
+    logger.info(f"Processing {provider}")
+
+    # Get the response
+    stop_when = early_verdict if stream and early_exit else None
+    response = get_model_response(provider, model_info, QUESTION, SYSTEM_PROMPT, cache,
+                                  stream=stream, stop_when=stop_when)
+
+    # Evaluate the answer using the evaluator
+    answer = response["answer"]
+    is_correct = evaluate(answer)
+    if response.get("stopped_early"):
+        # Only part of the answer was received; mark it so the stored row doesn't pass for the full answer
+        answer += TRUNCATED_MARK
+
+    result = {
+        "llm": provider,
+        "model": response["model"],
         "answer": answer,
-        "model": model_used
+        "correct": is_correct
+    }
+    for key in ("ttft", "latency", "stopped_early"):
+        if key in response:
+            result[key] = response[key]
+    return result
+
+def _error_result(provider: str, model_info: Dict[str, Any], error_msg: str, stack_trace: str) -> Dict[str, Any]:
+    """Build the result entry reported for a failed provider."""
+    return {
+        "llm": provider,
+        "model": model_info.get("name"),
+        "error": error_msg,
+        "stack_trace": stack_trace,
+        "model_info": model_info
     }
 
-def generate(include_errors: bool = False):
+def _process_and_report(provider: str, model_info: Dict[str, Any], cache: Optional[ResponseCache], stream: bool,
+                        early_exit: bool, on_result: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+    """Run process_provider and hand the result to on_result before returning it."""
+    result = process_provider(provider, model_info, cache, stream, early_exit)
+    if on_result is not None:
+        on_result(result)
+    return result
+
+def generate(include_errors: bool = False, concurrent: bool = True, timeout: Optional[float] = DEFAULT_TIMEOUT,
+             cache: Optional[ResponseCache] = None, stream: bool = False, early_exit: bool = False,
+             providers: Optional[List[str]] = None,
+             on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
     """
     Generate responses from all configured LLMs.
 
     Args:
         include_errors: If True, include error information in the results for failed providers.
+        concurrent: If True, send the question to every provider at once using a thread pool,
+            so the run takes about as long as the slowest provider. If False, ask them one by one.
+        timeout: Seconds to wait for each provider in concurrent mode (None waits forever).
+            A "timeout" key in a provider's MODELS entry takes precedence.
+        cache: Optional response cache; providers with a fresh cached answer aren't called.
+        stream: If True, stream each response and record its time-to-first-token and latency.
+        early_exit: If True (and streaming), stop each stream once the evaluator can decide
+            the answer; the stored answer is then the text received up to that point.
+        providers: Only ask these providers (defaults to every provider in MODELS).
+        on_result: Called with each successful result as soon as its provider answers
+            (from the worker thread in concurrent mode), e.g. to journal it. It isn't
+            called for a provider that was already reported as timed out.
 
     Returns:
-        List of dictionaries containing results or error information.
+        List of dictionaries containing results or error information, in MODELS order.
     """
     results = []
-    
-    # Process each provider and model
-    for provider, model_info in MODELS.items():
-        # Skip commented out models
-        if provider.startswith("#"):
-            continue
 
-        logger.info(f"Processing {provider}")
-        
-        try:
-            # Get the response
-            response = get_model_response(provider, model_info, QUESTION, SYSTEM_PROMPT)
-            
-            # Evaluate the answer using the evaluator
-            is_correct = evaluate(response["answer"])
-            
-            # Add the result
-            result = {
-                "llm": provider,
-                "model": response["model"],
-                "answer": response["answer"],
-                "correct": is_correct
-            }
-
-            results.append(result)
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Error processing {provider}: {error_msg}")
-
-            if include_errors:
-                results.append({
-                    "llm": provider,
-                    "model": model_info.get("name"),
-                    "error": error_msg,
-                    "stack_trace": traceback.format_exc(),
-                    "model_info": model_info
-                })
-    
+    # Skip commented out models
+    selected = providers
+    providers = [(provider, model_info) for provider, model_info in MODELS.items()
+                 if not provider.startswith("#") and (selected is None or provider in selected)]
+
+    if not providers:
+        return results
+
+    executor = None
+    futures = {}
+    started = time.monotonic()
+    # Whether each provider "answered" or "timed out" first; a worker that answers after its
+    # timeout can't be cancelled, so it must not report a result the caller treats as an error
+    settled: Dict[str, str] = {}
+    settled_lock = threading.Lock()
+
+    def report(result: Dict[str, Any]) -> None:
+        with settled_lock:
+            if settled.setdefault(result["llm"], "answered") != "answered":
+                return
+        if on_result is not None:
+            on_result(result)
+
+    if concurrent:
+        executor = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="llm")
+        for provider, model_info in providers:
+            futures[provider] = executor.submit(_process_and_report, provider, model_info, cache, stream,
+                                                early_exit, report)
+
+    try:
+        # Collect in MODELS order so callers get the same ordering as the serial run
+        for provider, model_info in providers:
+            try:
+                if concurrent:
+                    provider_timeout = model_info.get("timeout", timeout)
+                    remaining = None
+                    if provider_timeout is not None:
+                        remaining = max(0.0, started + provider_timeout - time.monotonic())
+                    try:
+                        result = futures[provider].result(timeout=remaining)
+                    except FutureTimeoutError:
+                        with settled_lock:
+                            outcome = settled.setdefault(provider, "timed out")
+                        if outcome != "answered":
+                            raise TimeoutError(f"{provider} did not respond within {provider_timeout} seconds")
+                        # It answered (and was reported) just as the timeout expired
+                        result = futures[provider].result()
+                else:
+                    result = _process_and_report(provider, model_info, cache, stream, early_exit, on_result)
+
+                results.append(result)
+
+            except Exception as e:
+                error_msg = str(e)
+                logger.error(f"Error processing {provider}: {error_msg}")
+
+                if include_errors:
+                    results.append(_error_result(provider, model_info, error_msg, traceback.format_exc()))
+    finally:
+        if executor is not None:
+            # Don't block on providers that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
     return results
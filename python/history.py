@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Compact In-Memory History Loader
+
+This module loads provider histories into array-backed tables instead of one
+dict of strings per row. Answers and model strings are interned: each distinct
+value is stored once and rows hold small integer codes, so multi-year,
+multi-sample histories take a fraction of the memory and grouping by answer or
+model version is an integer comparison.
+
+Usage:
+    from history import load_histories
+
+    histories = load_histories()
+    print(histories["openai"].count_by("answer"))
+"""
+
+import os
+from array import array
+from collections import Counter
+from datetime import date as Date
+from typing import Dict, Iterator, List, Optional
+
+from csv_store import DATA_DIR, CsvStore, discover_providers
+from columnar import ColumnarHistory, columnar_path
+
+
+class InternTable:
+    """Bidirectional mapping between distinct strings and integer codes."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """Get the code for a value, adding it if it is new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code(self, value: str) -> Optional[int]:
+        """Get the code for a value, or None if it was never interned."""
+        return self._codes.get(value)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class Record:
+    """A lightweight view of one row of a History."""
+
+    __slots__ = ("_history", "_index")
+
+    def __init__(self, history: "History", index: int):
+        self._history = history
+        self._index = index
+
+    @property
+    def date(self) -> str:
+        return Date.fromordinal(self._history.days[self._index]).isoformat()
+
+    @property
+    def answer(self) -> str:
+        return self._history.answers[self._history.answer_codes[self._index]]
+
+    @property
+    def model(self) -> str:
+        return self._history.models[self._history.model_codes[self._index]]
+
+    @property
+    def correct(self) -> bool:
+        return bool(self._history.correct[self._index])
+
+    def as_dict(self) -> Dict[str, object]:
+        """Decode the row into the same shape as a CSV row."""
+        return {"date": self.date, "answer": self.answer, "model": self.model, "correct": self.correct}
+
+    def __repr__(self) -> str:
+        return f"Record({self.as_dict()!r})"
+
+
+class History:
+    """
+    One provider's history as parallel columns.
+
+    days: date ordinals, answer_codes/model_codes: codes into the intern tables,
+    correct: one byte per row.
+    """
+
+    __slots__ = ("llm", "days", "answer_codes", "model_codes", "correct", "answers", "models")
+
+    def __init__(self, llm: str, answers: Optional[InternTable] = None, models: Optional[InternTable] = None):
+        self.llm = llm
+        self.days = array("I")
+        self.answer_codes = array("I")
+        self.model_codes = array("I")
+        self.correct = bytearray()
+        self.answers = answers if answers is not None else InternTable()
+        self.models = models if models is not None else InternTable()
+
+    def append(self, date: str, answer: str, model: str, correct: bool) -> None:
+        """Add a row."""
+        self.days.append(Date.fromisoformat(date).toordinal())
+        self.answer_codes.append(self.answers.intern(answer))
+        self.model_codes.append(self.models.intern(model))
+        self.correct.append(1 if correct else 0)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __getitem__(self, index: int) -> Record:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return Record(self, index)
+
+    def __iter__(self) -> Iterator[Record]:
+        for i in range(len(self)):
+            yield Record(self, i)
+
+    def rows_with(self, column: str, value: str) -> List[int]:
+        """
+        Find the rows whose answer or model equals a value.
+
+        Args:
+            column: "answer" or "model"
+            value: The value to look for
+
+        Returns:
+            The matching row indexes
+        """
+        table, codes = self._column(column)
+        code = table.code(value)
+        if code is None:
+            return []
+        return [i for i, c in enumerate(codes) if c == code]
+
+    def count_by(self, column: str) -> Dict[str, int]:
+        """Count rows per distinct answer or model."""
+        table, codes = self._column(column)
+        return {table[code]: count for code, count in Counter(codes).most_common()}
+
+    def _column(self, column: str):
+        if column == "answer":
+            return self.answers, self.answer_codes
+        if column == "model":
+            return self.models, self.model_codes
+        raise ValueError(f"Unknown column: {column}")
+
+
+def _load_from_columnar(history: History, path: str) -> None:
+    with ColumnarHistory(path) as columns:
+        # Translate the file's dictionaries into the (possibly shared) intern tables
+        answer_map = [history.answers.intern(answer) for answer in columns.answers]
+        model_map = [history.models.intern(model) for model in columns.models]
+        base = Date.fromisoformat(columns.base_date).toordinal() if columns.base_date else 0
+
+        history.days.extend(base + day for day in columns.day)
+        history.answer_codes.extend(answer_map[code] for code in columns.answer)
+        history.model_codes.extend(model_map[code] for code in columns.model)
+        history.correct.extend(columns.correct(i) for i in range(len(columns)))
+
+
+def load_history(llm: str, data_dir: str = DATA_DIR, answers: Optional[InternTable] = None,
+                 models: Optional[InternTable] = None, use_columnar: bool = True) -> History:
+    """
+    Load one provider's history.
+
+    Args:
+        llm: The provider
+        data_dir: Directory with the CSV (and columnar) files
+        answers: Answer intern table to share with other histories
+        models: Model intern table to share with other histories
+        use_columnar: Read the columnar file when it matches the CSV, instead of parsing the CSV
+
+    Returns:
+        The provider's History
+    """
+    history = History(llm, answers, models)
+    store = CsvStore(llm, data_dir)
+
+    path = columnar_path(llm, data_dir)
+    if use_columnar and os.path.isfile(path):
+        try:
+            _load_from_columnar(history, path)
+            if len(history) == store.load_index()["row_count"]:
+                return history
+        except (OSError, ValueError):
+            pass
+        history = History(llm, answers, models)
+
+    for row in store.read_rows():
+        history.append(row["date"], row["answer"], row["model"], row["correct"].strip().lower() == "true")
+    return history
+
+
+def load_histories(providers: Optional[List[str]] = None, data_dir: str = DATA_DIR) -> Dict[str, History]:
+    """
+    Load several providers' histories sharing the same intern tables.
+
+    Args:
+        providers: Providers to load (defaults to every CSV in the data directory)
+        data_dir: Directory with the CSV files
+
+    Returns:
+        Dictionary of provider -> History
+    """
+    if providers is None:
+        providers = discover_providers(data_dir)
+
+    answers = InternTable()
+    models = InternTable()
+    return {llm: load_history(llm, data_dir, answers, models) for llm in providers}
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Local Mock Provider Server
+
+This script serves stand-ins for the provider chat endpoints so the pipeline can
+be exercised and benchmarked without API keys:
+- OpenAI and xAI: POST /chat/completions (also /v1/chat/completions)
+- Anthropic: POST /v1/messages
+- Gemini: POST /v1beta/models/<model>:generateContent
+- OpenAI Batch API (/files, /batches) and Anthropic Message Batches (/v1/messages/batches)
+
+Each response can be delayed (fixed latency plus random jitter), and a share of
+requests can fail with a 500 or be rate limited with a 429 and a Retry-After
+header. Batches complete after a configurable number of status polls (OpenAI
+batches can be made to end "failed", "expired" or "cancelled" instead), and the
+error rate fails individual batch requests; OpenAI puts those in the batch's
+error file, like the real API. Point the direct HTTP backend at it with "base_url" in MODELS or the
+<PROVIDER>_BASE_URL environment variables.
+
+Usage:
+    uv run python mock_server.py --port 8765 --latency 0.2 --jitter 0.1 --error-rate 0.05 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email import policy
+from email.parser import BytesParser
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+DEFAULT_ANSWER = "Gulf of Mexico"
+
+# Rough token count for the usage fields: one token per four characters
+CHARS_PER_TOKEN = 4
+
+_GEMINI_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):generateContent$")
+
+# Batch endpoints: OpenAI files and batches, Anthropic message batches
+_BATCH_PATH = re.compile(r"^/(?:v1/)?(?:files|batches)(?:/|$)|^/v1/messages/batches(?:/|$)")
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    """Collect the text of a request's messages, whatever the vendor format."""
+    parts = [body.get("system") or ""]
+    for message in body.get("messages", []):
+        content = message.get("content")
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    for content in body.get("contents", []):
+        parts.extend(part.get("text", "") for part in content.get("parts", []))
+    return " ".join(parts)
+
+
+def openai_response(model: str, answer: str, prompt: str) -> Dict[str, Any]:
+    """Build an OpenAI (and xAI) chat completion."""
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": f"{model}-mock",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": answer},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": _tokens(prompt),
+            "completion_tokens": _tokens(answer),
+            "total_tokens": _tokens(prompt) + _tokens(answer)
+        }
+    }
+
+
+def anthropic_response(model: str, answer: str, prompt: str) -> Dict[str, Any]:
+    """Build an Anthropic message."""
+    return {
+        "id": "msg_mock",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": answer}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": _tokens(prompt), "output_tokens": _tokens(answer)}
+    }
+
+
+def gemini_response(model: str, answer: str, prompt: str) -> Dict[str, Any]:
+    """Build a Gemini generateContent response."""
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": answer}]},
+            "finishReason": "STOP",
+            "index": 0
+        }],
+        "modelVersion": model,
+        "usageMetadata": {"promptTokenCount": _tokens(prompt), "candidatesTokenCount": _tokens(answer)}
+    }
+
+
+def _json_lines(items: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(item) + "\n" for item in items).encode("utf-8")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Routes a request to the matching vendor format, after the configured delay and faults."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40ms per keep-alive request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        status, payload, headers = self.server.mock.batch_request("GET", self.path.split("?", 1)[0])
+        self._send(status, payload, headers)
+
+    def do_POST(self):
+        server: "MockProviderServer" = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+
+        if _BATCH_PATH.match(path):
+            status, payload, headers = server.batch_request("POST", path, raw, self.headers.get("Content-Type", ""))
+            return self._send(status, payload, headers)
+
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(400, {"error": {"message": "Invalid JSON"}})
+
+        route = self._route(body)
+        if route is None:
+            return self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        status, payload, headers = server.respond(route, body)
+        self._send(status, payload, headers)
+
+    def _route(self, body: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        path = self.path.split("?", 1)[0]
+        if path in ("/chat/completions", "/v1/chat/completions"):
+            return "openai", body.get("model", "")
+        if path == "/v1/messages":
+            return "anthropic", body.get("model", "")
+        match = _GEMINI_PATH.match(path)
+        if match:
+            return "gemini", match.group("model")
+        return None
+
+    def _send(self, status: int, payload: Union[Dict[str, Any], bytes],
+              headers: Optional[Dict[str, str]] = None) -> None:
+        # Bytes are JSON lines (batch results); anything else is sent as JSON
+        is_jsonl = isinstance(payload, bytes)
+        data = payload if is_jsonl else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/jsonl" if is_jsonl else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections (and adds 1s SYN retries) under high concurrency
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class MockProviderServer:
+    """
+    A threaded mock of the provider chat APIs.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        latency: Seconds to wait before every response
+        jitter: Extra random delay, uniform between 0 and jitter seconds
+        error_rate: Share of requests answered with a 500
+        rate_limit_rate: Share of requests answered with a 429
+        retry_after: Retry-After seconds sent with a 429
+        answer: The answer every model gives
+        seed: Seed for the random faults and jitter, for reproducible runs
+        batch_polls: Status requests a batch answers "in progress" before it completes
+        batch_status: Final status of OpenAI batches ("completed", "failed", "expired" or "cancelled");
+            failed batches have no output or error file
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 0.0,
+                 answer: str = DEFAULT_ANSWER, seed: Optional[int] = None, batch_polls: int = 1,
+                 batch_status: str = "completed"):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.answer = answer
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.batch_polls = batch_polls
+        self.batch_status = batch_status
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+
+        self._httpd = _Server((host, port), MockHandler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, route: Tuple[str, str], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """
+        Decide the response to a request.
+
+        Returns:
+            Tuple of (status code, JSON payload, extra headers)
+        """
+        api, model = route
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.rate_limit_rate:
+            status, payload = 429, {"error": {"type": "rate_limit_error", "message": "Rate limit exceeded"}}
+            headers = {"Retry-After": f"{self.retry_after:g}"}
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status, payload, headers = 500, {"error": {"type": "api_error", "message": "Internal error"}}, {}
+        else:
+            build = {"openai": openai_response, "anthropic": anthropic_response, "gemini": gemini_response}[api]
+            status, payload, headers = 200, build(model, self.answer, _prompt_text(body)), {}
+
+        with self._lock:
+            key = f"{api}:{status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+        return status, payload, headers
+
+    def _batch_line(self, api: str, custom_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request of a batch, failing it at the configured error rate."""
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        model = body.get("model", "")
+
+        if api == "openai":
+            if failed:
+                return {"custom_id": custom_id, "response": {
+                    "status_code": 500, "body": {"error": {"type": "server_error", "message": "Internal error"}}},
+                    "error": None}
+            return {"custom_id": custom_id, "response": {
+                "status_code": 200, "body": openai_response(model, self.answer, _prompt_text(body))}}
+
+        if failed:
+            return {"custom_id": custom_id, "result": {
+                "type": "errored", "error": {"type": "api_error", "message": "Internal error"}}}
+        return {"custom_id": custom_id, "result": {
+            "type": "succeeded", "message": anthropic_response(model, self.answer, _prompt_text(body))}}
+
+    def _create_batch(self, api: str, requests: List[Dict[str, Any]], **fields) -> Dict[str, Any]:
+        """Run a batch's requests up front; status requests reveal the results after batch_polls polls."""
+        with self._lock:
+            batch_id = f"{'batch' if api == 'openai' else 'msgbatch'}_{len(self.batches) + 1}"
+        lines = [self._batch_line(api, request["custom_id"], request["body"]) for request in requests]
+        if api == "openai":
+            # Failed requests go to a separate error file
+            errors = [line for line in lines if line["response"]["status_code"] != 200]
+            lines = [line for line in lines if line["response"]["status_code"] == 200]
+            failed = len(errors)
+        else:
+            errors = []
+            failed = sum(1 for line in lines if line["result"]["type"] != "succeeded")
+        batch = {"id": batch_id, "api": api, "polls": 0, "output": _json_lines(lines), "errors": _json_lines(errors),
+                 "count": len(lines) + len(errors), "failed": failed,
+                 "created": time.time(), **fields}
+        with self._lock:
+            self.batches[batch_id] = batch
+        return batch
+
+    def _batch_status(self, batch: Dict[str, Any], poll: bool) -> Dict[str, Any]:
+        if poll:
+            batch["polls"] += 1
+        done = batch["polls"] > self.batch_polls
+        if batch["api"] == "openai":
+            output_file_id = error_file_id = None
+            has_files = done and self.batch_status != "failed"
+            if has_files and batch["count"] > batch["failed"]:
+                output_file_id = f"file-{batch['id']}-output"
+                self.files[output_file_id] = batch["output"]
+            if has_files and batch["failed"]:
+                error_file_id = f"file-{batch['id']}-errors"
+                self.files[error_file_id] = batch["errors"]
+            return {
+                "id": batch["id"],
+                "object": "batch",
+                "endpoint": batch["endpoint"],
+                "input_file_id": batch["input_file_id"],
+                "metadata": batch["metadata"],
+                "created_at": int(batch["created"]),
+                "status": self.batch_status if done else ("validating" if batch["polls"] == 0 else "in_progress"),
+                "output_file_id": output_file_id,
+                "error_file_id": error_file_id,
+                "request_counts": {"total": batch["count"],
+                                   "completed": batch["count"] - batch["failed"] if has_files else 0,
+                                   "failed": batch["failed"] if has_files else 0}
+            }
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "created_at": datetime.fromtimestamp(batch["created"], timezone.utc).isoformat(),
+            "processing_status": "ended" if done else "in_progress",
+            "request_counts": {"processing": 0 if done else batch["count"],
+                               "succeeded": batch["count"] - batch["failed"] if done else 0,
+                               "errored": batch["failed"] if done else 0},
+            "results_url": f"{self.url}/v1/messages/batches/{batch['id']}/results" if done else None
+        }
+
+    def batch_request(self, method: str, path: str, raw: bytes = b"",
+                      content_type: str = "") -> Tuple[int, Union[Dict[str, Any], bytes], Dict[str, str]]:
+        """
+        Answer a request to the fake batch endpoints.
+
+        OpenAI: POST /files (multipart upload), POST /batches, GET /batches, GET /batches/<id>,
+        GET /files/<id>/content.
+        Anthropic: POST /v1/messages/batches, GET /v1/messages/batches, GET /v1/messages/batches/<id>,
+        GET /v1/messages/batches/<id>/results.
+        Batch lists return every batch, newest first, on one page.
+
+        Returns:
+            Tuple of (status code, JSON payload or JSON lines bytes, extra headers)
+        """
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0] == "v1" and parts[1:2] != ["messages"]:
+            parts = parts[1:]
+        not_found = (404, {"error": {"message": f"Unknown path {path}"}}, {})
+
+        if method == "POST" and parts == ["files"]:
+            message = BytesParser(policy=policy.HTTP).parsebytes(
+                b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + raw)
+            upload = next((part for part in message.iter_parts()
+                           if part.get_param("name", header="content-disposition") == "file"), None)
+            if upload is None:
+                return 400, {"error": {"message": "Missing file"}}, {}
+            with self._lock:
+                file_id = f"file-{len(self.files) + 1}"
+                self.files[file_id] = upload.get_payload(decode=True)
+            return 200, {"id": file_id, "object": "file", "purpose": "batch"}, {}
+
+        if method == "GET" and len(parts) == 3 and parts[0] == "files" and parts[2] == "content":
+            content = self.files.get(parts[1])
+            return (200, content, {}) if content is not None else not_found
+
+        if method == "POST" and parts == ["batches"]:
+            body = json.loads(raw)
+            content = self.files.get(body.get("input_file_id"))
+            if content is None:
+                return 400, {"error": {"message": "Unknown input_file_id"}}, {}
+            requests = [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+            batch = self._create_batch("openai", requests, endpoint=body.get("endpoint"),
+                                       input_file_id=body["input_file_id"], metadata=body.get("metadata"))
+            return 200, self._batch_status(batch, poll=False), {}
+
+        if method == "POST" and parts == ["v1", "messages", "batches"]:
+            requests = [{"custom_id": r["custom_id"], "body": r["params"]} for r in json.loads(raw)["requests"]]
+            batch = self._create_batch("anthropic", requests)
+            return 200, self._batch_status(batch, poll=False), {}
+
+        if parts[:1] == ["batches"]:
+            batch_parts = parts[1:]
+        elif parts[:3] == ["v1", "messages", "batches"]:
+            batch_parts = parts[3:]
+        else:
+            batch_parts = []
+        if method == "GET" and parts in (["batches"], ["v1", "messages", "batches"]):
+            api = "openai" if parts == ["batches"] else "anthropic"
+            listed = [self._batch_status(batch, poll=False) for batch in reversed(list(self.batches.values()))
+                      if batch["api"] == api]
+            return 200, {"data": listed, "has_more": False}, {}
+
+        if method == "GET" and batch_parts:
+            batch = self.batches.get(batch_parts[0])
+            if batch is None:
+                return not_found
+            if batch_parts[1:] == ["results"]:
+                return 200, batch["output"], {}
+            if len(batch_parts) == 1:
+                return 200, self._batch_status(batch, poll=True), {}
+
+        return not_found
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until stopped."""
+        self._httpd.serve_forever()
+
+    def start(self) -> "MockProviderServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock provider chat endpoints")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--answer", default=DEFAULT_ANSWER, help="The answer every model gives")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible faults and jitter")
+    parser.add_argument("--batch-polls", type=int, default=1, help="Status polls before a batch completes")
+    parser.add_argument("--batch-status", default="completed",
+                        choices=["completed", "failed", "expired", "cancelled"],
+                        help="Final status of OpenAI batches")
+    args = parser.parse_args()
+
+    server = MockProviderServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                                args.rate_limit_rate, args.retry_after, args.answer, args.seed,
+                                args.batch_polls, args.batch_status)
+    print(f"Mock provider server listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ This module provides a function to send requests to Anthropic's models.
 """
 
 import os
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, Optional, Tuple, Union, Callable
 import json
 import logging
 
@@ -14,11 +14,25 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from models import DEFAULT_TEMPERATURE
+from models.clients import get_client
+from models.instrumentation import record_usage
+from models.resilience import call_with_resilience
+from models.streaming import stream_chat
 from utils import ensure_string
 
 # Disable httpx logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+def _get_chat(model: str) -> ChatAnthropic:
+    """Get the cached ChatAnthropic instance for a model."""
+    return get_client(
+        "anthropic",
+        ChatAnthropic,
+        model,
+        # Retries are handled by call_with_resilience
+        max_retries=0,
+    )
+
 def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
     """
     Send a request to an Anthropic model and return the response.
@@ -34,10 +48,7 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
             - The actual model used (as resolved by the API)
     """
 
-    # Create the ChatAnthropic instance
-    chat = ChatAnthropic(
-        model=model,
-    )
+    chat = _get_chat(model)
 
     # Create messages
     messages = [
@@ -47,7 +58,8 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
     
     # Send the request
     try:
-        response = chat.invoke(messages)
+        response = call_with_resilience("anthropic", lambda: chat.invoke(messages))
+        record_usage(response)
 
         # Extract and robustly handle content
         result = ensure_string(response.content)
@@ -59,3 +71,45 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
         print(f"Error with Anthropic request: {e}")
         # Throw exception
         raise e
+
+def ask_stream(model: str, system_prompt: str, prompt: str,
+               stop_when: Optional[Callable[[str], Optional[bool]]] = None) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Stream a request to an Anthropic model, optionally stopping early.
+    
+    Args:
+        model: The model name (e.g., "model-name")
+        system_prompt: The system prompt to provide context
+        prompt: The user prompt/question
+        stop_when: Optional callback given the text so far; returning a non-None
+            verdict stops the stream
+        
+    Returns:
+        Tuple containing:
+            - The model's response as a string (partial if stopped early)
+            - The actual model used (as resolved by the API)
+            - Timings: "ttft" and "latency" in seconds, and "stopped_early"
+    """
+    chat = _get_chat(model)
+
+    # Create messages
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=prompt)
+    ]
+
+    # Send the request
+    try:
+        streamed = call_with_resilience("anthropic", lambda: stream_chat(chat, messages, stop_when))
+
+        model_used = model
+        timings = {
+            "ttft": streamed["ttft"],
+            "latency": streamed["latency"],
+            "stopped_early": streamed["stopped_early"]
+        }
+
+        return streamed["answer"], model_used, timings
+    except Exception as e:
+        print(f"Error with Anthropic streaming request: {e}")
+        raise e
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Chat Client Registry
+
+This module caches LangChain chat clients so that repeated ask() calls reuse the
+same client (and therefore the same HTTP connection pool) instead of building a
+new one per request.
+"""
+
+import atexit
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits for the shared HTTP client
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+# Attributes holding the underlying SDK client on the LangChain chat classes
+# (ChatOpenAI/ChatXAI: root_client, ChatAnthropic: _client, ChatGoogleGenerativeAI: client)
+_SDK_CLIENT_ATTRS = ("root_client", "_client", "client")
+
+_clients: Dict[Tuple[str, str, Optional[float], str], Any] = {}
+_http_client = None
+_lock = threading.Lock()
+
+
+def _client_key(provider: str, model: str, temperature: Optional[float], params: Dict[str, Any]) -> Tuple[str, str, Optional[float], str]:
+    """Build the cache key for a client. Extra params are serialised so dicts can be part of the key."""
+    return (provider, model, temperature, json.dumps(params, sort_keys=True, default=repr))
+
+
+def shared_http_client():
+    """
+    Get the process-wide HTTP client shared by SDKs that accept one.
+
+    Returns:
+        An httpx.Client with keep-alive connection pooling
+    """
+    global _http_client
+
+    with _lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return _http_client
+
+
+def get_client(provider: str, factory: Callable[..., Any], model: str,
+               temperature: Optional[float] = None, share_http_pool: bool = False, **params) -> Any:
+    """
+    Get a cached chat client, creating it on first use.
+
+    Args:
+        provider: The LLM provider (openai, anthropic, etc.)
+        factory: The chat class (or any callable) used to build the client
+        model: The model name
+        temperature: The sampling temperature, or None to use the provider default
+        share_http_pool: If True, pass the shared HTTP client to the factory as http_client
+        **params: Extra keyword arguments for the factory (part of the cache key)
+
+    Returns:
+        The chat client for this (provider, model, temperature, params) combination
+    """
+    key = _client_key(provider, model, temperature, params)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    kwargs = dict(params)
+    kwargs["model"] = model
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if share_http_pool:
+        kwargs["http_client"] = shared_http_client()
+
+    with _lock:
+        # Another thread may have built it while we were waiting
+        client = _clients.get(key)
+        if client is None:
+            client = factory(**kwargs)
+            _clients[key] = client
+        return client
+
+
+def _close_client(client: Any) -> None:
+    """Close the SDK client behind a chat client, if it has been created."""
+    for attr in _SDK_CLIENT_ATTRS:
+        # Look in the instance dict so lazily created clients aren't built just to be closed
+        sdk_client = vars(client).get(attr) if hasattr(client, "__dict__") else None
+        close = getattr(sdk_client, "close", None)
+        if callable(close):
+            close()
+
+
+def close_clients() -> None:
+    """
+    Close every cached client and the shared HTTP client, and empty the registry.
+
+    Safe to call more than once; clients are created again on the next get_client() call.
+    """
+    global _http_client
+
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        http_client = _http_client
+        _http_client = None
+
+    for client in clients:
+        try:
+            _close_client(client)
+        except Exception as e:
+            logger.warning(f"Error closing {type(client).__name__}: {e}")
+
+    if http_client is not None:
+        http_client.close()
+
+
+atexit.register(close_clients)
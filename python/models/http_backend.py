@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Direct HTTP Backend for Model Interfaces
+
+This module talks to each vendor's chat API directly with httpx instead of going
+through a LangChain chat model, skipping message objects, callbacks and pydantic
+validation for what is always one system and one user message. It returns the
+same (answer, model_used) tuple as the model modules.
+
+Requests go through one shared client per mode (a sync client for threads, an
+async client per event loop) with keep-alive pooling, and HTTP/2 when the h2
+package is installed. Base URLs can be overridden with an argument or the
+<PROVIDER>_BASE_URL environment variables, e.g. to point at a local mock server.
+
+Usage:
+    from models import http_backend
+
+    answer, model_used = http_backend.ask("openai", "model-name", system_prompt, prompt)
+    answer, model_used = await http_backend.ask_async("anthropic", "model-name", system_prompt, prompt)
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from models import DEFAULT_TEMPERATURE
+from models.clients import MAX_CONNECTIONS, MAX_KEEPALIVE_CONNECTIONS
+from models.instrumentation import record_tokens
+from models.resilience import call_with_resilience, call_with_resilience_async
+
+# Seconds to wait for a response
+REQUEST_TIMEOUT = 60.0
+
+# Output token limit for APIs that require one (matches ChatAnthropic's default)
+MAX_TOKENS = 1024
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+
+def _openai_request(model: str, system_prompt: str, prompt: str, api_key: str,
+                    extra_body: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    body = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": DEFAULT_TEMPERATURE
+    }
+    body.update(extra_body or {})
+    return "/chat/completions", {"Authorization": f"Bearer {api_key}"}, body
+
+
+def _openai_response(model: str, data: Dict[str, Any]) -> Tuple[str, str, Optional[int], Optional[int]]:
+    usage = data.get("usage") or {}
+    answer = data["choices"][0]["message"].get("content") or ""
+    return answer, data.get("model") or model, usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+def _xai_request(model: str, system_prompt: str, prompt: str, api_key: str):
+    # xAI's API is OpenAI compatible; reasoning is switched off as in xai_model
+    return _openai_request(model, system_prompt, prompt, api_key, {"reasoning_effort": "none"})
+
+
+def _anthropic_request(model: str, system_prompt: str, prompt: str, api_key: str):
+    headers = {"x-api-key": api_key, "anthropic-version": ANTHROPIC_VERSION}
+    body = {
+        "model": model,
+        "max_tokens": MAX_TOKENS,
+        "system": system_prompt,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    return "/v1/messages", headers, body
+
+
+def _anthropic_response(model: str, data: Dict[str, Any]):
+    usage = data.get("usage") or {}
+    answer = "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+    # Report the requested model, as anthropic_model does
+    return answer, model, usage.get("input_tokens"), usage.get("output_tokens")
+
+
+def _google_request(model: str, system_prompt: str, prompt: str, api_key: str):
+    body = {
+        "systemInstruction": {"parts": [{"text": system_prompt}]},
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        "generationConfig": {"temperature": DEFAULT_TEMPERATURE}
+    }
+    return f"/v1beta/models/{model}:generateContent", {"x-goog-api-key": api_key}, body
+
+
+def _google_response(model: str, data: Dict[str, Any]):
+    usage = data.get("usageMetadata") or {}
+    candidates = data.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts", [])
+    # Thought summaries aren't part of the answer
+    answer = "".join(part.get("text", "") for part in parts if not part.get("thought"))
+    # Report the requested model, as google_model does
+    return answer, model, usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+
+
+# Wire format per vendor API
+APIS = {
+    "openai": {
+        "base_url": "https://api.openai.com/v1",
+        "env_var": "OPENAI_API_KEY",
+        "request": _openai_request,
+        "response": _openai_response
+    },
+    "anthropic": {
+        "base_url": "https://api.anthropic.com",
+        "env_var": "ANTHROPIC_API_KEY",
+        "request": _anthropic_request,
+        "response": _anthropic_response
+    },
+    "google": {
+        "base_url": "https://generativelanguage.googleapis.com",
+        "env_var": "GOOGLE_API_KEY",
+        "request": _google_request,
+        "response": _google_response
+    },
+    "xai": {
+        "base_url": "https://api.x.ai/v1",
+        "env_var": "XAI_API_KEY",
+        "request": _xai_request,
+        "response": _openai_response
+    }
+}
+
+_sync_client: Optional[httpx.Client] = None
+_async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """Check whether httpx can use HTTP/2 (it needs the optional h2 package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "http2": http2_available(),
+        "timeout": REQUEST_TIMEOUT,
+        "limits": httpx.Limits(max_connections=MAX_CONNECTIONS,
+                               max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+    }
+
+
+def sync_client() -> httpx.Client:
+    """Get the shared sync client, creating it on first use."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+def async_client() -> httpx.AsyncClient:
+    """Get the shared async client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+        return client
+
+
+async def aclose() -> None:
+    """Close the running event loop's async client."""
+    with _lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close() -> None:
+    """Close the sync client and forget async clients of loops that are gone."""
+    global _sync_client
+    with _lock:
+        client = _sync_client
+        _sync_client = None
+        for loop in [loop for loop in _async_clients if loop.is_closed()]:
+            del _async_clients[loop]
+    if client is not None:
+        client.close()
+
+
+atexit.register(close)
+
+
+def base_url(api: str, override: Optional[str] = None) -> str:
+    """
+    Get the base URL for a vendor API.
+
+    Args:
+        api: The vendor API (openai, anthropic, google, xai)
+        override: Base URL to use instead of the <API>_BASE_URL environment variable or the default
+
+    Returns:
+        The base URL without a trailing slash
+    """
+    url = override or os.environ.get(f"{api.upper()}_BASE_URL") or APIS[api]["base_url"]
+    return url.rstrip("/")
+
+
+def _prepare(api: str, model: str, system_prompt: str, prompt: str, url: Optional[str],
+             api_key: Optional[str]) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    if api not in APIS:
+        raise ValueError(f"Unknown API: {api}")
+    spec = APIS[api]
+    api_key = api_key or os.environ.get(spec["env_var"])
+    if not api_key:
+        raise ValueError(f"API key not found for {api}. Set the {spec['env_var']} environment variable.")
+
+    path, headers, body = spec["request"](model, system_prompt, prompt, api_key)
+    return base_url(api, url) + path, headers, body
+
+
+def _parse(api: str, model: str, response: httpx.Response) -> Tuple[str, str]:
+    answer, model_used, input_tokens, output_tokens = APIS[api]["response"](model, response.json())
+    record_tokens(input_tokens, output_tokens)
+    return answer, model_used
+
+
+def ask(api: str, model: str, system_prompt: str, prompt: str, url: Optional[str] = None,
+        api_key: Optional[str] = None, provider: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Send a request straight to a vendor's chat API and return the response.
+
+    Args:
+        api: The vendor API (openai, anthropic, google, xai)
+        model: The model name (e.g., "model-name")
+        system_prompt: The system prompt to provide context
+        prompt: The user prompt/question
+        url: Optional base URL override
+        api_key: Optional API key (defaults to the API's environment variable)
+        provider: Circuit breaker to use (defaults to api), so that e.g. an OpenAI-compatible
+            endpoint doesn't share OpenAI's
+
+    Returns:
+        Tuple containing:
+            - The model's response as a string
+            - The actual model used (as resolved by the API)
+    """
+    endpoint, headers, body = _prepare(api, model, system_prompt, prompt, url, api_key)
+    client = sync_client()
+
+    def send() -> httpx.Response:
+        response = client.post(endpoint, headers=headers, json=body)
+        response.raise_for_status()
+        return response
+
+    return _parse(api, model, call_with_resilience(provider or api, send))
+
+
+async def ask_async(api: str, model: str, system_prompt: str, prompt: str, url: Optional[str] = None,
+                    api_key: Optional[str] = None, provider: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Async version of ask(), using the running event loop's shared client.
+
+    Args:
+        api: The vendor API (openai, anthropic, google, xai)
+        model: The model name (e.g., "model-name")
+        system_prompt: The system prompt to provide context
+        prompt: The user prompt/question
+        url: Optional base URL override
+        api_key: Optional API key (defaults to the API's environment variable)
+        provider: Circuit breaker to use (defaults to api), so that e.g. an OpenAI-compatible
+            endpoint doesn't share OpenAI's
+
+    Returns:
+        Tuple containing:
+            - The model's response as a string
+            - The actual model used (as resolved by the API)
+    """
+    endpoint, headers, body = _prepare(api, model, system_prompt, prompt, url, api_key)
+    client = async_client()
+
+    async def send() -> httpx.Response:
+        response = await client.post(endpoint, headers=headers, json=body)
+        response.raise_for_status()
+        return response
+
+    return _parse(api, model, await call_with_resilience_async(provider or api, send))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Per-request Instrumentation for Model Calls
+
+This module records one measurement per ask(): wall time, time spent inside
+the provider call (SDK and network, summed over attempts), time spent waiting
+between retries, the rest as local overhead, input/output tokens from the
+response's usage metadata, and an estimated cost from the provider's pricing.
+
+A measurement is active for the calling thread (or asyncio task) while
+measure_request() is open; call_with_resilience() and the model modules add to
+it, so the model interfaces keep returning (answer, model_used). Finished measurements are
+kept in a process-wide list, written out as JSON lines or OpenMetrics text,
+and aggregated per provider for the run summary.
+"""
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_records: List[Dict[str, Any]] = []
+_records_lock = threading.Lock()
+_active: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("measurement", default=None)
+
+
+def _current() -> Optional[Dict[str, Any]]:
+    return _active.get()
+
+
+@contextmanager
+def measure_request(provider: str, model: str,
+                    pricing: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Measure one request to a provider made by the calling thread or task.
+
+    Args:
+        provider: The LLM provider (openai, anthropic, etc.)
+        model: The requested model name
+        pricing: Optional {"input": ..., "output": ...} prices in USD per million tokens
+
+    Yields:
+        The record being filled in; callers may set "model_used", "cached" or "stream"
+    """
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "provider": provider,
+        "model": model,
+        "model_used": None,
+        "cached": False,
+        "stream": False,
+        "attempts": 0,
+        "wall": 0.0,
+        "invoke": 0.0,
+        "retry_wait": 0.0,
+        "local": 0.0,
+        "input_tokens": None,
+        "output_tokens": None,
+        "cost": None,
+        "error": None
+    }
+    token = _active.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        _active.reset(token)
+        record["wall"] = time.perf_counter() - started
+        record["local"] = max(0.0, record["wall"] - record["invoke"] - record["retry_wait"])
+        record["cost"] = estimate_cost(record["input_tokens"], record["output_tokens"], pricing)
+        with _records_lock:
+            _records.append(record)
+
+
+def record_attempt(elapsed: float) -> None:
+    """Add one provider call (successful or not) to the active measurement."""
+    record = _current()
+    if record is not None:
+        record["attempts"] += 1
+        record["invoke"] += elapsed
+
+
+def record_retry_wait(delay: float) -> None:
+    """Add time spent backing off between attempts to the active measurement."""
+    record = _current()
+    if record is not None:
+        record["retry_wait"] += delay
+
+
+def record_usage(message: Any) -> None:
+    """Add the token usage reported on a response message to the active measurement."""
+    record_tokens(*extract_usage(message))
+
+
+def record_tokens(input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+    """Add token counts to the active measurement."""
+    record = _current()
+    if record is None:
+        return
+    if input_tokens is not None:
+        record["input_tokens"] = (record["input_tokens"] or 0) + input_tokens
+    if output_tokens is not None:
+        record["output_tokens"] = (record["output_tokens"] or 0) + output_tokens
+
+
+def extract_usage(message: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Read input and output token counts from a LangChain message.
+
+    Uses the standard usage_metadata when present, and falls back to the
+    provider-specific usage in response_metadata.
+
+    Returns:
+        Tuple of (input tokens, output tokens); None where the response didn't say
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+
+    metadata = getattr(message, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage") or metadata.get("usage_metadata") or {}
+    if not isinstance(usage, dict):
+        usage = vars(usage) if hasattr(usage, "__dict__") else {}
+    input_tokens = usage.get("input_tokens", usage.get("prompt_tokens", usage.get("prompt_token_count")))
+    output_tokens = usage.get("output_tokens", usage.get("completion_tokens", usage.get("candidates_token_count")))
+    return input_tokens, output_tokens
+
+
+def estimate_cost(input_tokens: Optional[int], output_tokens: Optional[int],
+                  pricing: Optional[Dict[str, float]]) -> Optional[float]:
+    """
+    Estimate a request's cost.
+
+    Args:
+        input_tokens: Input token count
+        output_tokens: Output token count
+        pricing: {"input": ..., "output": ...} prices in USD per million tokens
+
+    Returns:
+        The cost in USD, or None without pricing or token counts
+    """
+    if not pricing or (input_tokens is None and output_tokens is None):
+        return None
+    cost = ((input_tokens or 0) * pricing.get("input", 0) + (output_tokens or 0) * pricing.get("output", 0)) / 1e6
+    return round(cost, 8)
+
+
+def request_records() -> List[Dict[str, Any]]:
+    """Get a copy of every finished measurement."""
+    with _records_lock:
+        return list(_records)
+
+
+def reset_records() -> None:
+    """Forget all finished measurements."""
+    with _records_lock:
+        _records.clear()
+
+
+def summarize_records(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Aggregate measurements per provider for the run summary.
+
+    Returns:
+        Dictionary of provider -> requests, cached, errors, attempts, total and
+        max wall time, total invoke time, tokens and cost
+    """
+    summary: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        stats = summary.setdefault(record["provider"], {
+            "requests": 0, "cached": 0, "errors": 0, "attempts": 0,
+            "wall": 0.0, "max_wall": 0.0, "invoke": 0.0,
+            "input_tokens": 0, "output_tokens": 0, "cost": None
+        })
+        stats["requests"] += 1
+        stats["cached"] += record["cached"]
+        stats["errors"] += record["error"] is not None
+        stats["attempts"] += record["attempts"]
+        stats["wall"] += record["wall"]
+        stats["max_wall"] = max(stats["max_wall"], record["wall"])
+        stats["invoke"] += record["invoke"]
+        stats["input_tokens"] += record["input_tokens"] or 0
+        stats["output_tokens"] += record["output_tokens"] or 0
+        if record["cost"] is not None:
+            stats["cost"] = (stats["cost"] or 0) + record["cost"]
+
+    for stats in summary.values():
+        for key in ("wall", "max_wall", "invoke"):
+            stats[key] = round(stats[key], 3)
+        if stats["cost"] is not None:
+            stats["cost"] = round(stats["cost"], 6)
+    return summary
+
+
+def write_jsonl(path: str, records: List[Dict[str, Any]]) -> None:
+    """Append measurements to a JSON lines file, one request per line."""
+    with open(path, "a", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_openmetrics(records: List[Dict[str, Any]]) -> str:
+    """
+    Render the per-provider aggregates as OpenMetrics text (for a Prometheus textfile collector).
+
+    Returns:
+        The exposition text, ending with "# EOF"
+    """
+    summary = summarize_records(records)
+    metrics = [
+        ("llm_requests", "counter", "Requests made to the provider", "requests", "_total"),
+        ("llm_request_errors", "counter", "Requests that failed", "errors", "_total"),
+        ("llm_request_attempts", "counter", "Provider calls including retries", "attempts", "_total"),
+        ("llm_request_wall_seconds", "counter", "Wall time spent in ask()", "wall", "_total"),
+        ("llm_request_invoke_seconds", "counter", "Time spent inside provider calls", "invoke", "_total"),
+        ("llm_request_max_wall_seconds", "gauge", "Slowest request", "max_wall", ""),
+        ("llm_input_tokens", "counter", "Input tokens", "input_tokens", "_total"),
+        ("llm_output_tokens", "counter", "Output tokens", "output_tokens", "_total"),
+        ("llm_cost_usd", "counter", "Estimated cost in USD", "cost", "_total"),
+    ]
+
+    lines = []
+    for name, kind, help_text, key, suffix in metrics:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {help_text}")
+        for provider, stats in sorted(summary.items()):
+            if stats[key] is not None:
+                lines.append(f'{name}{suffix}{{provider="{_escape_label(provider)}"}} {stats[key]}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Resilience Wrapper for Model Calls
+
+This module retries transient provider failures (rate limits, 5xx, timeouts)
+with capped exponential backoff and jitter, honours Retry-After headers, and
+keeps a circuit breaker per provider so a provider that is clearly down fails
+fast instead of burning the job's time budget.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from models.instrumentation import record_attempt, record_retry_wait
+
+logger = logging.getLogger(__name__)
+
+# Retry settings
+MAX_ATTEMPTS = 4
+BASE_DELAY = 1.0
+MAX_DELAY = 20.0
+# Longest Retry-After we are willing to wait; beyond this we give up on the request
+MAX_RETRY_AFTER = 60.0
+
+# Circuit breaker settings; one call that runs out of attempts opens the breaker,
+# since the daily run makes a single call per provider
+FAILURE_THRESHOLD = MAX_ATTEMPTS
+RESET_TIMEOUT = 120.0
+
+# HTTP status codes worth retrying (529 is Anthropic's "overloaded")
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Exception class name fragments for transient errors without a status code
+RETRYABLE_ERROR_NAMES = ("Timeout", "Connection", "RateLimit", "ResourceExhausted", "ServiceUnavailable", "Overloaded")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open and calls are rejected."""
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    closed: calls go through; consecutive transient failures are counted.
+    open: calls are rejected until reset_timeout has passed.
+    half_open: one trial call is let through; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected = 0
+        self.trips = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Check whether a call may be made now."""
+        with self._lock:
+            if self.state == "open":
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the breaker."""
+        with self._lock:
+            self.total_successes += 1
+            self._close()
+
+    def record_reachable(self) -> None:
+        """Record a call that failed for a non-transient reason; the provider is up, so close the breaker."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a transient failure, opening the breaker past the threshold."""
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self._opened_at = self._clock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the breaker state and counters for run statistics."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.total_failures,
+                "successes": self.total_successes,
+                "rejected": self.rejected,
+                "trips": self.trips
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Get the circuit breaker for a provider, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker()
+            _breakers[provider] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Get a snapshot of every provider's circuit breaker."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {provider: breaker.snapshot() for provider, breaker in breakers.items()}
+
+
+def reset_breakers() -> None:
+    """Forget all circuit breaker state."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Extract the HTTP status code from an SDK exception, if any."""
+    for candidate in (getattr(error, "status_code", None),
+                      getattr(getattr(error, "response", None), "status_code", None),
+                      getattr(error, "code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether an error is transient and worth retrying.
+
+    Args:
+        error: The exception raised by the provider SDK
+
+    Returns:
+        True for rate limits, 5xx responses, timeouts and connection errors
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    name = type(error).__name__
+    return any(fragment in name for fragment in RETRYABLE_ERROR_NAMES)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After delay from an SDK exception's HTTP response.
+
+    Args:
+        error: The exception raised by the provider SDK
+
+    Returns:
+        The delay in seconds, or None if the response didn't ask for one
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # Retry-After can also be an HTTP date
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                  rng: random.Random = random) -> float:
+    """Capped exponential backoff with full jitter for the given attempt (0-based)."""
+    return rng.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _retry_delay(provider: str, breaker: CircuitBreaker, error: Exception, attempt: int, max_attempts: int,
+                 base_delay: float, max_delay: float) -> float:
+    """
+    Record a failed attempt and decide how long to wait before the next one.
+
+    Re-raises the error when it isn't retryable, attempts have run out, or the
+    provider asked to wait longer than MAX_RETRY_AFTER.
+    """
+    if not is_retryable(error):
+        # Client errors (bad request, auth) mean the provider is reachable
+        breaker.record_reachable()
+        raise error
+
+    breaker.record_failure()
+    if attempt == max_attempts - 1:
+        raise error
+
+    delay = retry_after(error)
+    if delay is None:
+        delay = backoff_delay(attempt, base_delay, max_delay)
+    elif delay > MAX_RETRY_AFTER:
+        logger.warning(f"{provider} asked to retry after {delay:.0f}s; giving up")
+        raise error
+
+    logger.warning(f"{provider} request failed ({type(error).__name__}: {error}); "
+                   f"retrying in {delay:.1f}s (attempt {attempt + 2}/{max_attempts})")
+    record_retry_wait(delay)
+    return delay
+
+
+def call_with_resilience(provider: str, fn: Callable[[], Any], max_attempts: int = MAX_ATTEMPTS,
+                         base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                         sleep: Callable[[float], None] = time.sleep) -> Any:
+    """
+    Call fn, retrying transient failures and respecting the provider's circuit breaker.
+
+    Args:
+        provider: The LLM provider (openai, anthropic, etc.)
+        fn: The call to make, e.g. lambda: chat.invoke(messages)
+        max_attempts: Maximum number of attempts, including the first
+        base_delay: Backoff delay for the first retry, doubled on each attempt
+        max_delay: Upper bound for the backoff delay
+        sleep: Function used to wait between attempts
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        CircuitOpenError: If the provider's circuit breaker is open
+        Exception: The last error if it isn't retryable or attempts run out
+    """
+    breaker = get_breaker(provider)
+
+    for attempt in range(max_attempts):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {provider} is open; not sending request")
+
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            record_attempt(time.perf_counter() - started)
+            sleep(_retry_delay(provider, breaker, e, attempt, max_attempts, base_delay, max_delay))
+        else:
+            record_attempt(time.perf_counter() - started)
+            breaker.record_success()
+            return result
+
+
+async def call_with_resilience_async(provider: str, fn: Callable[[], Awaitable[Any]],
+                                     max_attempts: int = MAX_ATTEMPTS, base_delay: float = BASE_DELAY,
+                                     max_delay: float = MAX_DELAY,
+                                     sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> Any:
+    """
+    Async version of call_with_resilience: await fn(), retrying transient failures.
+
+    Args:
+        provider: The LLM provider (openai, anthropic, etc.)
+        fn: Returns the awaitable to make, e.g. lambda: client.post(...)
+        max_attempts: Maximum number of attempts, including the first
+        base_delay: Backoff delay for the first retry, doubled on each attempt
+        max_delay: Upper bound for the backoff delay
+        sleep: Coroutine function used to wait between attempts
+
+    Returns:
+        Whatever fn's awaitable returns
+    """
+    breaker = get_breaker(provider)
+
+    for attempt in range(max_attempts):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {provider} is open; not sending request")
+
+        started = time.perf_counter()
+        try:
+            result = await fn()
+        except Exception as e:
+            record_attempt(time.perf_counter() - started)
+            await sleep(_retry_delay(provider, breaker, e, attempt, max_attempts, base_delay, max_delay))
+        else:
+            record_attempt(time.perf_counter() - started)
+            breaker.record_success()
+            return result
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Streaming Helper for Model Interfaces
+
+This module streams a chat completion through LangChain's stream() and records
+time-to-first-token and total latency. An optional stop_when callback sees the
+text received so far after every chunk and can end the stream early (e.g. once
+the evaluator has reached a verdict), saving latency and output tokens.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from models.instrumentation import record_usage
+from utils import ensure_string
+
+
+def stream_chat(chat: Any, messages: List[Any],
+                stop_when: Optional[Callable[[str], Optional[bool]]] = None) -> Dict[str, Any]:
+    """
+    Stream a chat completion and collect the answer.
+
+    Args:
+        chat: The LangChain chat client
+        messages: The messages to send
+        stop_when: Optional callback given the text so far; returning anything
+            other than None stops the stream
+
+    Returns:
+        Dictionary with the "answer", the "model_name" reported in the response
+        metadata (None if the stream ended before it was sent), "ttft" and
+        "latency" in seconds, and whether the stream was "stopped_early"
+    """
+    started = time.perf_counter()
+    ttft = None
+    text = ""
+    metadata: Dict[str, Any] = {}
+    stopped_early = False
+
+    stream = chat.stream(messages)
+    try:
+        for chunk in stream:
+            if chunk.response_metadata:
+                metadata.update(chunk.response_metadata)
+            if getattr(chunk, "usage_metadata", None):
+                # Providers report usage on the first and/or last chunk
+                record_usage(chunk)
+
+            piece = ensure_string(chunk.content)
+            if not piece:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            text += piece
+
+            if stop_when is not None and stop_when(text) is not None:
+                stopped_early = True
+                break
+    finally:
+        # Closing the generator closes the HTTP response, so the provider stops generating
+        close = getattr(stream, "close", None)
+        if callable(close):
+            close()
+
+    return {
+        "answer": text,
+        "model_name": metadata.get("model_name") or metadata.get("model"),
+        "ttft": ttft,
+        "latency": time.perf_counter() - started,
+        "stopped_early": stopped_early
+    }
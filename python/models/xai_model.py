@@ -6,7 +6,7 @@ This module provides a function to send requests to XAI's models.
 """
 
 import os
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, Optional, Tuple, Union, Callable
 import json
 import logging
 
@@ -14,11 +14,28 @@ from langchain_xai import ChatXAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from models import DEFAULT_TEMPERATURE
+from models.clients import get_client
+from models.instrumentation import record_usage
+from models.resilience import call_with_resilience
+from models.streaming import stream_chat
 from utils import ensure_string
 
 # Disable httpx logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+def _get_chat(model: str) -> ChatXAI:
+    """Get the cached ChatXAI instance for a model."""
+    return get_client(
+        "xai",
+        ChatXAI,
+        model,
+        temperature=DEFAULT_TEMPERATURE,
+        share_http_pool=True,
+        extra_body={"reasoning_effort": "none"},
+        # Retries are handled by call_with_resilience
+        max_retries=0,
+    )
+
 def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
     """
     Send a request to a xAI model and return the response.
@@ -32,15 +49,9 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
         Tuple containing:
             - The model's response as a string
             - The actual model used (as resolved by the API)
-            - The cost as a float or None if not available
     """
     
-    # Create the ChatXAI instance
-    chat = ChatXAI(
-        model=model,
-        temperature=DEFAULT_TEMPERATURE,
-        extra_body={"reasoning_effort": "none"},
-    )
+    chat = _get_chat(model)
     
     # Create messages
     messages = [
@@ -50,7 +61,8 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
     
     # Send the request
     try:
-        response = chat.invoke(messages)
+        response = call_with_resilience("xai", lambda: chat.invoke(messages))
+        record_usage(response)
         
         # Extract and robustly handle content
         result = ensure_string(response.content)
@@ -61,3 +73,45 @@ def ask(model: str, system_prompt: str, prompt: str) -> Tuple[str, str]:
     except Exception as e:
         print(f"Error with xAI request: {e}")
         raise e
+
+def ask_stream(model: str, system_prompt: str, prompt: str,
+               stop_when: Optional[Callable[[str], Optional[bool]]] = None) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Stream a request to a xAI model, optionally stopping early.
+    
+    Args:
+        model: The model name (e.g., "model-name")
+        system_prompt: The system prompt to provide context
+        prompt: The user prompt/question
+        stop_when: Optional callback given the text so far; returning a non-None
+            verdict stops the stream
+        
+    Returns:
+        Tuple containing:
+            - The model's response as a string (partial if stopped early)
+            - The actual model used (as resolved by the API, if it was sent before stopping)
+            - Timings: "ttft" and "latency" in seconds, and "stopped_early"
+    """
+    chat = _get_chat(model)
+
+    # Create messages
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=prompt)
+    ]
+
+    # Send the request
+    try:
+        streamed = call_with_resilience("xai", lambda: stream_chat(chat, messages, stop_when))
+
+        model_used = streamed["model_name"] or model
+        timings = {
+            "ttft": streamed["ttft"],
+            "latency": streamed["latency"],
+            "stopped_early": streamed["stopped_early"]
+        }
+
+        return streamed["answer"], model_used, timings
+    except Exception as e:
+        print(f"Error with xAI streaming request: {e}")
+        raise e
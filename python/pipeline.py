@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Staged Pipeline for Large Answer Volumes
+
+This script runs the same prompt x sample x provider matrix as batch_runner.py,
+split into stages connected by bounded queues:
+
+1. Fetch: async requests through the direct HTTP backend (models/http_backend.py),
+   capped by --concurrency and paced per provider
+2. Score: answers are normalised (ensure_string) and evaluated in batches in a
+   process pool, so scoring uses every core and never runs on the event loop
+3. Write: scored rows are written in batches (JSON lines with --output)
+
+When a later stage falls behind, its queue fills up and the stage before it
+waits (backpressure). With --output, finished rows are written and dropped and
+the report is built as they go by, so memory stays bounded however many
+requests are queued (beyond LATENCY_SAMPLE requests per provider, the latency
+percentiles come from a random sample).
+
+Usage:
+    uv run python pipeline.py --samples 1000 --concurrency 64 --workers 4 --output results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from batch_runner import DEFAULT_RATE_LIMIT, build_matrix, percentile
+from evaluator import evaluate
+from generate_llm_responses import MODELS, QUESTION, SYSTEM_PROMPT
+from models import http_backend
+from utils import ensure_string
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of requests in flight
+DEFAULT_CONCURRENCY = 32
+
+# Fetched answers waiting to be scored, and scored rows waiting to be written
+DEFAULT_QUEUE_SIZE = 256
+
+# Answers sent to a worker process at a time
+DEFAULT_SCORE_BATCH = 64
+
+# Rows written at a time
+DEFAULT_WRITE_BATCH = 500
+
+# Latencies kept per provider for the percentiles when rows aren't kept
+LATENCY_SAMPLE = 10_000
+
+# Marks the end of a queue
+_DONE = object()
+
+Fetch = Callable[[Dict[str, Any], Dict[str, Any], str], Awaitable[Tuple[Any, str]]]
+
+
+async def fetch_http(job: Dict[str, Any], model_info: Dict[str, Any], system_prompt: str) -> Tuple[Any, str]:
+    """Ask a job's provider through the async HTTP backend; returns (raw answer, model used)."""
+    provider = job["llm"]
+    return await http_backend.ask_async(model_info.get("api", provider), model_info["name"], system_prompt,
+                                        job["prompt"], model_info.get("base_url"),
+                                        api_key=os.environ.get(model_info["env_var"]), provider=provider)
+
+
+def score_batch(answers: List[Any]) -> List[Tuple[str, bool]]:
+    """
+    Normalise and evaluate a batch of raw answers (runs in a worker process).
+
+    Returns:
+        (answer, correct) for every answer, in order
+    """
+    scored = []
+    for raw in answers:
+        answer = ensure_string(raw).strip()
+        scored.append((answer, evaluate(answer)))
+    return scored
+
+
+class _Pacer:
+    """Spaces out a provider's requests to its rate limit without blocking the event loop."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _Report:
+    """Builds the batch_runner.summarize report one row at a time, without keeping the rows."""
+
+    def __init__(self, sample_size: int = LATENCY_SAMPLE):
+        self.sample_size = sample_size
+        self.providers: Dict[str, Dict[str, Any]] = {}
+        self.random = random.Random(0)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        stats = self.providers.setdefault(row["llm"], {"requests": 0, "errors": 0, "correct": 0,
+                                                       "first_start": row["started"], "last_end": 0.0,
+                                                       "latencies": []})
+        stats["requests"] += 1
+        if "error" in row:
+            stats["errors"] += 1
+        elif row["correct"]:
+            stats["correct"] += 1
+        stats["first_start"] = min(stats["first_start"], row["started"])
+        stats["last_end"] = max(stats["last_end"], row["started"] + row["latency"])
+        # Reservoir sampling: every latency has the same chance of being kept
+        latencies = stats["latencies"]
+        if len(latencies) < self.sample_size:
+            latencies.append(row["latency"])
+        else:
+            slot = self.random.randrange(stats["requests"])
+            if slot < self.sample_size:
+                latencies[slot] = row["latency"]
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for provider, stats in self.providers.items():
+            answered = stats["requests"] - stats["errors"]
+            span = stats["last_end"] - stats["first_start"]
+            report[provider] = {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "correct": stats["correct"],
+                "accuracy": round(stats["correct"] / answered, 4) if answered else None,
+                "requests_per_second": round(stats["requests"] / span, 3) if span > 0 else None,
+                "latency_p50": round(percentile(stats["latencies"], 50), 3),
+                "latency_p95": round(percentile(stats["latencies"], 95), 3)
+            }
+        return report
+
+
+async def run_pipeline_async(jobs: List[Dict[str, Any]], models: Dict[str, Dict[str, Any]],
+                             system_prompt: str = SYSTEM_PROMPT, concurrency: int = DEFAULT_CONCURRENCY,
+                             rate_limits: Optional[Dict[str, float]] = None, workers: Optional[int] = None,
+                             queue_size: int = DEFAULT_QUEUE_SIZE, score_batch_size: int = DEFAULT_SCORE_BATCH,
+                             write_batch_size: int = DEFAULT_WRITE_BATCH,
+                             write: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                             fetch: Fetch = fetch_http, executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """
+    Run jobs through the fetch, score and write stages.
+
+    Args:
+        jobs: Jobs from batch_runner.build_matrix
+        models: Provider table with an entry for every job's provider
+        system_prompt: The system prompt to provide context
+        concurrency: Maximum number of requests in flight
+        rate_limits: Requests per second per provider, overriding MODELS and DEFAULT_RATE_LIMIT
+        workers: Worker processes for scoring (defaults to the number of cores)
+        queue_size: Capacity of each queue between stages
+        score_batch_size: Answers scored per worker call
+        write_batch_size: Rows per write call
+        write: Called with each batch of finished rows (from a thread); when given,
+            the rows aren't kept and "results" is empty
+        fetch: Coroutine that asks a job's provider (defaults to the HTTP backend)
+        executor: Executor for scoring (defaults to a new process pool)
+
+    Returns:
+        Dictionary with the finished "results" (in completion order, only without
+        write), the per-provider "report" (as batch_runner.summarize), the total
+        "requests", the number of "write_batches", the largest "queue_peak" seen
+        and the "execution_time"
+    """
+    rate_limits = rate_limits or {}
+    pacers = {
+        provider: _Pacer(rate_limits.get(provider, models[provider].get("rate_limit", DEFAULT_RATE_LIMIT)))
+        for provider in {job["llm"] for job in jobs}
+    }
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    finished: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    pending = iter(jobs)
+    stats = {"queue_peak": 0, "write_batches": 0}
+    results: List[Dict[str, Any]] = []
+    report = _Report()
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    async def fetcher() -> None:
+        for job in pending:
+            model_info = models[job["llm"]]
+            await pacers[job["llm"]].wait()
+            started = time.monotonic()
+            try:
+                raw, model_used = await fetch(job, model_info, system_prompt)
+            except Exception as e:
+                logger.error(f"Error processing {job['llm']} (prompt {job['prompt_index']}, "
+                             f"sample {job['sample']}): {e}")
+                # Failed requests skip scoring
+                await finished.put({**job, "model": model_info.get("name"), "error": str(e),
+                                    "stack_trace": traceback.format_exc(), "started": started,
+                                    "latency": time.monotonic() - started})
+                continue
+            await fetched.put((job, raw, model_used, started, time.monotonic() - started))
+            stats["queue_peak"] = max(stats["queue_peak"], fetched.qsize())
+
+    async def score(batch: List[Tuple], slots: asyncio.Semaphore) -> None:
+        try:
+            scored = await loop.run_in_executor(executor, score_batch, [raw for _, raw, _, _, _ in batch])
+            for (job, _, model_used, started, latency), (answer, correct) in zip(batch, scored):
+                await finished.put({**job, "model": model_used, "answer": answer, "correct": correct,
+                                    "started": started, "latency": latency})
+        finally:
+            slots.release()
+
+    async def scorer() -> None:
+        # At most two batches per worker in flight; beyond that the fetched queue fills up
+        slots = asyncio.Semaphore(2 * (workers or os.cpu_count() or 1))
+        tasks = []
+        done = False
+        while not done:
+            item = await fetched.get()
+            batch = []
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+                if len(batch) >= score_batch_size or fetched.empty():
+                    break
+                item = fetched.get_nowait()
+            if batch:
+                await slots.acquire()
+                tasks.append(asyncio.create_task(score(batch, slots)))
+        await asyncio.gather(*tasks)
+        await finished.put(_DONE)
+
+    async def writer() -> None:
+        batch = []
+        while True:
+            row = await finished.get()
+            if row is not _DONE:
+                report.add(row)
+                if write is None:
+                    results.append(row)
+                batch.append(row)
+            if batch and (row is _DONE or len(batch) >= write_batch_size):
+                if write is not None:
+                    await asyncio.to_thread(write, batch)
+                stats["write_batches"] += 1
+                batch = []
+            if row is _DONE:
+                return
+
+    start_time = time.monotonic()
+    try:
+        scoring = asyncio.create_task(scorer())
+        writing = asyncio.create_task(writer())
+        await asyncio.gather(*(fetcher() for _ in range(min(concurrency, len(jobs)) or 1)))
+        await fetched.put(_DONE)
+        await scoring
+        await writing
+    finally:
+        if own_executor:
+            executor.shutdown()
+        await http_backend.aclose()
+
+    return {
+        "results": results,
+        "report": report.report(),
+        "requests": sum(stats["requests"] for stats in report.providers.values()),
+        "write_batches": stats["write_batches"],
+        "queue_peak": stats["queue_peak"],
+        "execution_time": round(time.monotonic() - start_time, 2)
+    }
+
+
+def run_pipeline(prompts: Optional[List[str]] = None, samples: int = 1, providers: Optional[List[str]] = None,
+                 models: Optional[Dict[str, Dict[str, Any]]] = None, **options) -> Dict[str, Any]:
+    """
+    Run every prompt variant N times against every provider through the staged pipeline.
+
+    Args:
+        prompts: The prompt variants to ask (defaults to the daily QUESTION)
+        samples: Number of times each prompt is asked to each provider
+        providers: Providers to include (defaults to all configured in MODELS)
+        models: Provider table to use instead of MODELS
+        **options: Passed on to run_pipeline_async
+
+    Returns:
+        See run_pipeline_async
+    """
+    models = models if models is not None else MODELS
+    if providers is None:
+        providers = [p for p in models if not p.startswith("#")]
+    unknown = [p for p in providers if p not in models]
+    if unknown:
+        raise ValueError(f"Unknown providers: {', '.join(unknown)}")
+
+    jobs = build_matrix(prompts or [QUESTION], samples, providers)
+    logger.info(f"Running {len(jobs)} requests through the pipeline")
+    return asyncio.run(run_pipeline_async(jobs, models, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask prompt variants many times to each LLM with a staged pipeline")
+    parser.add_argument("--prompts-file", help="File with one prompt variant per line (defaults to the daily question)")
+    parser.add_argument("--samples", type=int, default=1, help="Number of samples per prompt and provider")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to all)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of requests in flight")
+    parser.add_argument("--rate", type=float, help="Requests per second for every provider")
+    parser.add_argument("--workers", type=int, help="Scoring processes (defaults to the number of cores)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Capacity of each stage queue")
+    parser.add_argument("--output", help="Write every result as JSON lines to this file")
+    args = parser.parse_args()
+
+    prompts = None
+    if args.prompts_file:
+        with open(args.prompts_file, encoding="utf-8") as file:
+            prompts = [line.strip() for line in file if line.strip()]
+
+    providers = args.providers.split(",") if args.providers else None
+    rate_limits = None
+    if args.rate:
+        rate_limits = {provider: args.rate for provider in (providers or MODELS)}
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+
+    def write(rows: List[Dict[str, Any]]) -> None:
+        output.writelines(json.dumps({k: v for k, v in row.items() if k not in ("started", "stack_trace")},
+                                     ensure_ascii=False) + "\n" for row in rows)
+
+    try:
+        batch = run_pipeline(prompts, args.samples, providers, concurrency=args.concurrency,
+                             rate_limits=rate_limits, workers=args.workers, queue_size=args.queue_size,
+                             write=write if output else None)
+    finally:
+        if output:
+            output.close()
+
+    print(f"\n===== Pipeline Summary ({batch['requests']} requests in {batch['execution_time']} seconds, "
+          f"{batch['write_batches']} writes, queue peak {batch['queue_peak']}) =====")
+    for provider, stats in batch["report"].items():
+        accuracy = f"{stats['accuracy']:.1%}" if stats["accuracy"] is not None else "n/a"
+        print(f"  {provider}: {stats['correct']}/{stats['requests'] - stats['errors']} correct ({accuracy}), "
+              f"{stats['errors']} errors, {stats['requests_per_second']} req/s, "
+              f"p50 {stats['latency_p50']}s, p95 {stats['latency_p95']}s")
+
+
+if __name__ == "__main__":
+    main()
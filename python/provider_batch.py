@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+Provider Batch API Submission
+
+This script runs a large prompt x sample matrix through the providers' discounted
+asynchronous batch endpoints (OpenAI Batch API, Anthropic Message Batches)
+instead of one online request per sample:
+1. submit: packages the matrix into one batch job per provider
+2. status: polls the jobs
+3. collect: waits for the jobs, then streams each provider's results through the
+   evaluator into a CSV file, one row per sample
+
+Every step is recorded in a job file (python/batch_jobs/<job id>.json) that is
+saved after each change, so an interrupted run picks up where it stopped and
+providers already collected are not downloaded again. Creating a batch is never
+retried blindly: a resumed submission first looks for the batch an interrupted
+attempt may have created, so a batch isn't paid for twice.
+
+A batch that ends without completing (OpenAI "failed", "expired" or "cancelled")
+is marked failed; any results it did produce are still collected.
+
+Every request's custom id starts with the job's tag. Message batches can only be
+matched by creation time and size, so a batch adopted that way is checked against
+the tag when its results are collected, and someone else's batch is rejected.
+
+Usage:
+    uv run --env-file .env python provider_batch.py submit --prompts-file prompts.txt --samples 100
+    uv run --env-file .env python provider_batch.py status <job id>
+    uv run --env-file .env python provider_batch.py collect <job id> --output results.csv
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from batch_runner import build_matrix
+from evaluator import evaluate
+from generate_llm_responses import MODELS, QUESTION, SYSTEM_PROMPT
+from models import http_backend
+from models.instrumentation import estimate_cost
+from models.resilience import call_with_resilience
+
+logger = logging.getLogger(__name__)
+
+# Where job records and per-provider results are kept
+BATCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch_jobs")
+
+# Batch requests are billed at half the online price
+BATCH_DISCOUNT = 0.5
+
+# Seconds between status polls while waiting for a job
+DEFAULT_POLL_INTERVAL = 60.0
+
+RESULT_HEADER = ["llm", "prompt_index", "sample", "prompt", "model", "answer", "correct", "error"]
+
+# Remote states after which a batch won't change any more
+_OPENAI_FINAL = {"completed", "failed", "expired", "cancelled"}
+
+# Batches listed per page when looking for one an interrupted submission created
+_LIST_LIMIT = 100
+
+# Allowed difference between our clock and the provider's when matching a batch's creation time
+_CLOCK_SKEW = timedelta(minutes=5)
+
+
+class _ForeignBatch(ValueError):
+    """Raised when a batch's results belong to another job."""
+
+
+def _custom_id(job: Dict[str, Any], tag: Optional[str] = None) -> str:
+    # Anthropic only allows [a-zA-Z0-9_-] in custom ids
+    custom_id = f"{job['llm']}-{job['prompt_index']}-{job['sample']}"
+    return f"{tag}-{custom_id}" if tag else custom_id
+
+
+def _parse_custom_id(custom_id: str, tag: Optional[str] = None) -> Tuple[str, int, int]:
+    if tag:
+        if not custom_id.startswith(f"{tag}-"):
+            raise _ForeignBatch(f"Result {custom_id} doesn't belong to this job")
+        custom_id = custom_id[len(tag) + 1:]
+    llm, prompt_index, sample = custom_id.rsplit("-", 2)
+    return llm, int(prompt_index), int(sample)
+
+
+def _checked(response):
+    response.raise_for_status()
+    return response
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class OpenAIBatch:
+    """OpenAI Batch API: upload a JSONL file of requests, create a batch, download the output file."""
+
+    api = "openai"
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = http_backend.base_url(self.api, url)
+        self.api_key = api_key or os.environ.get(http_backend.APIS[self.api]["env_var"])
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+
+    def submit(self, provider_state: Dict[str, Any], requests: List[Tuple[str, Dict[str, Any]]],
+               save: Callable[[], None]) -> None:
+        """Upload the requests and create the batch, saving the state after each step."""
+        client = http_backend.sync_client()
+        if not provider_state.get("submit_started"):
+            provider_state["submit_started"] = _now()
+            save()
+
+        if not provider_state.get("input_file_id"):
+            lines = "".join(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                                        "body": body}) + "\n" for custom_id, body in requests)
+            response = call_with_resilience(self.api, lambda: _checked(client.post(
+                f"{self.base_url}/files", headers=self.headers, data={"purpose": "batch"},
+                files={"file": ("batch.jsonl", lines.encode("utf-8"), "application/jsonl")})))
+            provider_state["input_file_id"] = response.json()["id"]
+            save()
+
+        # A batch for this input file exists if an earlier attempt got as far as creating it
+        batch_id = self._find_batch(provider_state["input_file_id"], provider_state["submit_started"])
+        if batch_id is None:
+            # Not retried: a timed out request may still have created the batch
+            response = call_with_resilience(self.api, lambda: _checked(client.post(
+                f"{self.base_url}/batches", headers=self.headers,
+                json={"input_file_id": provider_state["input_file_id"], "endpoint": "/v1/chat/completions",
+                      "completion_window": "24h"})), max_attempts=1)
+            batch_id = response.json()["id"]
+        provider_state["batch_id"] = batch_id
+        save()
+
+    def _find_batch(self, input_file_id: str, since: str) -> Optional[str]:
+        """Get the id of the batch created from an input file (after the submission started), if there is one."""
+        client = http_backend.sync_client()
+        started = (_parse_time(since) - _CLOCK_SKEW).timestamp()
+        params: Dict[str, Any] = {"limit": _LIST_LIMIT}
+        while True:
+            page = call_with_resilience(self.api, lambda: _checked(client.get(
+                f"{self.base_url}/batches", headers=self.headers, params=params))).json()
+            for batch in page["data"]:
+                # Newest first, so nothing further down the list can match
+                if batch["created_at"] < started:
+                    return None
+                if batch.get("input_file_id") == input_file_id:
+                    return batch["id"]
+            if not page.get("has_more") or not page["data"]:
+                return None
+            params["after"] = page["data"][-1]["id"]
+
+    def poll(self, provider_state: Dict[str, Any]) -> bool:
+        """Refresh the remote status; returns True once the batch is final."""
+        client = http_backend.sync_client()
+        batch = call_with_resilience(self.api, lambda: _checked(client.get(
+            f"{self.base_url}/batches/{provider_state['batch_id']}", headers=self.headers))).json()
+        provider_state["remote_status"] = batch["status"]
+        provider_state["output_file_id"] = batch.get("output_file_id")
+        provider_state["error_file_id"] = batch.get("error_file_id")
+        return batch["status"] in _OPENAI_FINAL
+
+    def completed(self, provider_state: Dict[str, Any]) -> bool:
+        """Whether a final batch completed (rather than failing, expiring or being cancelled)."""
+        return provider_state.get("remote_status") == "completed"
+
+    def results(self, provider_state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Stream (custom id, response body or None, error or None) from the output file, then the error file."""
+        for key in ("output_file_id", "error_file_id"):
+            if not provider_state.get(key):
+                continue
+            url = f"{self.base_url}/files/{provider_state[key]}/content"
+            with http_backend.sync_client().stream("GET", url, headers=self.headers) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    result = item.get("response") or {}
+                    if item.get("error") or result.get("status_code") != 200:
+                        body_error = (result.get("body") or {}).get("error") or {}
+                        error = ((item.get("error") or {}).get("message") or body_error.get("message")
+                                 or f"HTTP {result.get('status_code')}")
+                        yield item["custom_id"], None, error
+                    else:
+                        yield item["custom_id"], result["body"], None
+
+
+class AnthropicBatch:
+    """Anthropic Message Batches: create the batch with the requests inline, download the results."""
+
+    api = "anthropic"
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = http_backend.base_url(self.api, url)
+        self.api_key = api_key or os.environ.get(http_backend.APIS[self.api]["env_var"])
+        self.headers = {"x-api-key": self.api_key, "anthropic-version": http_backend.ANTHROPIC_VERSION}
+
+    def submit(self, provider_state: Dict[str, Any], requests: List[Tuple[str, Dict[str, Any]]],
+               save: Callable[[], None]) -> None:
+        """Create the batch, unless an interrupted attempt already did."""
+        client = http_backend.sync_client()
+        if provider_state.get("submit_started"):
+            batch_id = self._find_batch(provider_state["submit_started"], len(requests),
+                                        provider_state.get("rejected_batches", []))
+            if batch_id is not None:
+                # Only matched by creation time and size; collect checks the custom ids
+                provider_state["batch_id"] = batch_id
+                provider_state["unverified"] = True
+                save()
+                return
+        provider_state["submit_started"] = _now()
+        save()
+        payload = {"requests": [{"custom_id": custom_id, "params": body} for custom_id, body in requests]}
+        # Not retried: a timed out request may still have created the batch
+        response = call_with_resilience(self.api, lambda: _checked(client.post(
+            f"{self.base_url}/v1/messages/batches", headers=self.headers, json=payload)), max_attempts=1)
+        provider_state["batch_id"] = response.json()["id"]
+        save()
+
+    def _find_batch(self, since: str, request_count: int, rejected: List[str]) -> Optional[str]:
+        """
+        Get the id of a batch an interrupted submission may have created, if there is one.
+
+        Message batches carry no metadata, so a batch matches when it was created after
+        the attempt started, has the same number of requests and wasn't rejected before.
+        """
+        client = http_backend.sync_client()
+        started = _parse_time(since) - _CLOCK_SKEW
+        params: Dict[str, Any] = {"limit": _LIST_LIMIT}
+        while True:
+            page = call_with_resilience(self.api, lambda: _checked(client.get(
+                f"{self.base_url}/v1/messages/batches", headers=self.headers, params=params))).json()
+            for batch in page["data"]:
+                # Newest first, so nothing further down the list can match
+                if _parse_time(batch["created_at"]) < started:
+                    return None
+                if (sum(batch.get("request_counts", {}).values()) == request_count
+                        and batch["id"] not in rejected):
+                    return batch["id"]
+            if not page.get("has_more") or not page["data"]:
+                return None
+            params["after_id"] = page["data"][-1]["id"]
+
+    def poll(self, provider_state: Dict[str, Any]) -> bool:
+        """Refresh the remote status; returns True once the batch has ended."""
+        client = http_backend.sync_client()
+        batch = call_with_resilience(self.api, lambda: _checked(client.get(
+            f"{self.base_url}/v1/messages/batches/{provider_state['batch_id']}", headers=self.headers))).json()
+        provider_state["remote_status"] = batch["processing_status"]
+        provider_state["results_url"] = batch.get("results_url")
+        return batch["processing_status"] == "ended"
+
+    def completed(self, provider_state: Dict[str, Any]) -> bool:
+        """Whether a final batch completed; expired or canceled requests are reported per request."""
+        return True
+
+    def results(self, provider_state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Stream (custom id, message or None, error or None) from the results file."""
+        if not provider_state.get("results_url"):
+            return
+        with http_backend.sync_client().stream("GET", provider_state["results_url"], headers=self.headers) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                result = item["result"]
+                if result["type"] == "succeeded":
+                    yield item["custom_id"], result["message"], None
+                else:
+                    error = (result.get("error") or {}).get("message") or result["type"]
+                    yield item["custom_id"], None, error
+
+
+# Providers with a batch endpoint
+BATCH_APIS = {"openai": OpenAIBatch, "anthropic": AnthropicBatch}
+
+
+def job_path(job_id: str, batch_dir: str = BATCH_DIR) -> str:
+    """Get the path of a job record."""
+    return os.path.join(batch_dir, f"{job_id}.json")
+
+
+def save_job(job: Dict[str, Any], batch_dir: str = BATCH_DIR) -> None:
+    """Write a job record atomically."""
+    os.makedirs(batch_dir, exist_ok=True)
+    path = job_path(job["id"], batch_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(job, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    os.replace(tmp_path, path)
+
+
+def load_job(job_id: str, batch_dir: str = BATCH_DIR) -> Dict[str, Any]:
+    """Load a job record."""
+    with open(job_path(job_id, batch_dir), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _client(state: Dict[str, Any]):
+    # The provider's own key, so a vendor key is never sent to another base URL
+    env_var = state.get("env_var") or http_backend.APIS[state["api"]]["env_var"]
+    api_key = os.environ.get(env_var)
+    if not api_key:
+        raise ValueError(f"API key not found for {state['api']}. Set the {env_var} environment variable.")
+    return BATCH_APIS[state["api"]](state.get("base_url"), api_key)
+
+
+def submit(prompts: Optional[List[str]] = None, samples: int = 1, providers: Optional[List[str]] = None,
+           system_prompt: str = SYSTEM_PROMPT, models: Optional[Dict[str, Dict[str, Any]]] = None,
+           job_id: Optional[str] = None, batch_dir: str = BATCH_DIR) -> Dict[str, Any]:
+    """
+    Submit the prompt x sample matrix as one batch per provider, or resume a submission.
+
+    Args:
+        prompts: The prompt variants to ask (defaults to the daily QUESTION)
+        samples: Number of times each prompt is asked to each provider
+        providers: Providers to include (defaults to every enabled provider in MODELS with a batch endpoint)
+        system_prompt: The system prompt to provide context
+        models: Provider table to use instead of MODELS
+        job_id: Resume this job instead of creating a new one
+        batch_dir: Directory with the job records
+
+    Returns:
+        The job record
+    """
+    models = models if models is not None else MODELS
+
+    if job_id is not None:
+        job = load_job(job_id, batch_dir)
+    else:
+        if providers is None:
+            providers = [p for p in models if not p.startswith("#") and models[p].get("api", p) in BATCH_APIS]
+        unsupported = [p for p in providers if p not in models or models[p].get("api", p) not in BATCH_APIS]
+        if unsupported:
+            raise ValueError(f"No batch endpoint for: {', '.join(unsupported)}")
+
+        job = {
+            "id": datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6],
+            "tag": uuid.uuid4().hex[:12],
+            "created": _now(),
+            "system_prompt": system_prompt,
+            "prompts": prompts or [QUESTION],
+            "samples": samples,
+            "providers": {
+                provider: {
+                    "api": models[provider].get("api", provider),
+                    "model": models[provider]["name"],
+                    "base_url": models[provider].get("base_url"),
+                    "env_var": models[provider]["env_var"],
+                    "pricing": models[provider].get("pricing"),
+                    "status": "pending"
+                }
+                for provider in providers
+            }
+        }
+        save_job(job, batch_dir)
+
+    jobs = build_matrix(job["prompts"], job["samples"], list(job["providers"]))
+    for provider, state in job["providers"].items():
+        if state["status"] != "pending":
+            continue
+
+        client = _client(state)
+        build = http_backend.APIS[state["api"]]["request"]
+        requests = []
+        for matrix_job in jobs:
+            if matrix_job["llm"] == provider:
+                _, _, body = build(state["model"], job["system_prompt"], matrix_job["prompt"], client.api_key)
+                requests.append((_custom_id(matrix_job, job.get("tag")), body))
+
+        logger.info(f"Submitting {len(requests)} requests to the {provider} batch API")
+        client.submit(state, requests, lambda: save_job(job, batch_dir))
+        state["status"] = "submitted"
+        state["requests"] = len(requests)
+        save_job(job, batch_dir)
+
+    return job
+
+
+def refresh(job: Dict[str, Any], batch_dir: str = BATCH_DIR) -> Dict[str, str]:
+    """
+    Poll every submitted batch of a job that hasn't finished.
+
+    Returns:
+        Dictionary of provider -> local status ("finished" once a batch has completed,
+        "failed" if it ended without completing)
+    """
+    for provider, state in job["providers"].items():
+        if state["status"] != "submitted":
+            continue
+        client = _client(state)
+        if client.poll(state):
+            state["status"] = "finished" if client.completed(state) else "failed"
+    save_job(job, batch_dir)
+    return {provider: state["status"] for provider, state in job["providers"].items()}
+
+
+def _collect_provider(job: Dict[str, Any], provider: str, state: Dict[str, Any], path: str) -> None:
+    """Stream one provider's results through the evaluator into its CSV file (raises _ForeignBatch)."""
+    prompts = job["prompts"]
+    counts = {"rows": 0, "correct": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0}
+    parse = http_backend.APIS[state["api"]]["response"]
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(RESULT_HEADER)
+        for custom_id, body, error in _client(state).results(state):
+            llm, prompt_index, sample = _parse_custom_id(custom_id, job.get("tag"))
+            answer, model_used, correct = "", state["model"], ""
+            if body is not None:
+                answer, model_used, input_tokens, output_tokens = parse(state["model"], body)
+                correct = str(evaluate(answer)).lower()
+                counts["correct"] += correct == "true"
+                counts["input_tokens"] += input_tokens or 0
+                counts["output_tokens"] += output_tokens or 0
+            else:
+                counts["errors"] += 1
+            counts["rows"] += 1
+            writer.writerow([llm, prompt_index, sample, prompts[prompt_index], model_used, answer, correct,
+                             error or ""])
+    os.replace(tmp_path, path)
+
+    pricing = state.get("pricing")
+    if pricing:
+        pricing = {key: price * BATCH_DISCOUNT for key, price in pricing.items()}
+    counts["cost"] = estimate_cost(counts["input_tokens"], counts["output_tokens"], pricing)
+    state.update(counts)
+
+
+def collect(job_id: str, output: Optional[str] = None, wait: bool = True,
+            poll_interval: float = DEFAULT_POLL_INTERVAL, batch_dir: str = BATCH_DIR,
+            sleep=time.sleep) -> Dict[str, Any]:
+    """
+    Wait for a job's batches and collect their results.
+
+    Each provider's results are written to batch_jobs/<job id>/<provider>.csv as
+    they are downloaded; providers collected before are skipped. Once every batch
+    has ended, the files are concatenated into output, including the partial
+    results of failed batches; failed providers are logged as incomplete.
+
+    Args:
+        job_id: The job to collect
+        output: Optional CSV file with every provider's results
+        wait: Keep polling until every batch has finished
+        poll_interval: Seconds between polls
+        batch_dir: Directory with the job records
+        sleep: Function used to wait between polls
+
+    Returns:
+        The job record
+    """
+    job = load_job(job_id, batch_dir)
+    unsubmitted = [p for p, state in job["providers"].items() if state["status"] == "pending"]
+    if unsubmitted:
+        raise ValueError(f"{', '.join(unsubmitted)} not submitted yet; run submit --resume {job['id']}")
+    results_dir = os.path.join(batch_dir, job["id"])
+    os.makedirs(results_dir, exist_ok=True)
+
+    while True:
+        statuses = refresh(job, batch_dir)
+        for provider, state in job["providers"].items():
+            # A failed batch keeps its status, but whatever it did answer is still collected
+            if state["status"] == "finished" or (state["status"] == "failed" and "results" not in state):
+                path = os.path.join(results_dir, f"{provider}.csv")
+                try:
+                    _collect_provider(job, provider, state, path)
+                except _ForeignBatch:
+                    # Adopted by creation time and size, but another job's batch: submit again
+                    if os.path.exists(path + ".tmp"):
+                        os.remove(path + ".tmp")
+                    state.setdefault("rejected_batches", []).append(state["batch_id"])
+                    for key in ("batch_id", "unverified", "remote_status", "results_url"):
+                        state.pop(key, None)
+                    state["status"] = "pending"
+                    save_job(job, batch_dir)
+                    raise ValueError(f"The {provider} batch found for this job belongs to another job; "
+                                     f"run submit --resume {job['id']}")
+                state.pop("unverified", None)
+                if state["status"] == "finished":
+                    state["status"] = "collected"
+                state["results"] = path
+                save_job(job, batch_dir)
+
+        pending = [p for p, status in statuses.items() if status == "submitted"]
+        if not pending or not wait:
+            break
+        logger.info(f"Waiting for {', '.join(pending)}")
+        sleep(poll_interval)
+
+    ended = all(state["status"] in ("collected", "failed") for state in job["providers"].values())
+    if output and ended:
+        incomplete = [p for p, state in job["providers"].items() if state["status"] == "failed"]
+        if incomplete:
+            logger.warning(f"{', '.join(incomplete)} didn't complete; {output} only has their partial results")
+        with open(output, "w", newline="", encoding="utf-8") as out:
+            out.write(",".join(RESULT_HEADER) + "\r\n")
+            for state in job["providers"].values():
+                with open(state["results"], encoding="utf-8", newline="") as file:
+                    file.readline()
+                    for line in file:
+                        out.write(line)
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a prompt x sample matrix through the provider batch APIs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = subparsers.add_parser("submit", help="Submit a new job (or resume submitting one)")
+    submit_parser.add_argument("--prompts-file", help="File with one prompt variant per line (defaults to the daily question)")
+    submit_parser.add_argument("--samples", type=int, default=1, help="Number of samples per prompt and provider")
+    submit_parser.add_argument("--providers", help="Comma-separated providers (defaults to openai,anthropic)")
+    submit_parser.add_argument("--resume", help="Job id whose submission was interrupted")
+
+    status_parser = subparsers.add_parser("status", help="Poll a job's batches")
+    status_parser.add_argument("job_id")
+
+    collect_parser = subparsers.add_parser("collect", help="Wait for a job and collect its results")
+    collect_parser.add_argument("job_id")
+    collect_parser.add_argument("--output", help="CSV file with every provider's results")
+    collect_parser.add_argument("--no-wait", action="store_true", help="Collect what is finished and return")
+    collect_parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                                help="Seconds between status polls")
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        prompts = None
+        if args.prompts_file:
+            with open(args.prompts_file, encoding="utf-8") as file:
+                prompts = [line.strip() for line in file if line.strip()]
+        providers = args.providers.split(",") if args.providers else None
+        job = submit(prompts, args.samples, providers, job_id=args.resume)
+        print(f"Submitted job {job['id']}")
+        for provider, state in job["providers"].items():
+            print(f"  {provider}: {state.get('requests', 0)} requests, batch {state.get('batch_id')}")
+
+    elif args.command == "status":
+        job = load_job(args.job_id)
+        for provider, status in refresh(job).items():
+            print(f"  {provider}: {status} ({job['providers'][provider].get('remote_status')})")
+
+    else:
+        job = collect(args.job_id, args.output, wait=not args.no_wait, poll_interval=args.poll_interval)
+        print(f"\n===== Batch Job {job['id']} =====")
+        for provider, state in job["providers"].items():
+            if state["status"] == "failed":
+                print(f"  {provider}: failed ({state.get('remote_status')}), {state.get('rows', 0)} results "
+                      f"collected -> {state.get('results')}")
+                continue
+            if state["status"] != "collected":
+                print(f"  {provider}: {state['status']}")
+                continue
+            answered = state["rows"] - state["errors"]
+            accuracy = f"{state['correct'] / answered:.1%}" if answered else "n/a"
+            cost = f"${state['cost']:.4f}" if state["cost"] is not None else "n/a"
+            print(f"  {provider}: {state['correct']}/{answered} correct ({accuracy}), {state['errors']} errors, "
+                  f"estimated cost {cost} -> {state['results']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Bulk Re-evaluation of Historical Answers
+
+This script:
+1. Loads every provider's CSV history from public/data/ in one batch
+2. Re-scores each distinct answer once with the current evaluator rules
+3. Writes a diff of the rows whose `correct` flag would flip
+4. Optionally (--apply) rewrites the CSVs and their derived files (index, columnar file,
+   summary and drift detector state) with the new flags
+
+Usage:
+    uv run python reevaluate.py
+    uv run python reevaluate.py --diff flips.csv --apply
+"""
+
+import argparse
+import csv
+import time
+from typing import Any, Dict, List, Optional
+
+from csv_store import DATA_DIR, CsvStore, CsvTransaction, discover_providers
+from columnar import rebuild_columnar
+from drift import rebuild_drift
+from evaluator import RULES, RuleSet, evaluate
+from summary import rebuild_summary
+
+DIFF_HEADER = ["llm", "row", "date", "answer", "model", "old_correct", "new_correct"]
+
+
+def score_answers(answers: List[str], rules: RuleSet = RULES) -> Dict[str, bool]:
+    """
+    Score a batch of answers, evaluating each distinct answer only once.
+
+    Args:
+        answers: The answers to score (duplicates are expected)
+        rules: The compiled evaluator rules
+
+    Returns:
+        Dictionary mapping each distinct answer to its verdict
+    """
+    # Most rows repeat a handful of answers, so dedupe before running the rules
+    return {answer: evaluate(answer, rules) for answer in dict.fromkeys(answers)}
+
+
+def reevaluate(providers: Optional[List[str]] = None, rules: RuleSet = RULES,
+               data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """
+    Re-score the full history of every provider.
+
+    Args:
+        providers: Providers to re-score (defaults to every CSV in the data directory)
+        rules: The compiled evaluator rules
+        data_dir: Directory with the CSV files
+
+    Returns:
+        Dictionary with the loaded "histories" (provider -> rows), the "verdicts"
+        per distinct answer, the list of "flips" and counts for reporting
+    """
+    providers = providers or discover_providers(data_dir)
+    histories = {llm: CsvStore(llm, data_dir).read_rows() for llm in providers}
+
+    all_answers = [row["answer"] for rows in histories.values() for row in rows]
+    verdicts = score_answers(all_answers, rules)
+
+    flips = []
+    for llm, rows in histories.items():
+        for i, row in enumerate(rows):
+            old = row["correct"].strip().lower() == "true"
+            new = verdicts[row["answer"]]
+            if old != new:
+                flips.append({
+                    "llm": llm,
+                    "row": i,
+                    "date": row["date"],
+                    "answer": row["answer"],
+                    "model": row["model"],
+                    "old_correct": str(old).lower(),
+                    "new_correct": str(new).lower()
+                })
+
+    return {
+        "histories": histories,
+        "verdicts": verdicts,
+        "flips": flips,
+        "rows": len(all_answers),
+        "distinct_answers": len(verdicts),
+        "rules_version": rules.version
+    }
+
+
+def write_diff(path: str, flips: List[Dict[str, Any]]) -> None:
+    """Write the rows that would flip to a CSV file."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=DIFF_HEADER)
+        writer.writeheader()
+        writer.writerows(flips)
+
+
+def apply_flips(result: Dict[str, Any], data_dir: str = DATA_DIR) -> List[str]:
+    """
+    Rewrite the CSVs whose rows flipped, then rebuild their index, columnar file, summary and drift state.
+
+    Returns:
+        The providers that were rewritten
+    """
+    changed = sorted({flip["llm"] for flip in result["flips"]})
+    verdicts = result["verdicts"]
+
+    # Every date is replaced, under the same lock and with the same rollback as the daily run;
+    # the transaction rebuilds the indexes of rewritten files
+    with CsvTransaction(data_dir) as transaction:
+        for llm in changed:
+            for row in result["histories"][llm]:
+                transaction.upsert(llm, row["date"], [{"answer": row["answer"], "model": row["model"],
+                                                       "correct": verdicts[row["answer"]]}])
+
+    for llm in changed:
+        rebuild_columnar(llm, data_dir)
+
+    if changed:
+        rebuild_summary(changed, data_dir)
+        # The drift state only checks row counts, so flipped flags would leave its accuracy windows stale
+        rebuild_drift(changed, data_dir)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score historical answers with the current evaluator rules")
+    parser.add_argument("--providers", help="Comma-separated providers (defaults to every CSV in public/data)")
+    parser.add_argument("--diff", default="reevaluation_diff.csv", help="Where to write the rows that would flip")
+    parser.add_argument("--apply", action="store_true", help="Rewrite the CSV files with the new verdicts")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    result = reevaluate(args.providers.split(",") if args.providers else None)
+    elapsed = time.perf_counter() - start_time
+
+    write_diff(args.diff, result["flips"])
+
+    print(f"\n===== Re-evaluation (rules v{result['rules_version']}) =====")
+    print(f"Scored {result['rows']} rows ({result['distinct_answers']} distinct answers) in {elapsed:.3f} seconds")
+    print(f"{len(result['flips'])} rows would flip; diff written to {args.diff}")
+
+    if args.apply and result["flips"]:
+        changed = apply_flips(result)
+        print(f"Rewrote {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+
+This module provides an on-disk (SQLite) cache of LLM responses so that re-running
+the pipeline on the same day doesn't re-bill every provider for the same question.
+
+Entries are keyed by a hash of the provider, model, system prompt, question and
+temperature, expire after a TTL, and the least recently used entries are evicted
+once the cache grows past its maximum size.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from models import DEFAULT_TEMPERATURE
+
+# Default cache location, next to this script
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "responses.sqlite")
+
+# Entries older than this are ignored (12 hours, so the next daily run always asks again)
+DEFAULT_TTL = 12 * 60 * 60
+
+# Maximum number of entries kept before the least recently used ones are evicted
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def cache_key(provider: str, model: str, system_prompt: str, question: str,
+              temperature: Optional[float] = DEFAULT_TEMPERATURE) -> str:
+    """
+    Build the content-addressed key for a request.
+
+    Returns:
+        A hex SHA-256 digest of the request parameters
+    """
+    payload = json.dumps([provider, model, system_prompt, question, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with a TTL and LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, refresh: bool = False):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache)
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of entries kept on disk
+            refresh: If True, never read from the cache but still store new responses
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key built with cache_key()
+
+        Returns:
+            The cached response dictionary, or None if missing, expired or refreshing
+        """
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, provider: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response, evicting expired and least recently used entries if needed.
+
+        Args:
+            key: Key built with cache_key()
+            provider: The LLM provider, kept for inspection and clear()
+            response: The response dictionary (must be JSON serialisable)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self, provider: Optional[str] = None) -> None:
+        """Remove every entry, or only those of one provider."""
+        with self._lock:
+            if provider is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE provider = ?", (provider,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit and miss counts for run statistics."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(no_cache: bool = False, refresh: bool = False, path: str = DEFAULT_CACHE_PATH) -> Optional[ResponseCache]:
+    """
+    Open the response cache according to command line switches and the environment.
+
+    The RESPONSE_CACHE environment variable can be set to "off" (same as no_cache)
+    or "refresh" (same as refresh), which is handy for test runners without flags.
+
+    Args:
+        no_cache: Don't use the cache at all
+        refresh: Ignore cached entries but store the new responses
+        path: SQLite database file
+
+    Returns:
+        The cache, or None if caching is disabled
+    """
+    mode = os.environ.get("RESPONSE_CACHE", "").strip().lower()
+    if no_cache or mode == "off":
+        return None
+    return ResponseCache(path, refresh=refresh or mode == "refresh")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Run Journal for Resumable Daily Runs
+
+This module keeps a write-ahead log per run (python/.journal/<run id>.jsonl).
+Every provider response is appended (and fsynced) as soon as it arrives, before
+it is committed to the CSV files, and each commit is appended after it is done.
+
+When update_csv.py is restarted after a crash, the journal tells it which
+providers already answered (their responses are replayed instead of asking
+again) and which were already committed (skipped), so only what actually
+failed is redone. Once a run is complete, the next run with the same id starts
+a fresh journal.
+
+Entries, one JSON object per line:
+    {"type": "start", "run_id": ..., "date": ...}
+    {"type": "response", "provider": ..., "result": {...}}
+    {"type": "commit", "provider": ...}
+    {"type": "complete"}
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Set
+
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".journal")
+
+
+class RunJournal:
+    """
+    The journal of one run.
+
+    Args:
+        run_id: The run id (update_csv.py uses the date, so a rerun the same day resumes)
+        date: The date the run writes rows for; kept from the journal when resuming
+        journal_dir: Directory with the journal files
+    """
+
+    def __init__(self, run_id: str, date: str, journal_dir: str = JOURNAL_DIR):
+        self.run_id = run_id
+        self.date = date
+        self.path = os.path.join(journal_dir, f"{run_id}.jsonl")
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self.committed: Set[str] = set()
+        self.complete = False
+        self.resumed = False
+        self._lock = threading.RLock()
+
+        os.makedirs(journal_dir, exist_ok=True)
+        self._load()
+        if self.complete:
+            # The previous run with this id finished; start over
+            self._archive()
+            self.date = date
+        if not os.path.exists(self.path):
+            self._append({"type": "start", "run_id": run_id, "date": date})
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                continue
+            kind = entry.get("type")
+            if kind == "start":
+                self.date = entry["date"]
+            elif kind == "response":
+                self.responses[entry["provider"]] = entry["result"]
+            elif kind == "commit":
+                self.committed.add(entry["provider"])
+            elif kind == "complete":
+                self.complete = True
+        self.resumed = bool(self.responses) and not self.complete
+
+    def _archive(self) -> None:
+        os.replace(self.path, self.path[:-len(".jsonl")] + ".done.jsonl")
+        self.responses.clear()
+        self.committed.clear()
+        self.complete = False
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def record_response(self, result: Dict[str, Any]) -> None:
+        """Log a provider's result before it is committed; results already logged are ignored."""
+        provider = result["llm"]
+        with self._lock:
+            if provider in self.responses:
+                return
+            self.responses[provider] = result
+        self._append({"type": "response", "provider": provider, "result": result})
+
+    def record_commit(self, provider: str) -> None:
+        """Log that a provider's rows were written to its CSV file."""
+        self.committed.add(provider)
+        self._append({"type": "commit", "provider": provider})
+
+    def mark_complete(self) -> None:
+        """Log that the run finished."""
+        self.complete = True
+        self._append({"type": "complete"})
+
+
+def open_journal(run_id: str, date: str, journal_dir: Optional[str] = None) -> RunJournal:
+    """
+    Open the journal for a run, resuming it if an earlier attempt didn't finish.
+
+    Args:
+        run_id: The run id
+        date: The date to write rows for if this is a new run
+        journal_dir: Directory with the journal files (defaults to python/.journal)
+
+    Returns:
+        The RunJournal
+    """
+    return RunJournal(run_id, date, journal_dir or JOURNAL_DIR)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Sharded Daily Runs
+
+Splits the model catalogue across N processes or CI matrix jobs. Each shard asks
+its share of the providers and writes a partial result file instead of touching
+public/data/; a merge step (update_csv.py --merge) then commits every partial
+file in one CSV transaction:
+
+    uv run python update_csv.py --shard 1/4 --partial-dir partial   # on each of 4 workers
+    uv run python update_csv.py --merge partial                     # once, after all of them
+
+Providers are dealt round-robin in catalogue order, so shards stay balanced as
+the catalogue grows. Shards that may run on either side of midnight should be
+given the same --date, since the merge only accepts partials for one date.
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import generate_llm_responses
+from response_cache import ResponseCache
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard given as "index/count", e.g. "2/4" (the index starts at 1).
+
+    Raises:
+        ValueError: If the value isn't a valid shard
+    """
+    index, separator, count = value.partition("/")
+    if not separator or not index.isdigit() or not count.isdigit() or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Expected a shard like 2/4, got {value!r}")
+    return int(index), int(count)
+
+
+def select_shard(providers: List[str], index: int, count: int) -> List[str]:
+    """Get the providers of one shard (index starts at 1)."""
+    return providers[index - 1::count]
+
+
+def partial_path(directory: str, index: int, count: int) -> str:
+    """Path of a shard's partial result file."""
+    return os.path.join(directory, f"shard-{index}-of-{count}.json")
+
+
+def run_shard(index: int, count: int, directory: str, cache: Optional[ResponseCache] = None,
+              stream: bool = False, early_exit: bool = False, date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ask one shard's providers and write their results to a partial file.
+
+    Args:
+        index: The shard, starting at 1
+        count: Number of shards
+        directory: Directory for the partial files
+        cache: Optional response cache
+        stream: Stream the responses
+        early_exit: Stop each stream once the evaluator has a verdict
+        date: The date the rows are for (defaults to today)
+
+    Returns:
+        The partial: "date", "shard", "providers" (asked) and "results" (successful ones)
+    """
+    enabled = [p for p in generate_llm_responses.MODELS if not p.startswith("#")]
+    providers = select_shard(enabled, index, count)
+    results = generate_llm_responses.generate(cache=cache, stream=stream, early_exit=early_exit,
+                                              providers=providers) if providers else []
+
+    partial = {
+        "date": date or datetime.now().strftime("%Y-%m-%d"),
+        "shard": [index, count],
+        "providers": providers,
+        "results": results
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = partial_path(directory, index, count)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(partial, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    os.replace(tmp_path, path)
+    return partial
+
+
+def read_partials(directory: str) -> Dict[str, Any]:
+    """
+    Read every shard's partial file for the merge step.
+
+    Args:
+        directory: Directory with the partial files (searched recursively, so
+            downloaded CI artifacts can be used as they are)
+
+    Returns:
+        Dictionary with the "date", the combined "results" and the "missing" shard indexes
+
+    Raises:
+        ValueError: If there are no partial files, or they disagree on the date or shard count
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "**", "shard-*-of-*.json"), recursive=True))
+    if not paths:
+        raise ValueError(f"No partial results in {directory}")
+
+    partials = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            partials.append(json.load(file))
+
+    dates = {partial["date"] for partial in partials}
+    counts = {partial["shard"][1] for partial in partials}
+    if len(dates) > 1 or len(counts) > 1:
+        raise ValueError(f"Partial results in {directory} are from different runs")
+
+    count = counts.pop()
+    present = {partial["shard"][0] for partial in partials}
+    return {
+        "date": dates.pop(),
+        "results": [result for partial in sorted(partials, key=lambda p: p["shard"][0])
+                    for result in partial["results"]],
+        "missing": [index for index in range(1, count + 1) if index not in present]
+    }
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Aggregate Summary of LLM Responses
+
+This module maintains public/data/summary.json, a precomputed summary of every
+provider's history: running accuracy (overall and per resolved model string),
+current and longest correct streaks, and the dates when the answer or the model
+version changed.
+
+Each new row updates the summary in O(1). To let a same-day rerun replace its
+rows, the provider's state from before the last date (with the length of the
+change log instead of a copy of it) is kept alongside it.
+"""
+
+import copy
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from csv_store import DATA_DIR, CsvStore
+
+SUMMARY_FILENAME = "summary.json"
+SUMMARY_VERSION = 1
+
+
+def summary_path(data_dir: str = DATA_DIR) -> str:
+    """Get the summary file path."""
+    return os.path.join(data_dir, SUMMARY_FILENAME)
+
+
+def _is_true(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Get the aggregate for a provider without any rows."""
+    return {
+        "rows": 0,
+        "correct": 0,
+        "accuracy": None,
+        "first_date": None,
+        "last_date": None,
+        "last_answer": None,
+        "last_model": None,
+        "last_correct": None,
+        "current_streak": 0,
+        "longest_streak": 0,
+        "models": {},
+        "changes": [],
+        "before_last_date": None
+    }
+
+
+def apply_row(stats: Dict[str, Any], date: str, row: Dict[str, Any]) -> None:
+    """
+    Fold one row into a provider's aggregate in O(1).
+
+    Args:
+        stats: The provider aggregate (modified in place)
+        date: The row's date in YYYY-MM-DD format
+        row: Row with "answer", "model" and "correct" keys
+    """
+    answer = row["answer"]
+    model = row["model"]
+    correct = _is_true(row["correct"])
+
+    if stats["rows"]:
+        if answer != stats["last_answer"]:
+            stats["changes"].append({"date": date, "kind": "answer", "from": stats["last_answer"], "to": answer})
+        if model != stats["last_model"]:
+            stats["changes"].append({"date": date, "kind": "model", "from": stats["last_model"], "to": model})
+    else:
+        stats["first_date"] = date
+
+    stats["rows"] += 1
+    stats["correct"] += correct
+    stats["accuracy"] = round(stats["correct"] / stats["rows"], 4)
+    stats["last_date"] = date
+    stats["last_answer"] = answer
+    stats["last_model"] = model
+    stats["last_correct"] = correct
+
+    stats["current_streak"] = stats["current_streak"] + 1 if correct else 0
+    stats["longest_streak"] = max(stats["longest_streak"], stats["current_streak"])
+
+    model_stats = stats["models"].setdefault(model, {
+        "rows": 0, "correct": 0, "accuracy": None, "first_date": date, "last_date": date
+    })
+    model_stats["rows"] += 1
+    model_stats["correct"] += correct
+    model_stats["accuracy"] = round(model_stats["correct"] / model_stats["rows"], 4)
+    model_stats["last_date"] = date
+
+
+def apply_date(stats: Dict[str, Any], date: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fold a date's rows into a provider's aggregate, replacing them if the date is the last one.
+
+    Args:
+        stats: The provider aggregate
+        date: The date in YYYY-MM-DD format (not older than the last date)
+        rows: Rows with "answer", "model" and "correct" keys
+
+    Returns:
+        The updated aggregate
+    """
+    if stats["last_date"] == date:
+        # Same-day rerun: go back to the state before this date's rows
+        changes = stats["changes"]
+        before = stats["before_last_date"]
+        stats = copy.deepcopy(before)
+        stats["changes"] = changes[:before["changes"]]
+    elif stats["last_date"] is not None and date < stats["last_date"]:
+        raise ValueError(f"Cannot apply {date} after {stats['last_date']}; rebuild the summary instead")
+
+    # Snapshot everything but the change log, which is only ever appended to
+    before = {key: copy.deepcopy(value) for key, value in stats.items() if key not in ("changes", "before_last_date")}
+    before["changes"] = len(stats["changes"])
+    before["before_last_date"] = None
+    stats["before_last_date"] = before
+
+    for row in rows:
+        apply_row(stats, date, row)
+    return stats
+
+
+def build_stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a provider aggregate from its full history (rows in file order)."""
+    stats = empty_stats()
+    # Group consecutive rows of the same date
+    i = 0
+    while i < len(rows):
+        date = rows[i]["date"]
+        j = i
+        while j < len(rows) and rows[j]["date"] == date:
+            j += 1
+        if stats["last_date"] is not None and date < stats["last_date"]:
+            # Out of order history: fold it in without same-day bookkeeping
+            for row in rows[i:j]:
+                apply_row(stats, date, row)
+        else:
+            stats = apply_date(stats, date, rows[i:j])
+        i = j
+    return stats
+
+
+def load_summary(data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """Load the summary file, or an empty summary if it doesn't exist."""
+    try:
+        with open(summary_path(data_dir), encoding="utf-8") as file:
+            summary = json.load(file)
+        if summary.get("version") == SUMMARY_VERSION:
+            return summary
+    except (OSError, ValueError):
+        pass
+    return {"version": SUMMARY_VERSION, "providers": {}}
+
+
+def save_summary(summary: Dict[str, Any], data_dir: str = DATA_DIR) -> None:
+    """Write the summary file atomically."""
+    path = summary_path(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    os.replace(tmp_path, path)
+
+
+def update_summary(summary: Dict[str, Any], llm: str, date: str, rows: List[Dict[str, Any]],
+                   expected_rows: Optional[int] = None, data_dir: str = DATA_DIR) -> str:
+    """
+    Update a provider's aggregate after its rows for a date were upserted into the CSV.
+
+    The aggregate is rebuilt from the CSV instead when it is missing, its row count
+    doesn't match what the CSV had before the upsert, or the date is older than
+    the last one.
+
+    Args:
+        summary: The loaded summary (modified in place; save it with save_summary)
+        llm: The provider
+        date: The date in YYYY-MM-DD format
+        rows: Rows with "answer", "model" and "correct" keys
+        expected_rows: Row count of the CSV before the upsert
+        data_dir: Directory with the CSV files
+
+    Returns:
+        "updated" or "rebuilt"
+    """
+    providers = summary["providers"]
+    stats = providers.get(llm)
+
+    in_sync = stats is not None and (expected_rows is None or stats["rows"] == expected_rows)
+    if not in_sync or (stats["last_date"] is not None and date < stats["last_date"]):
+        providers[llm] = build_stats(CsvStore(llm, data_dir).read_rows())
+        return "rebuilt"
+
+    providers[llm] = apply_date(stats, date, rows)
+    return "updated"
+
+
+def rebuild_summary(llms: List[str], data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """Rebuild and save the summary for the given providers from their CSV files."""
+    summary = load_summary(data_dir)
+    for llm in llms:
+        summary["providers"][llm] = build_stats(CsvStore(llm, data_dir).read_rows())
+    save_summary(summary, data_dir)
+    return summary
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the backfill script.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import batch_runner
+from backfill import backfill, find_missing_dates, plan_backfill
+from columnar import ColumnarHistory, columnar_path
+from csv_store import DATA_DIR, CsvStore
+from summary import load_summary
+
+
+def row(answer="Gulf of Mexico", model="model-1", correct=True):
+    return {"answer": answer, "model": model, "correct": correct}
+
+
+class TestBackfill(unittest.TestCase):
+    """Test cases for finding and filling missing dates."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = CsvStore("openai", data_dir=self.tmp.name)
+        self.store.upsert("2025-03-01", [row()])
+        self.store.upsert("2025-03-04", [row()])
+
+    def test_find_missing_dates(self):
+        """Test gaps inside the file and up to the end date."""
+        self.assertEqual(find_missing_dates("openai", end="2025-03-06", data_dir=self.tmp.name),
+                         ["2025-03-02", "2025-03-03", "2025-03-05", "2025-03-06"])
+        self.assertEqual(find_missing_dates("openai", "2025-03-03", "2025-03-04", self.tmp.name), ["2025-03-03"])
+        self.assertEqual(find_missing_dates("anthropic", data_dir=self.tmp.name), [])
+
+        self.assertEqual(plan_backfill(["openai"], "2025-03-01", "2025-03-02", replay=True, data_dir=self.tmp.name),
+                         {"openai": ["2025-03-01", "2025-03-02"]})
+        with self.assertRaises(ValueError):
+            plan_backfill(["openai"], replay=True, data_dir=self.tmp.name)
+
+    def test_backfill_fills_gaps_and_records_them(self):
+        """Test that answers land under their dates, are recorded as backfilled and the derived files are rebuilt."""
+        with mock.patch.object(batch_runner, "get_model_response",
+                               return_value={"answer": "Gulf of Mexico", "model": "model-2"}):
+            stats = backfill(["openai"], end="2025-03-03", rate_limits={"openai": 1000}, data_dir=self.tmp.name)
+
+        self.assertEqual(stats["written"], {"openai": 2})
+        self.assertEqual([r["date"] for r in self.store.read_rows()],
+                         ["2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04"])
+        with open(os.path.join(self.tmp.name, "backfilled.json"), encoding="utf-8") as file:
+            self.assertEqual(sorted(json.load(file)["openai"]), ["2025-03-02", "2025-03-03"])
+        with ColumnarHistory(columnar_path("openai", self.tmp.name)) as history:
+            self.assertEqual(len(history), 4)
+        self.assertEqual(load_summary(self.tmp.name)["providers"]["openai"]["rows"], 4)
+
+    def test_pinned_model_writes_to_a_separate_directory(self):
+        """Test that pinned answers go to the output directory in date order, leaving the CSV alone."""
+        output = os.path.join(self.tmp.name, "replay")
+        asked = []
+
+        def get_model_response(provider, model_info, question, system_prompt):
+            asked.append(model_info["name"])
+            if len(asked) == 2:
+                raise RuntimeError("provider down")
+            return {"answer": "Gulf of America", "model": model_info["name"] + "-resolved"}
+
+        with mock.patch.object(batch_runner, "get_model_response", side_effect=get_model_response):
+            stats = backfill(["openai"], end="2025-03-05", pinned_models={"openai": "gpt-old"},
+                             max_concurrency=1, rate_limits={"openai": 1000}, data_dir=self.tmp.name,
+                             output_dir=output)
+
+        self.assertEqual(asked, ["gpt-old"] * 3)
+        self.assertEqual(stats["plan"], {"openai": ["2025-03-02", "2025-03-03", "2025-03-05"]})
+        self.assertEqual((stats["written"], stats["errors"]), ({"openai": 2}, {"openai": 1}))
+
+        self.assertEqual([r["date"] for r in self.store.read_rows()], ["2025-03-01", "2025-03-04"])
+        rows = CsvStore("openai", data_dir=output).read_rows()
+        self.assertEqual([(r["date"], r["model"]) for r in rows],
+                         [("2025-03-02", "gpt-old-resolved"), ("2025-03-05", "gpt-old-resolved")])
+        with open(os.path.join(output, "backfilled.json"), encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["openai"]["2025-03-02"]["pinned_model"], "gpt-old")
+        self.assertEqual(load_summary(output)["providers"]["openai"]["rows"], 2)
+
+    def test_replay_is_refused_for_the_published_data(self):
+        """Test that replayed or pinned answers can't overwrite the daily observations."""
+        for options in ({"replay": True, "start": "2025-03-01"}, {"pinned_models": {"openai": "gpt-old"}}):
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                backfill(["openai"], dry_run=True, data_dir=self.tmp.name, output_dir=DATA_DIR, **options)
+
+    def test_dry_run(self):
+        """Test that a dry run doesn't ask or write anything."""
+        with mock.patch.object(batch_runner, "get_model_response") as get_model_response:
+            stats = backfill(["openai"], end="2025-03-02", dry_run=True, data_dir=self.tmp.name)
+
+        get_model_response.assert_not_called()
+        self.assertEqual(stats["plan"], {"openai": ["2025-03-02"]})
+        self.assertFalse(os.path.exists(columnar_path("openai", self.tmp.name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
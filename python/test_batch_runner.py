@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch runner module.
+"""
+
+import os
+import types
+import unittest
+from unittest import mock
+
+import batch_runner
+from batch_runner import TokenBucket, build_matrix, percentile, run_batch
+
+
+class FakeClock:
+    """Manual clock for testing the token bucket without sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the TokenBucket rate limiter."""
+
+    def test_burst_then_wait(self):
+        """Test that the bucket allows a burst up to capacity and then waits."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 0.5)
+        self.assertAlmostEqual(clock.now, 0.5)
+
+    def test_refill_is_capped(self):
+        """Test that idle time doesn't accumulate more than capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=1, clock=clock, sleep=clock.sleep)
+
+        clock.now = 100.0
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 1.0)
+
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestHelpers(unittest.TestCase):
+    """Test cases for the matrix and percentile helpers."""
+
+    def test_build_matrix(self):
+        """Test that the matrix covers every combination with providers interleaved."""
+        jobs = build_matrix(["q1", "q2"], 2, ["a", "b"])
+
+        self.assertEqual(len(jobs), 8)
+        self.assertEqual([job["llm"] for job in jobs[:4]], ["a", "b", "a", "b"])
+        self.assertEqual(jobs[-1], {"llm": "b", "prompt_index": 1, "prompt": "q2", "sample": 1})
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [0.5, 0.1, 0.4, 0.2, 0.3]
+        self.assertEqual(percentile(values, 50), 0.3)
+        self.assertEqual(percentile(values, 95), 0.5)
+        self.assertEqual(percentile(values, 0), 0.1)
+        self.assertIsNone(percentile([], 50))
+
+
+class TestRunBatch(unittest.TestCase):
+    """Test cases for run_batch."""
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"FAKE_API_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_run_batch_report(self):
+        """Test that every job runs and the report counts answers and errors."""
+        def mexico(model, system_prompt, prompt):
+            return "Gulf of Mexico", model
+
+        def flaky(model, system_prompt, prompt):
+            if "fail" in prompt:
+                raise RuntimeError("boom")
+            return "Gulf of America", model
+
+        models = {
+            "good": {"module": types.SimpleNamespace(ask=mexico), "name": "good-1", "env_var": "FAKE_API_KEY"},
+            "bad": {"module": types.SimpleNamespace(ask=flaky), "name": "bad-1", "env_var": "FAKE_API_KEY"},
+        }
+        with mock.patch.object(batch_runner, "MODELS", models):
+            batch = run_batch(["ok", "fail"], samples=3, rate_limits={"good": 1000, "bad": 1000})
+
+        self.assertEqual(batch["requests"], 12)
+        self.assertEqual(len(batch["results"]), 12)
+
+        good = batch["report"]["good"]
+        self.assertEqual((good["requests"], good["errors"], good["correct"]), (6, 0, 6))
+        self.assertEqual(good["accuracy"], 1.0)
+        self.assertIsNotNone(good["latency_p95"])
+
+        bad = batch["report"]["bad"]
+        self.assertEqual((bad["requests"], bad["errors"], bad["correct"]), (6, 3, 0))
+        self.assertEqual(bad["accuracy"], 0.0)
+
+    def test_rate_limited_provider_does_not_hold_slots(self):
+        """Test that a provider waiting for its rate limit doesn't starve the others."""
+        def ask(model, system_prompt, prompt):
+            return "Gulf of Mexico", model
+
+        models = {
+            provider: {"module": types.SimpleNamespace(ask=ask), "name": provider, "env_var": "FAKE_API_KEY"}
+            for provider in ("slow", "fast")
+        }
+        with mock.patch.object(batch_runner, "MODELS", models):
+            batch = run_batch(samples=10, rate_limits={"slow": 5, "fast": 1000}, max_concurrency=2)
+
+        def finished(provider):
+            return max(r["started"] + r["latency"] for r in batch["results"] if r["llm"] == provider)
+
+        self.assertEqual(len(batch["results"]), 20)
+        self.assertEqual([(r["llm"], r["sample"]) for r in batch["results"][:4]],
+                         [("slow", 0), ("fast", 0), ("slow", 1), ("fast", 1)])
+        # The slow provider needs about a second for its ten requests
+        self.assertLess(finished("fast"), finished("slow") - 0.5)
+
+    def test_dispatch_error_becomes_a_result(self):
+        """Test that a job that can't be dispatched is reported as an error instead of breaking the batch."""
+        acquire = TokenBucket.acquire
+        calls = []
+
+        def failing_acquire(bucket, tokens=1.0):
+            calls.append(tokens)
+            if len(calls) == 2:
+                raise RuntimeError("clock went backwards")
+            return acquire(bucket, tokens)
+
+        def ask(model, system_prompt, prompt):
+            return "Gulf of Mexico", model
+
+        models = {"only": {"module": types.SimpleNamespace(ask=ask), "name": "only-1", "env_var": "FAKE_API_KEY"}}
+        with mock.patch.object(batch_runner, "MODELS", models), \
+                mock.patch.object(TokenBucket, "acquire", failing_acquire):
+            batch = run_batch(samples=3, rate_limits={"only": 1000})
+
+        self.assertEqual([r.get("error") for r in batch["results"]], [None, "clock went backwards", None])
+        self.assertEqual(batch["report"]["only"]["errors"], 1)
+
+    def test_unknown_provider(self):
+        """Test that asking for an unconfigured provider fails early."""
+        with self.assertRaises(ValueError):
+            run_batch(providers=["nope"])
+
+
+if __name__ == "__main__":
+    unittest.main()
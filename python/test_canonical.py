@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for canonical answer forms and the cluster table.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from canonical import ClusterTable, canonical_form, load_clusters, save_clusters
+from columnar import ColumnarHistory, columnar_path, rebuild_columnar
+from csv_store import CsvStore
+
+
+class TestCanonicalForm(unittest.TestCase):
+    """Test cases for canonical_form."""
+
+    def test_near_duplicates_share_a_form(self):
+        """Test case, punctuation, articles, accents and whitespace."""
+        for answer in ("The Gulf of Mexico.", "Gulf of Mexico", "the gulf of méxico", "  GULF  of Mexico!\n"):
+            self.assertEqual(canonical_form(answer), "gulf of mexico")
+        self.assertEqual(canonical_form("El Golfo de México"), "golfo de mexico")
+        self.assertEqual(canonical_form("Le golfe du Mexique"), "golfe du mexique")
+        self.assertEqual(canonical_form("Gulf of America"), "gulf of america")
+        self.assertEqual(canonical_form("..."), "")
+
+
+class TestClusterTable(unittest.TestCase):
+    """Test cases for ClusterTable and its file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_ids_are_stable(self):
+        """Test that ids are assigned once and survive a save/load round trip."""
+        table = ClusterTable()
+        self.assertEqual(table.assign("The Gulf of Mexico.", "2025-03-02"), 0)
+        self.assertEqual(table.assign("Gulf of America", "2025-03-02"), 1)
+        self.assertEqual(table.assign("Gulf of Mexico", "2025-03-01"), 0)
+        save_clusters(table, self.tmp.name)
+
+        loaded = load_clusters(self.tmp.name)
+        self.assertFalse(loaded.changed)
+        self.assertEqual(loaded.lookup("gulf of MEXICO"), 0)
+        self.assertIsNone(loaded.lookup("Golfo de México"))
+        self.assertEqual(loaded.assign("Golfo de México"), 2)
+        self.assertEqual(loaded.clusters[0], {"id": 0, "form": "gulf of mexico", "first_date": "2025-03-01",
+                                              "answers": ["The Gulf of Mexico.", "Gulf of Mexico"]})
+        self.assertEqual((loaded.label(0), loaded.form(1)), ("The Gulf of Mexico.", "gulf of america"))
+
+    def test_unreadable_table_is_not_replaced(self):
+        """Test that only a missing file gives an empty table, so ids are never silently renumbered."""
+        self.assertEqual(len(load_clusters(self.tmp.name)), 0)
+        path = os.path.join(self.tmp.name, "canonical.json")
+        for content in ("{not json", json.dumps({"version": 99, "clusters": []}), "[]"):
+            with self.subTest(content=content):
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(content)
+                with self.assertRaises(ValueError):
+                    load_clusters(self.tmp.name)
+
+    def test_ids_are_shared_across_providers(self):
+        """Test that columnar files of different providers store the same ids for the same form."""
+        for llm, answers in (("a", ["The Gulf of Mexico.", "Gulf of America"]), ("b", ["gulf of america."])):
+            store = CsvStore(llm, self.tmp.name)
+            for day, answer in enumerate(answers, start=1):
+                store.upsert(f"2025-03-0{day}", [{"answer": answer, "model": "m", "correct": True}])
+            rebuild_columnar(llm, self.tmp.name)
+
+        with ColumnarHistory(columnar_path("a", self.tmp.name)) as a, \
+                ColumnarHistory(columnar_path("b", self.tmp.name)) as b:
+            self.assertEqual((list(a.canonical), list(b.canonical)), ([0, 1], [1]))
+        self.assertEqual(len(load_clusters(self.tmp.name)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
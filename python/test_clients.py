@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the chat client registry.
+"""
+
+import unittest
+
+from models import clients
+from models.clients import get_client, close_clients
+
+
+class FakeSDKClient:
+    """Stand-in for an SDK client that records whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeChat:
+    """Stand-in for a LangChain chat class."""
+
+    instances = 0
+
+    def __init__(self, **kwargs):
+        FakeChat.instances += 1
+        self.kwargs = kwargs
+        self.root_client = FakeSDKClient()
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test cases for get_client and close_clients."""
+
+    def setUp(self):
+        FakeChat.instances = 0
+        self.addCleanup(close_clients)
+
+    def test_client_is_reused(self):
+        """Test that the same key returns the same client instance."""
+        first = get_client("fake", FakeChat, "model-a", temperature=0.7)
+        second = get_client("fake", FakeChat, "model-a", temperature=0.7)
+
+        self.assertIs(first, second)
+        self.assertEqual(FakeChat.instances, 1)
+        self.assertEqual(first.kwargs, {"model": "model-a", "temperature": 0.7})
+
+    def test_key_includes_model_temperature_and_params(self):
+        """Test that different models, temperatures or params get separate clients."""
+        base = get_client("fake", FakeChat, "model-a", temperature=0.7)
+        other_model = get_client("fake", FakeChat, "model-b", temperature=0.7)
+        other_temperature = get_client("fake", FakeChat, "model-a", temperature=0.2)
+        other_params = get_client("fake", FakeChat, "model-a", temperature=0.7,
+                                  extra_body={"reasoning_effort": "none"})
+        same_params = get_client("fake", FakeChat, "model-a", temperature=0.7,
+                                 extra_body={"reasoning_effort": "none"})
+
+        self.assertEqual(len({id(base), id(other_model), id(other_temperature), id(other_params)}), 4)
+        self.assertIs(other_params, same_params)
+
+    def test_shared_http_pool(self):
+        """Test that clients sharing the pool get the same HTTP client."""
+        first = get_client("fake", FakeChat, "model-a", share_http_pool=True)
+        second = get_client("fake", FakeChat, "model-b", share_http_pool=True)
+
+        self.assertIs(first.kwargs["http_client"], second.kwargs["http_client"])
+        self.assertIs(first.kwargs["http_client"], clients.shared_http_client())
+
+    def test_close_clients(self):
+        """Test that closing releases SDK clients and empties the registry."""
+        first = get_client("fake", FakeChat, "model-a", share_http_pool=True)
+        http_client = first.kwargs["http_client"]
+
+        close_clients()
+
+        self.assertTrue(first.root_client.closed)
+        self.assertTrue(http_client.is_closed)
+        self.assertIsNot(get_client("fake", FakeChat, "model-a"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar history format.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from canonical import load_clusters
+from columnar import (FORMAT_VERSION, ColumnarHistory, columnar_path, columnar_rows, pack_bits, update_columnar,
+                      write_columnar)
+from csv_store import CsvStore
+
+ROWS = [
+    {"date": "2025-03-01", "answer": "The Gulf of Mexico.", "model": "gpt-4o", "correct": "true"},
+    {"date": "2025-03-01", "answer": "The Gulf of Mexico.", "model": "gpt-4o", "correct": "true"},
+    {"date": "2025-03-02", "answer": "Golfo de México", "model": "gpt-4o", "correct": "true"},
+    {"date": "2025-04-10", "answer": "The Gulf of America.", "model": "gpt-5", "correct": "false"},
+]
+
+
+class TestColumnar(unittest.TestCase):
+    """Test cases for writing and reading columnar files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_round_trip(self):
+        """Test that rows survive a write/read round trip with dictionary encoding."""
+        path = os.path.join(self.tmp.name, "test.gcol")
+        write_columnar(path, ROWS)
+
+        with ColumnarHistory(path) as history:
+            self.assertEqual(len(history), 4)
+            self.assertEqual(history.models, ["gpt-4o", "gpt-5"])
+            self.assertEqual(history.answers, ["The Gulf of Mexico.", "Golfo de México", "The Gulf of America."])
+            self.assertEqual(list(history.day), [0, 0, 1, 40])
+            self.assertEqual(list(history.answer), [0, 0, 1, 2])
+            self.assertEqual([row["correct"] for row in history], [True, True, True, False])
+            self.assertEqual(history.row(3), {
+                "date": "2025-04-10", "answer": "The Gulf of America.", "model": "gpt-5", "correct": False
+            })
+            self.assertEqual(list(history.canonical), [0, 0, 1, 2])
+
+    def test_empty_history(self):
+        """Test writing and reading a file without rows."""
+        path = os.path.join(self.tmp.name, "empty.gcol")
+        write_columnar(path, [])
+
+        with ColumnarHistory(path) as history:
+            self.assertEqual(len(history), 0)
+            self.assertEqual(list(history), [])
+
+    def test_rejects_other_files(self):
+        """Test that a file without the magic number is rejected."""
+        path = os.path.join(self.tmp.name, "bad.gcol")
+        with open(path, "wb") as file:
+            file.write(b"date,answer,model,correct\r\n")
+
+        with self.assertRaises(ValueError):
+            ColumnarHistory(path)
+
+    def test_pack_bits(self):
+        """Test that bits are packed least significant bit first."""
+        self.assertEqual(pack_bits([True, False, False, False, False, False, False, False, True]), b"\x01\x01")
+        self.assertEqual(pack_bits([]), b"")
+
+    def test_update_follows_csv_upserts(self):
+        """Test that update_columnar mirrors CSV appends and same-day replacements."""
+        store = CsvStore("test", data_dir=self.tmp.name)
+        path = columnar_path("test", self.tmp.name)
+
+        for date, answer in [("2025-03-01", "a"), ("2025-03-02", "b"), ("2025-03-02", "c")]:
+            rows = [{"answer": answer, "model": "m", "correct": True}]
+            rows_before = store.load_index()["row_count"]
+            store.upsert(date, rows)
+            update_columnar("test", date, rows, expected_rows=rows_before, data_dir=self.tmp.name)
+
+        with ColumnarHistory(path) as history:
+            self.assertEqual([(r["date"], r["answer"]) for r in history], [("2025-03-01", "a"), ("2025-03-02", "c")])
+            self.assertEqual([history.canonical_id(i) for i in range(len(history))], [0, 2])
+
+        # Every answer seen gets a cluster, shared with later rebuilds
+        clusters = load_clusters(self.tmp.name)
+        self.assertEqual([clusters.form(i) for i in range(len(clusters))], ["a", "b", "c"])
+
+    def test_stale_file_is_rebuilt_from_csv(self):
+        """Test that a columnar file out of sync with the CSV is rebuilt."""
+        store = CsvStore("test", data_dir=self.tmp.name)
+        store.upsert("2025-03-01", [{"answer": "a", "model": "m", "correct": True}])
+        write_columnar(columnar_path("test", self.tmp.name), [])
+
+        rows = [{"answer": "b", "model": "m", "correct": False}]
+        store.upsert("2025-03-02", rows)
+        action = update_columnar("test", "2025-03-02", rows, expected_rows=1, data_dir=self.tmp.name)
+
+        self.assertEqual(action, "rebuilt")
+        with ColumnarHistory(columnar_path("test", self.tmp.name)) as history:
+            self.assertEqual([r["answer"] for r in history], ["a", "b"])
+
+    def test_stale_file_is_not_loaded(self):
+        """Test that the row count is checked from the preamble before the file's string tables are loaded."""
+        path = columnar_path("test", self.tmp.name)
+        write_columnar(path, ROWS[:1])
+        self.assertEqual(columnar_rows(path), 1)
+        with open(path, "r+b") as file:
+            file.seek(4)
+            file.write((FORMAT_VERSION - 1).to_bytes(2, "little"))
+        self.assertIsNone(columnar_rows(path))
+
+        store = CsvStore("test", data_dir=self.tmp.name)
+        store.upsert("2025-03-01", [{"answer": "a", "model": "m", "correct": True}])
+        write_columnar(path, ROWS)
+        rows = [{"answer": "b", "model": "m", "correct": False}]
+        store.upsert("2025-03-02", rows)
+        with mock.patch("columnar.ColumnarHistory", side_effect=AssertionError("stale file loaded")):
+            action = update_columnar("test", "2025-03-02", rows, expected_rows=1, data_dir=self.tmp.name)
+
+        self.assertEqual(action, "rebuilt")
+        self.assertEqual(columnar_rows(path), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
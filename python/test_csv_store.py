@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the CSV store module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from csv_store import CsvStore, CsvTransaction, iter_records
+
+
+def row(answer, model="model-1", correct=True):
+    return {"answer": answer, "model": model, "correct": correct}
+
+
+class TestCsvStore(unittest.TestCase):
+    """Test cases for CsvStore upserts and its sidecar index."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = CsvStore("test", data_dir=self.tmp.name)
+
+    def read(self):
+        with open(self.store.csv_path, "rb") as file:
+            return file.read()
+
+    def test_create_and_append(self):
+        """Test that the first upsert writes the header and new dates are appended."""
+        self.assertEqual(self.store.upsert("2025-03-01", [row("Gulf of Mexico")]), "created")
+        self.assertEqual(self.store.upsert("2025-03-02", [row("Gulf of America", correct=False)]), "appended")
+
+        self.assertEqual(self.read(), (
+            b"date,answer,model,correct\r\n"
+            b"2025-03-01,Gulf of Mexico,model-1,true\r\n"
+            b"2025-03-02,Gulf of America,model-1,false\r\n"
+        ))
+        index = self.store.load_index()
+        self.assertEqual((index["row_count"], index["last_date"], index["tail_rows"]), (2, "2025-03-02", 1))
+
+    def test_same_date_is_replaced(self):
+        """Test that upserting the last date again replaces its rows instead of duplicating."""
+        self.store.upsert("2025-03-01", [row("Gulf of Mexico")])
+        self.store.upsert("2025-03-02", [row("first"), row("second")])
+        self.assertEqual(self.store.upsert("2025-03-02", [row("Gulf of Mexico")]), "replaced")
+
+        rows = self.store.read_rows()
+        self.assertEqual([(r["date"], r["answer"]) for r in rows],
+                         [("2025-03-01", "Gulf of Mexico"), ("2025-03-02", "Gulf of Mexico")])
+        self.assertEqual(self.store.load_index()["row_count"], 2)
+
+    def test_older_date_is_rewritten_in_order(self):
+        """Test that an older date is inserted in date order."""
+        self.store.upsert("2025-03-01", [row("a")])
+        self.store.upsert("2025-03-03", [row("c")])
+        self.assertEqual(self.store.upsert("2025-03-02", [row("b")]), "rewritten")
+
+        self.assertEqual([r["answer"] for r in self.store.read_rows()], ["a", "b", "c"])
+        self.assertEqual(self.store.load_index()["last_date"], "2025-03-03")
+        self.assertEqual(self.store.upsert("2025-03-04", [row("d")]), "appended")
+
+    def test_quoted_answers(self):
+        """Test answers with commas, quotes and newlines."""
+        answer = 'The "Gulf of Mexico",\nalso called Golfo de México'
+        self.store.upsert("2025-03-01", [row(answer)])
+        self.store.upsert("2025-03-02", [row(answer)])
+        self.store.rebuild_index()
+        self.store.upsert("2025-03-02", [row("short")])
+
+        self.assertEqual([r["answer"] for r in self.store.read_rows()], [answer, "short"])
+
+    def test_stale_index_is_rebuilt(self):
+        """Test that edits made without the store are detected."""
+        self.store.upsert("2025-03-01", [row("a")])
+        with open(self.store.csv_path, "ab") as file:
+            file.write(b"2025-03-05,e,model-1,true\r\n")
+
+        self.assertEqual(self.store.last_date(), "2025-03-05")
+        self.assertEqual(self.store.upsert("2025-03-05", [row("f")]), "replaced")
+        self.assertEqual([r["answer"] for r in self.store.read_rows()], ["a", "f"])
+
+    def test_index_file(self):
+        """Test the sidecar index contents."""
+        self.store.upsert("2025-03-01", [row("a")])
+        with open(self.store.index_path, encoding="utf-8") as file:
+            index = json.load(file)
+
+        self.assertEqual(index["csv_size"], os.path.getsize(self.store.csv_path))
+        self.assertEqual(index["tail_offset"], len(b"date,answer,model,correct\r\n"))
+
+    def test_missing_trailing_newline(self):
+        """Test appending to a file whose last line has no line ending."""
+        with open(self.store.csv_path, "wb") as file:
+            file.write(b"date,answer,model,correct\r\n2025-03-01,a,model-1,true")
+
+        self.store.upsert("2025-03-02", [row("b")])
+        self.assertEqual([r["answer"] for r in self.store.read_rows()], ["a", "b"])
+
+
+class TestCsvTransaction(unittest.TestCase):
+    """Test cases for committing several providers together."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.stores = {llm: CsvStore(llm, data_dir=self.tmp.name) for llm in ("a", "b", "c")}
+        for store in self.stores.values():
+            store.upsert("2025-03-01", [row("old")])
+
+    def snapshot(self):
+        return {llm: (store.read_rows(), store.load_index()) for llm, store in self.stores.items()}
+
+    def test_commit_writes_each_file_once(self):
+        """Test buffered rows for several dates and providers, with one fsync per file."""
+        with mock.patch("csv_store.os.fsync") as fsync:
+            with CsvTransaction(self.tmp.name) as transaction:
+                transaction.upsert("a", "2025-03-02", [row("x")])
+                transaction.upsert("a", "2025-03-03", [row("y")])
+                transaction.upsert("a", "2025-03-03", [row("z")])
+                transaction.upsert("b", "2025-03-01", [row("new")])
+                transaction.upsert("c", "2025-02-28", [row("older")])
+                self.assertEqual(self.stores["a"].read_rows()[-1]["answer"], "old")
+
+        self.assertEqual(fsync.call_count, 3)
+        self.assertEqual([(r["date"], r["answer"]) for r in self.stores["a"].read_rows()],
+                         [("2025-03-01", "old"), ("2025-03-02", "x"), ("2025-03-03", "y"), ("2025-03-03", "z")])
+        self.assertEqual([r["answer"] for r in self.stores["b"].read_rows()], ["new"])
+        self.assertEqual([r["answer"] for r in self.stores["c"].read_rows()], ["older", "old"])
+
+        index = self.stores["a"].load_index()
+        self.assertEqual(index, self.stores["a"].rebuild_index())
+        self.assertEqual((index["row_count"], index["tail_rows"]), (4, 2))
+
+    def test_failed_commit_rolls_back(self):
+        """Test that a failing write leaves every file as it was, including the one that failed."""
+        before = self.snapshot()
+        original_apply = CsvStore.apply
+
+        def apply(store, plan):
+            if store.llm == "b":
+                # Truncated partway through the write
+                with open(store.csv_path, "r+b") as file:
+                    file.seek(plan["offset"])
+                    file.truncate()
+                    file.write(plan["data"][:5])
+                raise OSError("disk full")
+            original_apply(store, plan)
+
+        transaction = CsvTransaction(self.tmp.name)
+        transaction.upsert("a", "2025-03-02", [row("x")])
+        transaction.upsert("b", "2025-03-01", [row("new")])
+        transaction.upsert("c", "2025-03-02", [row("y")])
+        with mock.patch.object(CsvStore, "apply", apply):
+            with self.assertRaises(OSError):
+                transaction.commit()
+
+        self.assertEqual(self.snapshot(), before)
+
+
+class TestIterRecords(unittest.TestCase):
+    """Test cases for iter_records."""
+
+    def test_offsets(self):
+        """Test that records keep quoted newlines and report byte offsets."""
+        data = b'h\r\n2025,"a\r\nb",m,true\r\n2026,c,m,true\r\n'
+        records = list(iter_records(data))
+
+        self.assertEqual([offset for offset, _ in records], [0, 3, 23])
+        self.assertEqual(records[1][1], b'2025,"a\r\nb",m,true\r\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the change-point and drift detector.
+"""
+
+import tempfile
+import unittest
+
+from canonical import ClusterTable
+from csv_store import CsvStore
+from drift import (REFERENCE_DAYS, apply_date, build_state, empty_state, load_alerts, save_alerts,
+                   update_drift, z_score)
+
+
+def row(answer="Gulf of Mexico", model="m1", correct=True):
+    return {"answer": answer, "model": model, "correct": correct}
+
+
+def dates(count, start=1):
+    return [f"2025-03-{day:02d}" for day in range(start, start + count)]
+
+
+class TestDetector(unittest.TestCase):
+    """Test cases for folding dates into a provider's detector state."""
+
+    def setUp(self):
+        self.clusters = ClusterTable()
+        self.state = empty_state()
+
+    def feed(self, days, rows):
+        alerts = []
+        for date in days:
+            alerts.extend(apply_date(self.state, date, rows, self.clusters, "openai"))
+        return alerts
+
+    def test_flip_is_reported_once(self):
+        """Test that a lasting flip raises one accuracy and one answer alert."""
+        self.assertEqual(self.feed(dates(10), [row(), row("The Gulf of Mexico.")]), [])
+        alerts = self.feed(dates(4, start=11), [row("Gulf of America", correct=False)] * 2)
+
+        self.assertEqual([(a["date"], a["kind"]) for a in alerts],
+                         [("2025-03-12", "accuracy"), ("2025-03-12", "answer")])
+        accuracy, answer = alerts
+        self.assertEqual((accuracy["since"], accuracy["from"], accuracy["to"]), ("2025-03-10", 1.0, 0.3333))
+        self.assertLess(accuracy["z"], -3)
+        self.assertEqual((answer["from"], answer["to"]), ("Gulf of Mexico", "Gulf of America"))
+
+    def test_single_miss_and_rewording_are_quiet(self):
+        """Test that one wrong day and reworded answers don't raise alerts."""
+        self.feed(dates(10), [row()])
+        self.assertEqual(self.feed(["2025-03-11"], [row("Gulf of America", correct=False)]), [])
+        self.assertEqual(self.feed(dates(3, start=12), [row("the gulf of méxico!")]), [])
+
+    def test_model_change(self):
+        """Test that a new resolved model string is reported right away."""
+        self.feed(dates(2), [row()])
+        alerts = self.feed(["2025-03-03"], [row(model="m2")])
+        self.assertEqual(alerts, [{"date": "2025-03-03", "llm": "openai", "kind": "model", "from": "m1", "to": "m2"}])
+
+    def test_state_stays_bounded(self):
+        """Test that the windows keep a fixed number of days."""
+        self.feed([f"2025-{month:02d}-{day:02d}" for month in (3, 4, 5) for day in range(1, 29)], [row()])
+        self.assertEqual(len(self.state["reference"]["days"]), REFERENCE_DAYS)
+        self.assertEqual(self.state["rows"], 84)
+
+    def test_same_day_rerun_and_rebuild(self):
+        """Test that rerunning a date replaces it and incremental updates match a rebuild."""
+        self.feed(dates(10), [row()])
+        self.feed(["2025-03-11"], [row("Gulf of America", model="m2", correct=False)])
+        alerts = self.feed(["2025-03-11"], [row()])
+
+        self.assertEqual(alerts, [])
+        history = [{"date": date, **row()} for date in dates(11)]
+        self.assertEqual(self.state, build_state(history, ClusterTable(), "openai"))
+        with self.assertRaises(ValueError):
+            apply_date(self.state, "2025-03-01", [row()], self.clusters)
+
+    def test_z_score(self):
+        """Test the two-proportion z statistic and its undefined cases."""
+        self.assertIsNone(z_score(10, 10, 3, 3))
+        self.assertIsNone(z_score(0, 0, 1, 1))
+        self.assertAlmostEqual(z_score(14, 14, 1, 3), -3.252, places=3)
+
+
+class TestDriftFiles(unittest.TestCase):
+    """Test cases for updating from the CSV files and writing alerts."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_out_of_sync_state_is_rebuilt(self):
+        """Test that a missing state is rebuilt and only the date's alerts are returned."""
+        store = CsvStore("openai", data_dir=self.tmp.name)
+        for date in dates(10):
+            store.upsert(date, [row()])
+        store.upsert("2025-03-11", [row(model="m2")])
+
+        drift = {"providers": {}}
+        alerts = update_drift(drift, ClusterTable(), "openai", "2025-03-11", [row(model="m2")],
+                              expected_rows=10, data_dir=self.tmp.name)
+        self.assertEqual([a["kind"] for a in alerts], ["model"])
+        self.assertEqual(drift["providers"]["openai"]["rows"], 11)
+
+    def test_alert_log(self):
+        """Test that each run writes its alerts and a rerun replaces them in the log."""
+        first = {"date": "2025-03-01", "llm": "openai", "kind": "model", "from": "m1", "to": "m2"}
+        second = {**first, "date": "2025-03-02", "to": "m3"}
+        save_alerts("2025-03-01", [first], self.tmp.name)
+        save_alerts("2025-03-02", [second], self.tmp.name)
+        save_alerts("2025-03-02", [], self.tmp.name)
+
+        alerts = load_alerts(self.tmp.name)
+        self.assertEqual((alerts["date"], alerts["alerts"], alerts["log"]), ("2025-03-02", [], [first]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,11 @@
 Tests for the evaluator module.
 """
 
+import json
+import os
+import tempfile
 import unittest
-from evaluator import evaluate
+from evaluator import evaluate, early_verdict, load_rules, normalize_text, RULES, RULES_VERSION
 
 class TestEvaluator(unittest.TestCase):
     """Test cases for the evaluate function in the evaluator module."""
@@ -64,6 +67,87 @@ class TestEvaluator(unittest.TestCase):
         # With California and America
         self.assertFalse(evaluate("The Gulf of California is in North America"))
 
+    def test_other_languages(self):
+        """Test the per-language variants of the rules."""
+        self.assertTrue(evaluate("Golfo de México"))
+        self.assertTrue(evaluate("Le golfe du Mexique"))
+        self.assertTrue(evaluate("Golf von Mexiko"))
+        self.assertFalse(evaluate("Golfo de América"))
+        self.assertFalse(evaluate("Golfe d'Amérique"))
+        self.assertFalse(evaluate("Golf von Amerika"))
+
+    def test_unicode_normalisation(self):
+        """Test that accents and case don't matter."""
+        self.assertTrue(evaluate("GOLFO DE MÉXICO"))
+        self.assertTrue(evaluate("Gulf of Me\u0301xico"))  # Combining accent
+        self.assertFalse(evaluate("Gulf of AMÉRICA"))
+        self.assertEqual(normalize_text("Golfo de MÉXICO"), "golfo de mexico")
+
+    def test_word_boundaries(self):
+        """Test that terms match whole words, and reject prefixes match derived words."""
+        self.assertFalse(evaluate("Mexicoland Bay"))
+        self.assertTrue(evaluate("**Gulf of Mexico**"))
+        self.assertTrue(evaluate("Mexico's gulf"))
+        self.assertFalse(evaluate("The American Gulf, near Mexico"))
+        self.assertFalse(evaluate("The Americas' gulf by Mexico"))
+
+
+class TestRules(unittest.TestCase):
+    """Test cases for loading and compiling the rules file."""
+
+    def write_rules(self, config):
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8")
+        self.addCleanup(os.remove, tmp.name)
+        json.dump(config, tmp)
+        tmp.close()
+        return tmp.name
+
+    def test_default_rules_are_versioned(self):
+        """Test that the default rules expose their version."""
+        self.assertEqual(RULES_VERSION, RULES.version)
+        self.assertTrue(RULES_VERSION)
+        self.assertIn("en", RULES.languages)
+
+    def test_custom_rules(self):
+        """Test evaluating with a custom rules file and language selection."""
+        path = self.write_rules({
+            "version": "test-1",
+            "languages": {
+                "en": {"accept": ["gulf of mexico"], "reject": ["america*"]},
+                "es": {"accept": ["golfo de mexico"], "reject": []}
+            }
+        })
+        english = load_rules(path, languages=["en"])
+        both = load_rules(path)
+
+        self.assertEqual(english.version, "test-1")
+        self.assertTrue(evaluate("The Gulf  of Mexico", english))
+        self.assertFalse(evaluate("Mexico", english))
+        self.assertFalse(evaluate("Golfo de México", english))
+        self.assertTrue(evaluate("Golfo de México", both))
+
+        with self.assertRaises(ValueError):
+            load_rules(path, languages=["fr"])
+
+    def test_scan_stops_at_reject(self):
+        """Test that scan reports accept and reject terms."""
+        self.assertEqual(RULES.scan("gulf of mexico"), (True, False))
+        self.assertEqual(RULES.scan("gulf of america"), (False, True))
+        self.assertEqual(RULES.scan("atlantic ocean"), (False, False))
+
+    def test_early_verdict(self):
+        """Test deciding on partial answers while they stream."""
+        # Not enough text yet
+        self.assertIsNone(early_verdict(""))
+        self.assertIsNone(early_verdict("The Gulf of"))
+        # An accept term never decides, since a later reject term would change the verdict
+        self.assertIsNone(early_verdict("The Gulf of Mexico"))
+        self.assertIsNone(early_verdict("The Gulf of Mexico."))
+        self.assertIsNone(early_verdict("Gulf of Mexico, which the U."))
+        # A reject term decides straight away, even after an accept term
+        self.assertFalse(early_verdict("The Gulf of America"))
+        self.assertFalse(early_verdict("The Gulf of Mexico (or Gulf of America"))
+
 
 if __name__ == "__main__":
     unittest.main()
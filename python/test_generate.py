@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the generate function in the generate_llm_responses module.
+"""
+
+import os
+import subprocess
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+
+import generate_llm_responses
+from generate_llm_responses import generate, resolve_module
+from response_cache import ResponseCache
+
+
+def fake_module(answer: str, delay: float = 0.0, error: Exception = None):
+    """Build a stand-in model module whose ask() sleeps and then answers."""
+    def ask(model, system_prompt, prompt):
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return answer, f"{model}-resolved"
+    return types.SimpleNamespace(ask=ask)
+
+
+def fake_models(**modules):
+    """Build a MODELS table from provider -> fake module."""
+    return {
+        provider: {"module": module, "name": f"{provider}-model", "env_var": "FAKE_API_KEY"}
+        for provider, module in modules.items()
+    }
+
+
+class TestGenerate(unittest.TestCase):
+    """Test cases for the generate function."""
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"FAKE_API_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_results_keep_models_order(self):
+        """Test that results come back in MODELS order, not completion order."""
+        models = fake_models(
+            slow=fake_module("Gulf of Mexico", delay=0.2),
+            fast=fake_module("Gulf of America"),
+        )
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate()
+
+        self.assertEqual([r["llm"] for r in results], ["slow", "fast"])
+        self.assertEqual(results[0], {
+            "llm": "slow",
+            "model": "slow-model-resolved",
+            "answer": "Gulf of Mexico",
+            "correct": True
+        })
+        self.assertFalse(results[1]["correct"])
+
+    def test_providers_run_concurrently(self):
+        """Test that the run takes about as long as the slowest provider."""
+        models = fake_models(**{
+            f"p{i}": fake_module("Gulf of Mexico", delay=0.2) for i in range(4)
+        })
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            started = time.monotonic()
+            results = generate()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(results), 4)
+        self.assertLess(elapsed, 0.6)
+
+    def test_serial_mode(self):
+        """Test that concurrent=False still returns every provider."""
+        models = fake_models(a=fake_module("Gulf of Mexico"), b=fake_module("Gulf of Mexico"))
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate(concurrent=False)
+
+        self.assertEqual([r["llm"] for r in results], ["a", "b"])
+
+    def test_timeout_is_reported_as_error(self):
+        """Test that a provider exceeding its timeout becomes an error entry."""
+        models = fake_models(
+            hung=fake_module("Gulf of Mexico", delay=0.5),
+            ok=fake_module("Gulf of Mexico"),
+        )
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate(include_errors=True, timeout=0.1)
+            without_errors = generate(timeout=0.1)
+
+        self.assertEqual([r["llm"] for r in results], ["hung", "ok"])
+        self.assertIn("error", results[0])
+        self.assertIn("did not respond", results[0]["error"])
+        self.assertNotIn("error", results[1])
+        self.assertEqual([r["llm"] for r in without_errors], ["ok"])
+
+    def test_late_answer_is_not_reported(self):
+        """Test that a provider answering after its timeout doesn't reach on_result."""
+        models = fake_models(
+            hung=fake_module("Gulf of Mexico", delay=0.3),
+            ok=fake_module("Gulf of Mexico"),
+        )
+        reported = []
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate(include_errors=True, timeout=0.1, on_result=reported.append)
+            time.sleep(0.4)
+
+        self.assertIn("error", results[0])
+        self.assertEqual([r["llm"] for r in reported], ["ok"])
+
+    def test_provider_error(self):
+        """Test that a failing provider doesn't affect the others."""
+        models = fake_models(
+            broken=fake_module("", error=RuntimeError("boom")),
+            ok=fake_module("Gulf of Mexico"),
+        )
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate(include_errors=True)
+
+        self.assertEqual(results[0]["error"], "boom")
+        self.assertIn("RuntimeError", results[0]["stack_trace"])
+        self.assertTrue(results[1]["correct"])
+
+    def test_cached_responses_skip_the_provider(self):
+        """Test that a second run with the same cache doesn't call the provider."""
+        calls = []
+
+        def ask(model, system_prompt, prompt):
+            calls.append(model)
+            return "Gulf of Mexico", model
+
+        models = fake_models(cached=types.SimpleNamespace(ask=ask))
+        cache = ResponseCache(":memory:")
+        self.addCleanup(cache.close)
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            first = generate(cache=cache)
+            second = generate(cache=cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+class TestProviderRegistry(unittest.TestCase):
+    """Test cases for lazily resolving provider modules."""
+
+    def test_resolve_module(self):
+        """Test resolving module names, dotted paths and module objects."""
+        module = types.SimpleNamespace(ask=None)
+        self.assertIs(resolve_module({"module": module}), module)
+        self.assertIs(resolve_module({"module": "clients"}), sys.modules["models.clients"])
+        self.assertIs(resolve_module({"module": "models.clients"}), sys.modules["models.clients"])
+
+    def test_sdks_are_not_imported_eagerly(self):
+        """Test that importing the generator doesn't load any vendor SDK."""
+        code = ("import sys, generate_llm_responses; "
+                "print(any(name.startswith('langchain') for name in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
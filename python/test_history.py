@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact history loader.
+"""
+
+import tempfile
+import unittest
+
+from columnar import rebuild_columnar
+from csv_store import CsvStore
+from history import History, InternTable, load_histories, load_history
+
+
+class TestInternTable(unittest.TestCase):
+    """Test cases for InternTable."""
+
+    def test_intern(self):
+        """Test that equal values share a code."""
+        table = InternTable()
+        self.assertEqual(table.intern("Gulf of Mexico"), 0)
+        self.assertEqual(table.intern("Gulf of America"), 1)
+        self.assertEqual(table.intern("Gulf of Mexico"), 0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[1], "Gulf of America")
+        self.assertIsNone(table.code("Caribbean Sea"))
+
+
+class TestHistory(unittest.TestCase):
+    """Test cases for History and the loaders."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for llm, model in (("a", "model-a"), ("b", "model-b")):
+            store = CsvStore(llm, data_dir=self.tmp.name)
+            store.upsert("2025-03-01", [{"answer": "The Gulf of Mexico.", "model": model, "correct": True}])
+            store.upsert("2025-03-02", [{"answer": "The Gulf of Mexico.", "model": model, "correct": True}])
+            store.upsert("2025-03-03", [{"answer": "Gulf of America", "model": model + "-2", "correct": False}])
+
+    def test_rows_are_codes(self):
+        """Test that rows store codes and decode back to the original values."""
+        history = History("test")
+        history.append("2025-03-01", "Gulf of Mexico", "m", True)
+        history.append("2025-03-02", "Gulf of Mexico", "m", False)
+
+        self.assertEqual(list(history.answer_codes), [0, 0])
+        self.assertEqual(history[1].as_dict(),
+                         {"date": "2025-03-02", "answer": "Gulf of Mexico", "model": "m", "correct": False})
+        self.assertEqual(history[-1].date, "2025-03-02")
+        with self.assertRaises(IndexError):
+            history[2]
+        with self.assertRaises(AttributeError):
+            history[0].extra = 1
+
+    def test_grouping(self):
+        """Test counting and filtering by answer and model."""
+        history = load_history("a", data_dir=self.tmp.name)
+
+        self.assertEqual(history.count_by("answer"), {"The Gulf of Mexico.": 2, "Gulf of America": 1})
+        self.assertEqual(history.count_by("model"), {"model-a": 2, "model-a-2": 1})
+        self.assertEqual(history.rows_with("answer", "Gulf of America"), [2])
+        self.assertEqual(history.rows_with("model", "unknown"), [])
+        with self.assertRaises(ValueError):
+            history.count_by("date")
+
+    def test_shared_intern_tables(self):
+        """Test that histories loaded together share their tables."""
+        histories = load_histories(data_dir=self.tmp.name)
+
+        self.assertEqual(sorted(histories), ["a", "b"])
+        self.assertIs(histories["a"].answers, histories["b"].answers)
+        self.assertEqual(len(histories["a"].answers), 2)
+        self.assertEqual(histories["a"].answer_codes[0], histories["b"].answer_codes[0])
+
+    def test_columnar_and_csv_agree(self):
+        """Test that loading from the columnar file gives the same rows as the CSV."""
+        rebuild_columnar("a", data_dir=self.tmp.name)
+
+        from_columnar = load_history("a", data_dir=self.tmp.name)
+        from_csv = load_history("a", data_dir=self.tmp.name, use_columnar=False)
+        self.assertEqual([r.as_dict() for r in from_columnar], [r.as_dict() for r in from_csv])
+
+    def test_stale_columnar_falls_back_to_csv(self):
+        """Test that a columnar file behind the CSV is ignored."""
+        rebuild_columnar("a", data_dir=self.tmp.name)
+        CsvStore("a", data_dir=self.tmp.name).upsert(
+            "2025-03-04", [{"answer": "Gulf of Mexico", "model": "model-a", "correct": True}])
+
+        self.assertEqual(len(load_history("a", data_dir=self.tmp.name)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
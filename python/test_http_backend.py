@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the direct HTTP backend, against a local stand-in server.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import generate_llm_responses
+from generate_llm_responses import generate
+from models import http_backend
+from models.instrumentation import measure_request, reset_records
+from models.resilience import reset_breakers
+
+# Canned responses per path, in each vendor's wire format
+RESPONSES = {
+    "/chat/completions": {
+        "model": "gpt-test-2026",
+        "choices": [{"message": {"role": "assistant", "content": "Gulf of Mexico"}}],
+        "usage": {"prompt_tokens": 30, "completion_tokens": 4}
+    },
+    "/v1/messages": {
+        "model": "claude-test-2026",
+        "content": [{"type": "thinking", "thinking": "..."}, {"type": "text", "text": "Gulf of Mexico"}],
+        "usage": {"input_tokens": 31, "output_tokens": 5}
+    },
+    "/v1beta/models/gemini-test:generateContent": {
+        "candidates": [{"content": {"parts": [{"text": "...", "thought": True}, {"text": "Gulf of Mexico"}]}}],
+        "usageMetadata": {"promptTokenCount": 32, "candidatesTokenCount": 6}
+    }
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answers with the canned response for the path, failing first if asked to."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, dict(self.headers), body))
+
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = json.dumps(RESPONSES[self.path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpBackend(unittest.TestCase):
+    """Test cases for ask() and ask_async()."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.requests = []
+        cls.server.failures = 0
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        http_backend.close()
+
+    def setUp(self):
+        self.server.requests.clear()
+        self.server.failures = 0
+        reset_breakers()
+        reset_records()
+        self.addCleanup(reset_breakers)
+        self.addCleanup(reset_records)
+
+    def test_openai_compatible(self):
+        """Test the OpenAI wire format and that xAI turns reasoning off."""
+        answer, model_used = http_backend.ask("openai", "gpt-test", "Be concise.", "Question?",
+                                              url=self.url, api_key="key")
+        self.assertEqual((answer, model_used), ("Gulf of Mexico", "gpt-test-2026"))
+
+        path, headers, body = self.server.requests[0]
+        self.assertEqual(path, "/chat/completions")
+        self.assertEqual(headers["Authorization"], "Bearer key")
+        self.assertEqual(body["messages"][0], {"role": "system", "content": "Be concise."})
+
+        http_backend.ask("xai", "grok-test", "Be concise.", "Question?", url=self.url, api_key="key")
+        self.assertEqual(self.server.requests[1][2]["reasoning_effort"], "none")
+
+    def test_anthropic_and_google(self):
+        """Test the Anthropic and Gemini wire formats, skipping thinking blocks."""
+        self.assertEqual(
+            http_backend.ask("anthropic", "claude-test", "Be concise.", "Question?", url=self.url, api_key="key"),
+            ("Gulf of Mexico", "claude-test"))
+        self.assertEqual(
+            http_backend.ask("google", "gemini-test", "Be concise.", "Question?", url=self.url, api_key="key"),
+            ("Gulf of Mexico", "gemini-test"))
+
+        self.assertEqual(self.server.requests[0][1]["x-api-key"], "key")
+        self.assertEqual(self.server.requests[0][2]["system"], "Be concise.")
+        self.assertEqual(self.server.requests[1][1]["x-goog-api-key"], "key")
+
+    def test_async_with_retry_and_usage(self):
+        """Test ask_async() retrying a 503 and recording token usage."""
+        self.server.failures = 1
+
+        async def run():
+            with measure_request("openai", "gpt-test") as record:
+                result = await http_backend.ask_async("openai", "gpt-test", "Be concise.", "Question?",
+                                                      url=self.url, api_key="key")
+            await http_backend.aclose()
+            return result, record
+
+        (answer, _), record = asyncio.run(run())
+        self.assertEqual(answer, "Gulf of Mexico")
+        self.assertEqual(record["attempts"], 2)
+        self.assertEqual((record["input_tokens"], record["output_tokens"]), (30, 4))
+
+    def test_base_url_from_environment(self):
+        """Test the <API>_BASE_URL override and the missing key error."""
+        with mock.patch.dict(os.environ, {"ANTHROPIC_BASE_URL": self.url + "/"}):
+            self.assertEqual(http_backend.base_url("anthropic"), self.url)
+        self.assertEqual(http_backend.base_url("openai", "http://override"), "http://override")
+
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            with self.assertRaises(ValueError):
+                http_backend.ask("openai", "gpt-test", "Be concise.", "Question?", url=self.url)
+
+    def test_generate_with_http_backend(self):
+        """Test selecting the backend from a MODELS entry."""
+        models = {"fake": {"api": "openai", "backend": "http", "base_url": self.url,
+                           "name": "gpt-test", "env_var": "OPENAI_API_KEY"}}
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "key"}), \
+                mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate()
+
+        self.assertEqual(results, [{"llm": "fake", "model": "gpt-test-2026", "answer": "Gulf of Mexico",
+                                    "correct": True}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request instrumentation.
+"""
+
+import json
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import generate_llm_responses
+from generate_llm_responses import generate
+from models.instrumentation import (estimate_cost, extract_usage, measure_request, record_usage,
+                                    request_records, reset_records, summarize_records, to_openmetrics,
+                                    write_jsonl)
+from models.resilience import call_with_resilience, reset_breakers
+
+
+class TransientError(Exception):
+    status_code = 503
+
+
+def message(usage_metadata=None, response_metadata=None):
+    """Build a stand-in LangChain message."""
+    return types.SimpleNamespace(content="Gulf of Mexico", usage_metadata=usage_metadata,
+                                 response_metadata=response_metadata or {})
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for measuring requests."""
+
+    def setUp(self):
+        reset_records()
+        reset_breakers()
+        self.addCleanup(reset_records)
+        self.addCleanup(reset_breakers)
+
+    def test_extract_usage(self):
+        """Test reading token counts from the standard and provider-specific metadata."""
+        self.assertEqual(extract_usage(message({"input_tokens": 10, "output_tokens": 3})), (10, 3))
+        self.assertEqual(extract_usage(message(response_metadata={
+            "token_usage": {"prompt_tokens": 12, "completion_tokens": 4}})), (12, 4))
+        self.assertEqual(extract_usage(message(response_metadata={
+            "usage": {"input_tokens": 7, "output_tokens": 2}})), (7, 2))
+        self.assertEqual(extract_usage(message()), (None, None))
+
+    def test_estimate_cost(self):
+        """Test estimating cost from prices per million tokens."""
+        self.assertAlmostEqual(estimate_cost(1000, 100, {"input": 3.0, "output": 15.0}), 0.0045)
+        self.assertIsNone(estimate_cost(1000, 100, None))
+        self.assertIsNone(estimate_cost(None, None, {"input": 3.0, "output": 15.0}))
+
+    def test_measure_request_with_retries(self):
+        """Test that attempts, retry waits and usage end up in the measurement."""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise TransientError("unavailable")
+            return message({"input_tokens": 1000, "output_tokens": 100})
+
+        with measure_request("fake", "fake-model", {"input": 3.0, "output": 15.0}) as record:
+            response = call_with_resilience("fake", flaky, sleep=lambda delay: None, base_delay=0.5)
+            record_usage(response)
+
+        self.assertEqual(record["attempts"], 2)
+        self.assertLessEqual(record["retry_wait"], 0.5)
+        self.assertGreaterEqual(record["wall"], record["invoke"])
+        self.assertEqual((record["input_tokens"], record["output_tokens"]), (1000, 100))
+        self.assertAlmostEqual(record["cost"], 0.0045)
+        self.assertIsNone(record["error"])
+        self.assertEqual(request_records(), [record])
+
+    def test_errors_are_recorded(self):
+        """Test that a failed request is still measured."""
+        with self.assertRaises(RuntimeError):
+            with measure_request("fake", "fake-model"):
+                raise RuntimeError("boom")
+
+        self.assertEqual(request_records()[0]["error"], "RuntimeError")
+
+    def test_usage_outside_a_measurement_is_ignored(self):
+        """Test that model modules can record usage when nothing is being measured."""
+        record_usage(message({"input_tokens": 1, "output_tokens": 1}))
+        self.assertEqual(request_records(), [])
+
+    def test_summary_and_exports(self):
+        """Test aggregating per provider and writing JSON lines and OpenMetrics text."""
+        for tokens in (100, 300):
+            with measure_request("fake", "fake-model", {"input": 1.0, "output": 1.0}):
+                record_usage(message({"input_tokens": tokens, "output_tokens": 0}))
+        records = request_records()
+
+        summary = summarize_records(records)
+        self.assertEqual(summary["fake"]["requests"], 2)
+        self.assertEqual(summary["fake"]["input_tokens"], 400)
+        self.assertAlmostEqual(summary["fake"]["cost"], 0.0004)
+
+        text = to_openmetrics(records)
+        self.assertIn('llm_requests_total{provider="fake"} 2', text)
+        self.assertIn('llm_input_tokens_total{provider="fake"} 400', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            write_jsonl(path, records)
+            write_jsonl(path, records)
+            with open(path, encoding="utf-8") as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0]["provider"], "fake")
+
+    def test_generate_measures_each_provider(self):
+        """Test that generate() leaves one measurement per provider."""
+        def ask(model, system_prompt, prompt):
+            record_usage(message({"input_tokens": 20, "output_tokens": 5}))
+            return "Gulf of Mexico", f"{model}-resolved"
+
+        models = {"fake": {"module": types.SimpleNamespace(ask=ask), "name": "fake-model",
+                           "env_var": "FAKE_API_KEY", "pricing": {"input": 1.0, "output": 2.0}}}
+        with mock.patch.dict(os.environ, {"FAKE_API_KEY": "test"}), \
+                mock.patch.object(generate_llm_responses, "MODELS", models):
+            generate()
+
+        record, = request_records()
+        self.assertEqual(record["model_used"], "fake-model-resolved")
+        self.assertEqual((record["input_tokens"], record["output_tokens"]), (20, 5))
+        self.assertAlmostEqual(record["cost"], 0.00003)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the mock provider server and the benchmark built on it.
+"""
+
+import time
+import unittest
+
+import httpx
+
+from benchmark import find_regressions, run_benchmark
+from mock_server import MockProviderServer
+
+
+class TestMockServer(unittest.TestCase):
+    """Test cases for MockProviderServer."""
+
+    def post(self, server, path, body):
+        return httpx.post(server.url + path, json=body, timeout=5)
+
+    def test_vendor_formats(self):
+        """Test that each endpoint answers in its vendor's format."""
+        with MockProviderServer(answer="Gulf of Mexico") as server:
+            openai = self.post(server, "/chat/completions", {"model": "gpt", "messages": [
+                {"role": "user", "content": "Question?"}]}).json()
+            anthropic = self.post(server, "/v1/messages", {"model": "claude", "messages": []}).json()
+            gemini = self.post(server, "/v1beta/models/gemini:generateContent", {"contents": []}).json()
+            missing = self.post(server, "/unknown", {})
+
+        self.assertEqual(openai["choices"][0]["message"]["content"], "Gulf of Mexico")
+        self.assertGreater(openai["usage"]["prompt_tokens"], 0)
+        self.assertEqual(anthropic["content"][0]["text"], "Gulf of Mexico")
+        self.assertEqual(gemini["candidates"][0]["content"]["parts"][0]["text"], "Gulf of Mexico")
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(server.counts, {"openai:200": 1, "anthropic:200": 1, "gemini:200": 1})
+
+    def test_faults_and_latency(self):
+        """Test the rate limit and error responses and the added latency."""
+        with MockProviderServer(rate_limit_rate=1.0, retry_after=2) as server:
+            limited = self.post(server, "/v1/messages", {})
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited.headers["Retry-After"], "2")
+
+        with MockProviderServer(error_rate=1.0, latency=0.1) as server:
+            started = time.monotonic()
+            failed = self.post(server, "/chat/completions", {})
+            elapsed = time.monotonic() - started
+        self.assertEqual(failed.status_code, 500)
+        self.assertGreaterEqual(elapsed, 0.1)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark."""
+
+    def test_run_benchmark(self):
+        """Test a small run through the HTTP backend, with retried rate limits."""
+        result = run_benchmark([2], [3], providers=["openai", "google"], rate_limit_rate=0.2, seed=1)
+
+        scenario, = result["scenarios"]
+        self.assertEqual(scenario["requests"], 6)
+        self.assertEqual(scenario["errors"], 0)
+        self.assertGreater(scenario["throughput"], 0)
+        self.assertLessEqual(scenario["latency_p50"], scenario["latency_p99"])
+
+    def test_find_regressions(self):
+        """Test flagging scenarios whose throughput dropped too much."""
+        baseline = {"scenarios": [{"concurrency": 8, "samples": 10, "throughput": 100.0}]}
+        current = {"scenarios": [{"concurrency": 8, "samples": 10, "throughput": 70.0}]}
+
+        self.assertEqual(len(find_regressions(current, baseline, 0.2)), 1)
+        self.assertEqual(find_regressions(current, baseline, 0.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
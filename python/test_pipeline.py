@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged pipeline, against the local mock provider server.
+"""
+
+import asyncio
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from batch_runner import build_matrix, summarize
+from benchmark import mock_models
+from mock_server import MockProviderServer
+from models.resilience import reset_breakers
+from pipeline import _Report, run_pipeline, run_pipeline_async, score_batch
+
+RATES = {"openai": 1000, "anthropic": 1000}
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for run_pipeline()."""
+
+    def setUp(self):
+        reset_breakers()
+        self.addCleanup(reset_breakers)
+
+    def test_score_batch(self):
+        """Test normalising content blocks and evaluating them."""
+        self.assertEqual(score_batch([" Gulf of Mexico\n", [{"type": "text", "text": "Gulf of America"}]]),
+                         [("Gulf of Mexico", True), ("Gulf of America", False)])
+
+    def test_end_to_end_with_process_pool(self):
+        """Test fetching from the mock server, scoring in worker processes and writing in batches."""
+        written = []
+        with MockProviderServer(answer="The Gulf of Mexico.") as server, \
+                mock.patch.dict(os.environ, {"OPENAI_API_KEY": "key", "ANTHROPIC_API_KEY": "key"}):
+            batch = run_pipeline(samples=10, models=mock_models(server.url, ["openai", "anthropic"]),
+                                 concurrency=8, rate_limits=RATES, workers=2, write_batch_size=6,
+                                 write=written.append)
+
+        self.assertEqual(batch["requests"], 20)
+        self.assertEqual(batch["results"], [])
+        self.assertEqual(batch["report"]["openai"]["correct"], 10)
+        self.assertEqual(sorted(len(rows) for rows in written), [2, 6, 6, 6])
+        self.assertEqual(batch["write_batches"], 4)
+        self.assertEqual(sorted((r["llm"], r["sample"]) for rows in written for r in rows),
+                         sorted((j["llm"], j["sample"]) for j in build_matrix(["q"], 10, ["openai", "anthropic"])))
+
+    def test_backpressure_and_errors(self):
+        """Test that slow scoring bounds the queue and failed requests are still written."""
+        jobs = build_matrix(["q"], 30, ["openai"])
+        models = {"openai": {"name": "gpt-test", "env_var": "OPENAI_API_KEY"}}
+
+        async def fetch(job, model_info, system_prompt):
+            if job["sample"] == 3:
+                raise RuntimeError("provider down")
+            return "Gulf of Mexico", "gpt-test"
+
+        def slow_score(answers):
+            time.sleep(0.01)
+            return score_batch(answers)
+
+        with ThreadPoolExecutor(max_workers=1) as executor, mock.patch("pipeline.score_batch", slow_score):
+            batch = asyncio.run(run_pipeline_async(jobs, models, concurrency=4, rate_limits={"openai": 1000},
+                                                   workers=1, queue_size=3, score_batch_size=2,
+                                                   fetch=fetch, executor=executor))
+
+        self.assertEqual(batch["requests"], 30)
+        self.assertLessEqual(batch["queue_peak"], 3)
+        self.assertEqual(batch["report"]["openai"]["errors"], 1)
+        self.assertEqual(batch["report"]["openai"]["correct"], 29)
+        self.assertEqual(batch["report"], summarize(batch["results"]))
+
+    def test_report_samples_latencies(self):
+        """Test that the report keeps a bounded sample of latencies and exact counts."""
+        report = _Report(sample_size=10)
+        for i in range(1000):
+            report.add({"llm": "openai", "started": float(i), "latency": 1.0, "correct": i % 2 == 0})
+
+        self.assertEqual(len(report.providers["openai"]["latencies"]), 10)
+        self.assertEqual(report.report()["openai"],
+                         {"requests": 1000, "errors": 0, "correct": 500, "accuracy": 0.5,
+                          "requests_per_second": 1.0, "latency_p50": 1.0, "latency_p95": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
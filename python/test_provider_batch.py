@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests for provider batch submission, against the mock server's fake batch endpoints.
+"""
+
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+import provider_batch
+from mock_server import MockProviderServer
+from models import http_backend
+from models.resilience import reset_breakers
+
+
+class TestProviderBatch(unittest.TestCase):
+    """Test cases for submit, refresh and collect."""
+
+    def setUp(self):
+        self.server = MockProviderServer(batch_polls=2, error_rate=0.25, seed=3).start()
+        self.addCleanup(self.server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.batch_dir = os.path.join(tmp.name, "jobs")
+        self.output = os.path.join(tmp.name, "results.csv")
+        self.models = {
+            "openai": {"name": "gpt-test", "env_var": "OPENAI_API_KEY", "base_url": self.server.url,
+                       "pricing": {"input": 1.0, "output": 2.0}},
+            "anthropic": {"name": "claude-test", "env_var": "ANTHROPIC_API_KEY", "base_url": self.server.url}
+        }
+        env = mock.patch.dict(os.environ, {"OPENAI_API_KEY": "key", "ANTHROPIC_API_KEY": "key"})
+        env.start()
+        self.addCleanup(env.stop)
+        reset_breakers()
+
+    def test_submit_poll_and_collect(self):
+        """Test a job end to end, with failed requests reported as errors."""
+        job = provider_batch.submit(["Question one?", "Question two?"], samples=3, models=self.models,
+                                    batch_dir=self.batch_dir)
+        self.assertEqual({p: s["requests"] for p, s in job["providers"].items()}, {"openai": 6, "anthropic": 6})
+
+        # Not finished after the first poll
+        job = provider_batch.collect(job["id"], self.output, wait=False, batch_dir=self.batch_dir)
+        self.assertEqual({s["status"] for s in job["providers"].values()}, {"submitted"})
+        self.assertFalse(os.path.exists(self.output))
+
+        sleeps = []
+        job = provider_batch.collect(job["id"], self.output, batch_dir=self.batch_dir, sleep=sleeps.append)
+        self.assertEqual(len(sleeps), 1)
+
+        with open(self.output, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 12)
+        answered = [row for row in rows if not row["error"]]
+        self.assertTrue(answered)
+        self.assertTrue(all(row["correct"] == "true" for row in answered))
+        self.assertEqual({row["prompt"] for row in rows}, {"Question one?", "Question two?"})
+
+        openai = job["providers"]["openai"]
+        self.assertEqual(openai["rows"], 6)
+        self.assertGreater(openai["errors"], 0)
+        self.assertEqual(openai["errors"], len([r for r in rows if r["llm"] == "openai" and r["error"]]))
+        self.assertGreater(openai["cost"], 0)
+        self.assertIsNone(job["providers"]["anthropic"]["cost"])
+
+    def test_collect_is_resumable(self):
+        """Test that collected providers aren't downloaded again."""
+        job = provider_batch.submit(samples=2, models=self.models, batch_dir=self.batch_dir)
+        provider_batch.collect(job["id"], batch_dir=self.batch_dir, sleep=lambda _: None)
+
+        with mock.patch.object(provider_batch.OpenAIBatch, "results", side_effect=AssertionError):
+            job = provider_batch.collect(job["id"], self.output, batch_dir=self.batch_dir)
+        self.assertEqual({s["status"] for s in job["providers"].values()}, {"collected"})
+        self.assertTrue(os.path.exists(self.output))
+
+    def test_resume_submission(self):
+        """Test resuming a job whose submission was interrupted, without resubmitting the rest."""
+        with mock.patch.object(provider_batch.AnthropicBatch, "submit", side_effect=ConnectionError("down")):
+            with self.assertRaises(ConnectionError):
+                provider_batch.submit(samples=1, models=self.models, batch_dir=self.batch_dir)
+
+        job_id, = [name[:-5] for name in os.listdir(self.batch_dir) if name.endswith(".json")]
+        job = provider_batch.load_job(job_id, self.batch_dir)
+        self.assertEqual(job["providers"]["anthropic"]["status"], "pending")
+        with self.assertRaises(ValueError):
+            provider_batch.collect(job_id, batch_dir=self.batch_dir)
+
+        openai_batch = job["providers"]["openai"]["batch_id"]
+        job = provider_batch.submit(job_id=job_id, batch_dir=self.batch_dir)
+        self.assertEqual(job["providers"]["openai"]["batch_id"], openai_batch)
+        self.assertEqual(job["providers"]["anthropic"]["status"], "submitted")
+        self.assertEqual(len(self.server.batches), 2)
+
+    def test_timed_out_create_is_not_resubmitted(self):
+        """Test that a batch created by a request that timed out is found instead of created again."""
+        client = http_backend.sync_client()
+        post = client.post
+
+        def timing_out_post(url, *args, **kwargs):
+            response = post(url, *args, **kwargs)
+            if url.endswith("batches"):
+                raise httpx.ReadTimeout("timed out")
+            return response
+
+        with mock.patch.object(client, "post", side_effect=timing_out_post):
+            with self.assertRaises(httpx.ReadTimeout):
+                provider_batch.submit(samples=1, models=self.models, batch_dir=self.batch_dir)
+            job_id, = [name[:-5] for name in os.listdir(self.batch_dir) if name.endswith(".json")]
+            with self.assertRaises(httpx.ReadTimeout):
+                provider_batch.submit(job_id=job_id, batch_dir=self.batch_dir)
+
+        job = provider_batch.submit(job_id=job_id, batch_dir=self.batch_dir)
+        self.assertEqual(len(self.server.batches), 2)
+        self.assertEqual(sorted(s["batch_id"] for s in job["providers"].values()), sorted(self.server.batches))
+
+    def test_batch_that_does_not_complete(self):
+        """Test that expired and failed batches are marked failed, keeping any results they produced."""
+        for status, collected in (("expired", 1), ("failed", 0)):
+            with self.subTest(status=status):
+                self.server.batch_status = status
+                job = provider_batch.submit(samples=1, providers=["openai"], models=self.models,
+                                            batch_dir=self.batch_dir)
+                job = provider_batch.collect(job["id"], self.output, batch_dir=self.batch_dir,
+                                             sleep=lambda _: None)
+                openai = job["providers"]["openai"]
+                self.assertEqual((openai["status"], openai["remote_status"]), ("failed", status))
+                self.assertEqual(openai["rows"], collected)
+                with open(self.output, newline="", encoding="utf-8") as file:
+                    self.assertEqual(len(list(csv.DictReader(file))), collected)
+
+    def test_other_jobs_batch_is_rejected(self):
+        """Test that a message batch matched by creation time and size is rejected if it isn't this job's."""
+        client = http_backend.sync_client()
+        post = client.post
+        url = f"{self.server.url}/v1/messages/batches"
+        params = {"model": "claude-test", "max_tokens": 16, "messages": [{"role": "user", "content": "Hi"}]}
+
+        def someone_elses_batch(request_url, *args, **kwargs):
+            if request_url == url:
+                # Our create times out before reaching the server, while another job creates one
+                post(url, headers=kwargs["headers"], json={"requests": [
+                    {"custom_id": f"other-{i}", "params": params} for i in range(2)]})
+                raise httpx.ReadTimeout("timed out")
+            return post(request_url, *args, **kwargs)
+
+        with mock.patch.object(client, "post", side_effect=someone_elses_batch):
+            with self.assertRaises(httpx.ReadTimeout):
+                provider_batch.submit(samples=2, providers=["anthropic"], models=self.models,
+                                      batch_dir=self.batch_dir)
+        job_id, = [name[:-5] for name in os.listdir(self.batch_dir) if name.endswith(".json")]
+        other, = self.server.batches
+
+        job = provider_batch.submit(job_id=job_id, batch_dir=self.batch_dir)
+        self.assertEqual(job["providers"]["anthropic"]["batch_id"], other)
+        with self.assertRaises(ValueError):
+            provider_batch.collect(job_id, self.output, batch_dir=self.batch_dir, sleep=lambda _: None)
+        job = provider_batch.load_job(job_id, self.batch_dir)
+        self.assertEqual(job["providers"]["anthropic"]["status"], "pending")
+
+        job = provider_batch.submit(job_id=job_id, batch_dir=self.batch_dir)
+        self.assertNotEqual(job["providers"]["anthropic"]["batch_id"], other)
+        job = provider_batch.collect(job_id, self.output, batch_dir=self.batch_dir, sleep=lambda _: None)
+        self.assertEqual(job["providers"]["anthropic"]["status"], "collected")
+        with open(self.output, newline="", encoding="utf-8") as file:
+            self.assertEqual([row["sample"] for row in csv.DictReader(file)], ["0", "1"])
+
+    def test_providers_use_their_own_keys(self):
+        """Test that disabled providers are skipped and a provider's key never falls back to the vendor's."""
+        models = {**self.models,
+                  "#local": {"name": "llama-test", "api": "openai", "env_var": "LOCAL_API_KEY",
+                             "base_url": "http://localhost:1"},
+                  "proxy": {"name": "gpt-test", "api": "openai", "env_var": "PROXY_API_KEY",
+                            "base_url": self.server.url}}
+        with mock.patch.dict(os.environ, {"PROXY_API_KEY": "proxy-key"}):
+            job = provider_batch.submit(samples=1, models=models, batch_dir=self.batch_dir)
+            self.assertEqual(list(job["providers"]), ["openai", "anthropic", "proxy"])
+            self.assertEqual(provider_batch._client(job["providers"]["proxy"]).api_key, "proxy-key")
+
+        with self.assertRaises(ValueError):
+            provider_batch._client(job["providers"]["proxy"])
+
+    def test_unsupported_provider(self):
+        """Test that providers without a batch endpoint are rejected."""
+        models = {**self.models, "google": {"name": "gemini-test", "env_var": "GOOGLE_API_KEY"}}
+        with self.assertRaises(ValueError):
+            provider_batch.submit(providers=["google"], models=models, batch_dir=self.batch_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk re-evaluation module.
+"""
+
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from csv_store import CsvStore, discover_providers
+from columnar import ColumnarHistory, columnar_path
+from evaluator import RuleSet
+from reevaluate import apply_flips, reevaluate, score_answers, write_diff
+from drift import load_drift
+from summary import load_summary
+
+# Stricter rules under which "California" no longer counts
+STRICT_RULES = RuleSet("strict", accept=["mexico"], reject=["america*"])
+
+
+class TestReevaluate(unittest.TestCase):
+    """Test cases for re-scoring the history."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        store = CsvStore("test", data_dir=self.tmp.name)
+        store.upsert("2025-03-01", [{"answer": "The Gulf of Mexico.", "model": "m", "correct": True}])
+        store.upsert("2025-03-02", [{"answer": "Gulf of California", "model": "m", "correct": True}])
+        store.upsert("2025-03-03", [{"answer": "The Gulf of Mexico.", "model": "m", "correct": True}])
+
+    def test_score_answers_dedupes(self):
+        """Test that each distinct answer is scored once."""
+        verdicts = score_answers(["Gulf of Mexico", "Gulf of Mexico", "Gulf of America", ""])
+        self.assertEqual(verdicts, {"Gulf of Mexico": True, "Gulf of America": False, "": False})
+
+    def test_no_flips_with_current_rules(self):
+        """Test that the stored flags match the current rules."""
+        result = reevaluate(data_dir=self.tmp.name)
+
+        self.assertEqual(result["flips"], [])
+        self.assertEqual((result["rows"], result["distinct_answers"]), (3, 2))
+        self.assertEqual(discover_providers(self.tmp.name), ["test"])
+
+    def test_flips_diff_and_apply(self):
+        """Test that changed rules produce a diff and can be applied."""
+        result = reevaluate(rules=STRICT_RULES, data_dir=self.tmp.name)
+        self.assertEqual([(f["date"], f["old_correct"], f["new_correct"]) for f in result["flips"]],
+                         [("2025-03-02", "true", "false")])
+
+        diff_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(diff_dir.cleanup)
+        diff_path = os.path.join(diff_dir.name, "diff.csv")
+        write_diff(diff_path, result["flips"])
+        with open(diff_path, newline="", encoding="utf-8") as file:
+            self.assertEqual(len(list(csv.DictReader(file))), 1)
+
+        self.assertEqual(apply_flips(result, data_dir=self.tmp.name), ["test"])
+        rows = CsvStore("test", data_dir=self.tmp.name).read_rows()
+        self.assertEqual([r["correct"] for r in rows], ["true", "false", "true"])
+
+        with ColumnarHistory(columnar_path("test", self.tmp.name)) as history:
+            self.assertFalse(history.correct(1))
+        self.assertEqual(load_summary(self.tmp.name)["providers"]["test"]["correct"], 2)
+        self.assertEqual(load_drift(self.tmp.name)["providers"]["test"]["recent"]["correct"], 2)
+        self.assertEqual(reevaluate(rules=STRICT_RULES, data_dir=self.tmp.name)["flips"], [])
+
+    def test_failed_rewrite_is_rolled_back(self):
+        """Test that the CSVs are rewritten in a transaction and a failed write leaves them as they were."""
+        result = reevaluate(rules=STRICT_RULES, data_dir=self.tmp.name)
+        store = CsvStore("test", data_dir=self.tmp.name)
+        with open(store.csv_path, "rb") as file:
+            before = file.read()
+
+        replace_file = CsvStore._replace_file
+        calls = []
+
+        def failing_replace(store, data):
+            calls.append(data)
+            if len(calls) == 1:
+                with open(store.csv_path, "wb") as file:
+                    file.write(data[:10])
+                raise OSError("disk full")
+            replace_file(store, data)
+
+        with mock.patch.object(CsvStore, "_replace_file", failing_replace):
+            with self.assertRaises(OSError):
+                apply_flips(result, data_dir=self.tmp.name)
+
+        with open(store.csv_path, "rb") as file:
+            self.assertEqual(file.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the model resilience wrapper.
+"""
+
+import random
+import unittest
+from types import SimpleNamespace
+
+from models import resilience
+from models.resilience import (
+    CircuitBreaker, CircuitOpenError, backoff_delay, call_with_resilience,
+    is_retryable, retry_after, breaker_states, reset_breakers
+)
+
+
+class FakeAPIError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status and response headers."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    """Stand-in for an SDK connection error without a status code."""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(errors, result="ok"):
+    """Build a callable that raises the given errors in order, then returns result."""
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+class TestClassification(unittest.TestCase):
+    """Test cases for error classification and Retry-After parsing."""
+
+    def test_is_retryable(self):
+        """Test that rate limits, 5xx and connection errors are retryable."""
+        for status in (429, 500, 503, 529):
+            self.assertTrue(is_retryable(FakeAPIError(status)), status)
+        for status in (400, 401, 404):
+            self.assertFalse(is_retryable(FakeAPIError(status)), status)
+        self.assertTrue(is_retryable(APIConnectionError("reset")))
+        self.assertFalse(is_retryable(ValueError("bad")))
+
+    def test_retry_after(self):
+        """Test Retry-After in seconds, milliseconds and missing."""
+        self.assertEqual(retry_after(FakeAPIError(429, {"retry-after": "3"})), 3.0)
+        self.assertEqual(retry_after(FakeAPIError(429, {"retry-after-ms": "1500"})), 1.5)
+        self.assertIsNone(retry_after(FakeAPIError(429)))
+        self.assertIsNone(retry_after(ValueError("no response")))
+
+    def test_backoff_is_capped_and_jittered(self):
+        """Test that backoff never exceeds the cap."""
+        rng = random.Random(1)
+        delays = [backoff_delay(attempt, 1.0, 5.0, rng) for attempt in range(10)]
+        self.assertTrue(all(0 <= d <= 5.0 for d in delays))
+        self.assertLessEqual(backoff_delay(0, 1.0, 5.0, rng), 1.0)
+
+
+class TestCallWithResilience(unittest.TestCase):
+    """Test cases for call_with_resilience."""
+
+    def setUp(self):
+        reset_breakers()
+        self.addCleanup(reset_breakers)
+        self.sleeps = []
+
+    def test_retries_transient_errors(self):
+        """Test that transient errors are retried until success."""
+        fn = flaky([FakeAPIError(503), APIConnectionError("reset")])
+
+        self.assertEqual(call_with_resilience("p", fn, sleep=self.sleeps.append), "ok")
+        self.assertEqual(len(fn.calls), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertEqual(breaker_states()["p"]["failures"], 2)
+        self.assertEqual(breaker_states()["p"]["state"], "closed")
+
+    def test_honours_retry_after(self):
+        """Test that the Retry-After delay is used instead of backoff."""
+        fn = flaky([FakeAPIError(429, {"retry-after": "2"})])
+
+        call_with_resilience("p", fn, sleep=self.sleeps.append)
+        self.assertEqual(self.sleeps, [2.0])
+
+    def test_gives_up_on_long_retry_after(self):
+        """Test that an excessive Retry-After fails instead of waiting."""
+        fn = flaky([FakeAPIError(429, {"retry-after": str(resilience.MAX_RETRY_AFTER + 1)})])
+
+        with self.assertRaises(FakeAPIError):
+            call_with_resilience("p", fn, sleep=self.sleeps.append)
+        self.assertEqual(self.sleeps, [])
+
+    def test_non_retryable_errors_are_raised(self):
+        """Test that client errors are raised immediately."""
+        fn = flaky([FakeAPIError(401)])
+
+        with self.assertRaises(FakeAPIError):
+            call_with_resilience("p", fn, sleep=self.sleeps.append)
+        self.assertEqual(len(fn.calls), 1)
+        self.assertEqual(breaker_states()["p"]["failures"], 0)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised when attempts run out."""
+        fn = flaky([FakeAPIError(500)] * 10)
+
+        with self.assertRaises(FakeAPIError):
+            call_with_resilience("p", fn, max_attempts=3, sleep=self.sleeps.append)
+        self.assertEqual(len(fn.calls), 3)
+
+    def test_exhausted_call_opens_breaker(self):
+        """Test that a single call running out of attempts opens the breaker."""
+        fn = flaky([FakeAPIError(503)] * 10)
+
+        with self.assertRaises(FakeAPIError):
+            call_with_resilience("p", fn, sleep=self.sleeps.append)
+        self.assertEqual(len(fn.calls), resilience.MAX_ATTEMPTS)
+        self.assertEqual((breaker_states()["p"]["state"], breaker_states()["p"]["trips"]), ("open", 1))
+
+    def test_open_breaker_fails_fast(self):
+        """Test that an open breaker rejects calls without calling the provider."""
+        fn = flaky([FakeAPIError(500)] * 100)
+        for _ in range(3):
+            with self.assertRaises(Exception):
+                call_with_resilience("p", fn, sleep=self.sleeps.append)
+
+        calls = len(fn.calls)
+        with self.assertRaises(CircuitOpenError):
+            call_with_resilience("p", fn, sleep=self.sleeps.append)
+        self.assertEqual(len(fn.calls), calls)
+        self.assertEqual(breaker_states()["p"]["state"], "open")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the CircuitBreaker state machine."""
+
+    def test_open_half_open_closed(self):
+        """Test the breaker opens, lets one trial through after the timeout, then closes."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.state, "half_open")
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.snapshot()["trips"], 1)
+
+    def test_failed_trial_reopens(self):
+        """Test that a failed half-open trial re-opens the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.snapshot()["trips"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
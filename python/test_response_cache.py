@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the response cache module.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from response_cache import ResponseCache, cache_key, open_cache
+
+
+class TestCacheKey(unittest.TestCase):
+    """Test cases for cache_key."""
+
+    def test_key_depends_on_every_field(self):
+        """Test that changing any request parameter changes the key."""
+        base = ("openai", "gpt", "system", "question", 0.7)
+        keys = {cache_key(*base)}
+        for i, value in enumerate(["xai", "gpt-2", "other system", "other question", 0.2]):
+            changed = list(base)
+            changed[i] = value
+            keys.add(cache_key(*changed))
+
+        self.assertEqual(len(keys), 6)
+        self.assertEqual(cache_key(*base), cache_key(*base))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache", "responses.sqlite")
+
+    def open(self, **kwargs):
+        cache = ResponseCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_put_and_get(self):
+        """Test that stored responses survive reopening the cache."""
+        response = {"answer": "Golfo de México", "model": "gpt-1"}
+        self.open().put("k", "openai", response)
+
+        cache = self.open()
+        self.assertEqual(cache.get("k"), response)
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_expired_entries_are_ignored(self):
+        """Test that entries older than the TTL are misses."""
+        cache = self.open(ttl=-1)
+        cache.put("k", "openai", {"answer": "a", "model": "m"})
+
+        self.assertIsNone(cache.get("k"))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted past max_entries."""
+        cache = self.open(max_entries=2)
+        now = time.time()
+        with mock.patch("response_cache.time.time", side_effect=[now - 3, now - 2, now - 1, now]):
+            cache.put("a", "p", {"answer": "a"})
+            cache.put("b", "p", {"answer": "b"})
+            cache.get("a")
+            cache.put("c", "p", {"answer": "c"})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_refresh_skips_reads(self):
+        """Test that refresh mode never returns cached entries but still stores."""
+        self.open().put("k", "openai", {"answer": "old"})
+
+        cache = self.open(refresh=True)
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", "openai", {"answer": "new"})
+        self.assertEqual(self.open().get("k"), {"answer": "new"})
+
+    def test_clear_provider(self):
+        """Test clearing a single provider's entries."""
+        cache = self.open()
+        cache.put("a", "openai", {"answer": "a"})
+        cache.put("b", "xai", {"answer": "b"})
+        cache.clear("openai")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+
+    def test_open_cache_switches(self):
+        """Test the --no-cache/--refresh switches and RESPONSE_CACHE variable."""
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE": ""}):
+            self.assertIsNone(open_cache(no_cache=True, path=self.path))
+            cache = open_cache(refresh=True, path=self.path)
+            self.assertTrue(cache.refresh)
+            cache.close()
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE": "off"}):
+            self.assertIsNone(open_cache(path=self.path))
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE": "refresh"}):
+            cache = open_cache(path=self.path)
+            self.assertTrue(cache.refresh)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the run journal and resuming interrupted daily runs.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import generate_llm_responses
+import run_journal
+import update_csv
+from generate_llm_responses import generate
+from run_journal import open_journal
+
+MODELS = {
+    "openai": {"name": "gpt-test", "env_var": "OPENAI_API_KEY"},
+    "anthropic": {"name": "claude-test", "env_var": "ANTHROPIC_API_KEY"},
+    "#google": {"name": "gemini-test", "env_var": "GOOGLE_API_KEY"},
+}
+
+
+def result(llm, answer="Gulf of Mexico"):
+    return {"llm": llm, "model": f"{llm}-model", "answer": answer, "correct": True}
+
+
+class TestRunJournal(unittest.TestCase):
+    """Test cases for RunJournal."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+
+    def test_resume_after_torn_write(self):
+        """Test that a reopened journal keeps its date, responses and commits, ignoring a torn line."""
+        journal = open_journal("run", "2026-03-01", self.dir)
+        journal.record_response(result("openai"))
+        journal.record_response(result("openai", "Gulf of America"))  # Already logged, ignored
+        journal.record_commit("openai")
+        journal.record_response(result("anthropic"))
+        with open(journal.path, "a", encoding="utf-8") as file:
+            file.write('{"type": "response", "provider": "xai", "res')
+
+        resumed = open_journal("run", "2026-03-02", self.dir)
+        self.assertTrue(resumed.resumed)
+        self.assertEqual(resumed.date, "2026-03-01")
+        self.assertEqual(resumed.responses, {"openai": result("openai"), "anthropic": result("anthropic")})
+        self.assertEqual(resumed.committed, {"openai"})
+
+    def test_complete_journal_is_archived(self):
+        """Test that a finished run's journal is moved aside and the next run starts fresh."""
+        journal = open_journal("run", "2026-03-01", self.dir)
+        journal.record_response(result("openai"))
+        journal.record_commit("openai")
+        journal.mark_complete()
+
+        fresh = open_journal("run", "2026-03-02", self.dir)
+        self.assertFalse(fresh.resumed)
+        self.assertEqual((fresh.date, fresh.responses, fresh.committed), ("2026-03-02", {}, set()))
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "run.done.jsonl")))
+        with open(fresh.path, encoding="utf-8") as file:
+            self.assertEqual([json.loads(line)["type"] for line in file], ["start"])
+
+
+class TestResumedRun(unittest.TestCase):
+    """Test cases for update_csv_files() with a journal."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for patch in (mock.patch.object(run_journal, "JOURNAL_DIR", self.tmp.name),
+                      mock.patch.object(generate_llm_responses, "MODELS", MODELS),
+                      mock.patch.object(update_csv, "CsvStore"),
+                      mock.patch.object(update_csv, "CsvTransaction"),
+                      mock.patch.object(update_csv, "update_columnar"),
+                      mock.patch.object(update_csv, "update_summary"),
+                      mock.patch.object(update_csv, "build_stats"),
+                      mock.patch.object(update_csv, "load_summary", return_value={"providers": {}}),
+                      mock.patch.object(update_csv, "save_summary"),
+                      mock.patch.object(update_csv, "build_state"),
+                      mock.patch.object(update_csv, "update_drift", return_value=[]),
+                      mock.patch.object(update_csv, "load_drift", return_value={"providers": {}}),
+                      mock.patch.object(update_csv, "save_drift"),
+                      mock.patch.object(update_csv, "save_alerts"),
+                      mock.patch.object(update_csv, "load_clusters"),
+                      mock.patch.object(update_csv, "save_clusters")):
+            patch.start()
+            self.addCleanup(patch.stop)
+        update_csv.CsvTransaction.return_value.commit.return_value = {
+            "anthropic": {"action": "appended", "rows_before": 0}
+        }
+
+    def test_resume_only_redoes_missing_work(self):
+        """Test that answered providers aren't asked again and committed ones aren't rewritten."""
+        journal = open_journal("2026-03-01", "2026-03-01")
+        journal.record_response(result("openai"))
+        journal.record_commit("openai")
+
+        with mock.patch.object(generate_llm_responses, "generate", return_value=[result("anthropic")]) as gen:
+            stats = update_csv.update_csv_files(run_id="2026-03-01")
+
+        self.assertEqual(gen.call_args.kwargs["providers"], ["anthropic"])
+        update_csv.CsvTransaction.return_value.upsert.assert_called_once_with(
+            "anthropic", "2026-03-01", [result("anthropic")])
+        self.assertEqual(stats["journal"], {"run_id": "2026-03-01", "resumed": True,
+                                            "replayed": ["openai"], "skipped": ["openai"]})
+        self.assertEqual(stats["updated_count"], 1)
+
+        with open(journal.path, encoding="utf-8") as file:
+            entries = [json.loads(line) for line in file]
+        self.assertEqual([(e["type"], e.get("provider")) for e in entries[3:]],
+                         [("response", "anthropic"), ("commit", "anthropic"), ("complete", None)])
+
+    def test_generate_reports_results_as_they_arrive(self):
+        """Test generate()'s provider filter and on_result callback."""
+        answered = []
+        with mock.patch.object(generate_llm_responses, "get_model_response",
+                               return_value={"answer": "Gulf of Mexico", "model": "m"}):
+            for concurrent in (True, False):
+                answered.clear()
+                results = generate(concurrent=concurrent, providers=["anthropic", "#google"],
+                                   on_result=answered.append)
+                self.assertEqual([r["llm"] for r in results], ["anthropic"])
+                self.assertEqual(answered, results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the model catalogue and sharded runs.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import generate_llm_responses
+import update_csv
+from catalogue import load_catalogue
+from shards import parse_shard, read_partials, run_shard, select_shard
+
+MODELS = {
+    "openai": {"module": "openai_model", "name": "gpt-test", "env_var": "OPENAI_API_KEY"},
+    "#disabled": {"module": "openai_model", "name": "gpt-old", "env_var": "OPENAI_API_KEY"},
+    "anthropic": {"module": "anthropic_model", "name": "claude-test", "env_var": "ANTHROPIC_API_KEY"},
+    "local": {"backend": "http", "api": "openai", "base_url": "http://localhost:8000/v1",
+              "name": "llama-test", "env_var": "LOCAL_API_KEY"},
+}
+
+
+class TestCatalogue(unittest.TestCase):
+    """Test cases for loading the model catalogue."""
+
+    def write(self, catalogue):
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8")
+        self.addCleanup(os.remove, tmp.name)
+        with tmp:
+            json.dump(catalogue, tmp)
+        return tmp.name
+
+    def test_bundled_catalogue(self):
+        """Test that the shipped catalogue loads and keeps its order."""
+        catalogue = load_catalogue()
+        self.assertEqual([p for p in catalogue if not p.startswith("#")], ["openai", "anthropic", "google", "xai"])
+
+    def test_invalid_entries(self):
+        """Test that incomplete enabled entries are rejected and disabled ones are not."""
+        self.assertEqual(list(load_catalogue(self.write(MODELS))), list(MODELS))
+        with mock.patch.dict(os.environ, {"MODEL_CATALOGUE": self.write(MODELS)}):
+            self.assertIn("local", load_catalogue())
+
+        for entry in ({"module": "openai_model", "env_var": "KEY"},
+                      {"name": "model", "env_var": "KEY"},
+                      {"backend": "http", "name": "model", "env_var": "KEY"}):
+            with self.assertRaises(ValueError):
+                load_catalogue(self.write({"custom": entry}))
+        load_catalogue(self.write({"#custom": {"name": "model"}}))
+
+
+class TestShards(unittest.TestCase):
+    """Test cases for splitting the catalogue and merging partial results."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_select_shard(self):
+        """Test that every provider lands in exactly one shard."""
+        providers = [f"p{i}" for i in range(7)]
+        shards = [select_shard(providers, index, 3) for index in (1, 2, 3)]
+        self.assertEqual(shards, [["p0", "p3", "p6"], ["p1", "p4"], ["p2", "p5"]])
+        self.assertEqual(parse_shard("2/3"), (2, 3))
+        for value in ("0/3", "4/3", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_run_and_merge(self):
+        """Test that shards ask disjoint providers and the merge combines them."""
+        def process_provider(provider, model_info, *args):
+            return {"llm": provider, "model": model_info["name"], "answer": "Gulf of Mexico", "correct": True}
+
+        with mock.patch.object(generate_llm_responses, "MODELS", MODELS), \
+                mock.patch.object(generate_llm_responses, "process_provider", side_effect=process_provider):
+            first = run_shard(1, 3, self.tmp.name, date="2026-03-01")
+            second = run_shard(2, 3, os.path.join(self.tmp.name, "artifact"), date="2026-03-01")
+
+        self.assertEqual((first["providers"], second["providers"]), (["openai"], ["anthropic"]))
+        merged = read_partials(self.tmp.name)
+        self.assertEqual(merged["date"], "2026-03-01")
+        self.assertEqual([r["llm"] for r in merged["results"]], ["openai", "anthropic"])
+        self.assertEqual(merged["missing"], [3])
+
+        with open(os.path.join(self.tmp.name, "shard-3-of-3.json"), "w", encoding="utf-8") as file:
+            json.dump({"date": "2026-03-02", "shard": [3, 3], "providers": [], "results": []}, file)
+        with self.assertRaises(ValueError):
+            read_partials(self.tmp.name)
+
+    def test_shard_date_from_command_line(self):
+        """Test that --date is written to the partial file instead of today's date."""
+        def process_provider(provider, model_info, *args):
+            return {"llm": provider, "model": model_info["name"], "answer": "Gulf of Mexico", "correct": True}
+
+        argv = ["update_csv.py", "--shard", "1/1", "--partial-dir", self.tmp.name, "--date", "2026-03-01",
+                "--no-cache"]
+        with mock.patch.object(generate_llm_responses, "MODELS", MODELS), \
+                mock.patch.object(generate_llm_responses, "process_provider", side_effect=process_provider), \
+                mock.patch("sys.argv", argv):
+            update_csv.main()
+
+        self.assertEqual(read_partials(self.tmp.name)["date"], "2026-03-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
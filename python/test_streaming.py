@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming responses and early exit.
+"""
+
+import os
+import types
+import unittest
+from unittest import mock
+
+import generate_llm_responses
+from evaluator import early_verdict
+from generate_llm_responses import generate
+from models.streaming import stream_chat
+from response_cache import ResponseCache
+
+
+class FakeChat:
+    """Stand-in for a LangChain chat client whose stream() yields the given pieces."""
+
+    def __init__(self, pieces, model_name="fake-model-resolved"):
+        self.pieces = pieces
+        self.model_name = model_name
+        self.sent = 0
+        self.closed = False
+
+    def stream(self, messages):
+        try:
+            for piece in self.pieces:
+                self.sent += 1
+                yield types.SimpleNamespace(content=piece, response_metadata={})
+            self.sent += 1
+            yield types.SimpleNamespace(content="", response_metadata={"model_name": self.model_name})
+        finally:
+            self.closed = True
+
+
+def streaming_module(pieces):
+    """Build a stand-in model module whose ask_stream() streams from a FakeChat."""
+    def ask_stream(model, system_prompt, prompt, stop_when=None):
+        streamed = stream_chat(FakeChat(pieces), [], stop_when)
+        timings = {key: streamed[key] for key in ("ttft", "latency", "stopped_early")}
+        return streamed["answer"], streamed["model_name"] or model, timings
+    return types.SimpleNamespace(ask_stream=ask_stream)
+
+
+class TestStreamChat(unittest.TestCase):
+    """Test cases for stream_chat."""
+
+    def test_collects_the_whole_stream(self):
+        """Test that the pieces, model name and timings are collected."""
+        chat = FakeChat(["The Gulf ", "of Mexico", "."])
+        streamed = stream_chat(chat, [])
+
+        self.assertEqual(streamed["answer"], "The Gulf of Mexico.")
+        self.assertEqual(streamed["model_name"], "fake-model-resolved")
+        self.assertFalse(streamed["stopped_early"])
+        self.assertLessEqual(streamed["ttft"], streamed["latency"])
+        self.assertTrue(chat.closed)
+
+    def test_stops_early(self):
+        """Test that the stream is closed once stop_when returns a verdict."""
+        chat = FakeChat(["The Gulf ", "of Mexico", ".", " It is also", " called the Gulf of America", "."])
+        streamed = stream_chat(chat, [], early_verdict)
+
+        self.assertEqual(streamed["answer"], "The Gulf of Mexico. It is also called the Gulf of America")
+        self.assertTrue(streamed["stopped_early"])
+        self.assertIsNone(streamed["model_name"])
+        self.assertEqual(chat.sent, 5)
+        self.assertTrue(chat.closed)
+
+    def test_accept_term_does_not_stop(self):
+        """Test that a correct answer is streamed to the end, so its verdict can't change."""
+        chat = FakeChat(["The Gulf ", "of Mexico", ".", " It borders", " the United States."])
+        streamed = stream_chat(chat, [], early_verdict)
+
+        self.assertEqual(streamed["answer"], "The Gulf of Mexico. It borders the United States.")
+        self.assertFalse(streamed["stopped_early"])
+
+    def test_reject_stops_immediately(self):
+        """Test that a reject term ends the stream without waiting for the sentence."""
+        chat = FakeChat(["Gulf of ", "America", " (formerly", " Gulf of Mexico)."])
+        streamed = stream_chat(chat, [], early_verdict)
+
+        self.assertEqual(streamed["answer"], "Gulf of America")
+        self.assertEqual(chat.sent, 2)
+
+
+class TestGenerateStreaming(unittest.TestCase):
+    """Test cases for generate() in streaming mode."""
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"FAKE_API_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def models(self, pieces):
+        return {"fake": {"module": streaming_module(pieces), "name": "fake-model", "env_var": "FAKE_API_KEY"}}
+
+    def test_streaming_results_include_timings(self):
+        """Test that streamed results carry their timings and are evaluated."""
+        with mock.patch.object(generate_llm_responses, "MODELS", self.models(["Gulf of Mexico", "."])):
+            results = generate(stream=True)
+
+        self.assertEqual(results[0]["answer"], "Gulf of Mexico.")
+        self.assertEqual(results[0]["model"], "fake-model-resolved")
+        self.assertTrue(results[0]["correct"])
+        self.assertFalse(results[0]["stopped_early"])
+        self.assertIsNotNone(results[0]["ttft"])
+
+    def test_early_exit_answers_are_not_cached(self):
+        """Test that a stream cut short doesn't end up in the response cache."""
+        cache = ResponseCache(":memory:")
+        self.addCleanup(cache.close)
+        models = self.models(["Gulf of America", ".", " More text."])
+        with mock.patch.object(generate_llm_responses, "MODELS", models):
+            results = generate(cache=cache, stream=True, early_exit=True)
+
+        # The stored answer is marked as cut short, and scored like the full answer would be
+        self.assertEqual(results[0]["answer"], "Gulf of America […]")
+        self.assertFalse(results[0]["correct"])
+        self.assertEqual(results[0]["model"], "fake-model")
+        self.assertTrue(results[0]["stopped_early"])
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the aggregate summary module.
+"""
+
+import tempfile
+import unittest
+
+from csv_store import CsvStore
+from summary import apply_date, build_stats, empty_stats, load_summary, save_summary, update_summary
+
+
+def row(answer="Gulf of Mexico", model="m1", correct=True):
+    return {"answer": answer, "model": model, "correct": correct}
+
+
+class TestAggregates(unittest.TestCase):
+    """Test cases for folding rows into a provider aggregate."""
+
+    def test_accuracy_streaks_and_changes(self):
+        """Test running accuracy, streaks and change detection."""
+        stats = empty_stats()
+        stats = apply_date(stats, "2025-03-01", [row()])
+        stats = apply_date(stats, "2025-03-02", [row()])
+        stats = apply_date(stats, "2025-03-03", [row("Gulf of America", correct=False)])
+        stats = apply_date(stats, "2025-03-04", [row("Gulf of Mexico", model="m2")])
+
+        self.assertEqual((stats["rows"], stats["correct"], stats["accuracy"]), (4, 3, 0.75))
+        self.assertEqual((stats["current_streak"], stats["longest_streak"]), (1, 2))
+        self.assertEqual(stats["models"]["m1"]["accuracy"], round(2 / 3, 4))
+        self.assertEqual(stats["models"]["m2"]["first_date"], "2025-03-04")
+        self.assertEqual([(c["date"], c["kind"]) for c in stats["changes"]], [
+            ("2025-03-03", "answer"), ("2025-03-04", "answer"), ("2025-03-04", "model")
+        ])
+
+    def test_same_day_rerun_replaces_rows(self):
+        """Test that applying the last date again replaces its contribution."""
+        stats = apply_date(empty_stats(), "2025-03-01", [row()])
+        stats = apply_date(stats, "2025-03-02", [row("Gulf of America", model="m2", correct=False)])
+        stats = apply_date(stats, "2025-03-02", [row()])
+
+        expected = build_stats([{"date": "2025-03-01", **row()}, {"date": "2025-03-02", **row()}])
+        self.assertEqual(stats, expected)
+        self.assertNotIn("m2", stats["models"])
+        self.assertEqual(stats["changes"], [])
+
+    def test_older_date_is_rejected(self):
+        """Test that an out-of-order date can't be applied incrementally."""
+        stats = apply_date(empty_stats(), "2025-03-02", [row()])
+        with self.assertRaises(ValueError):
+            apply_date(stats, "2025-03-01", [row()])
+
+    def test_incremental_matches_rebuild(self):
+        """Test that incremental updates give the same result as a full rebuild."""
+        history = [
+            ("2025-03-01", [row(), row()]),
+            ("2025-03-02", [row("The Gulf of Mexico.")]),
+            ("2025-03-03", [row("Gulf of America", correct=False), row()]),
+        ]
+        stats = empty_stats()
+        flat = []
+        for date, rows in history:
+            stats = apply_date(stats, date, rows)
+            flat.extend({"date": date, **r} for r in rows)
+
+        self.assertEqual(stats, build_stats(flat))
+
+
+class TestUpdateSummary(unittest.TestCase):
+    """Test cases for update_summary against the CSV files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_missing_or_stale_provider_is_rebuilt(self):
+        """Test that an aggregate out of sync with the CSV is rebuilt from it."""
+        store = CsvStore("test", data_dir=self.tmp.name)
+        store.upsert("2025-03-01", [row()])
+        store.upsert("2025-03-02", [row(correct=False)])
+
+        summary = load_summary(self.tmp.name)
+        action = update_summary(summary, "test", "2025-03-02", [row(correct=False)],
+                                expected_rows=1, data_dir=self.tmp.name)
+        self.assertEqual(action, "rebuilt")
+        self.assertEqual(summary["providers"]["test"]["rows"], 2)
+
+        store.upsert("2025-03-03", [row()])
+        action = update_summary(summary, "test", "2025-03-03", [row()], expected_rows=2, data_dir=self.tmp.name)
+        self.assertEqual(action, "updated")
+
+        save_summary(summary, self.tmp.name)
+        reloaded = load_summary(self.tmp.name)["providers"]["test"]
+        self.assertEqual((reloaded["rows"], reloaded["current_streak"]), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
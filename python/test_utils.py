@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the response utilities.
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from benchmark_content import run
+from utils import ensure_string
+
+
+class TestEnsureString(unittest.TestCase):
+    """Test cases for ensure_string."""
+
+    def test_plain_values(self):
+        """Test strings, empty content and scalars."""
+        self.assertEqual(ensure_string("Gulf of Mexico"), "Gulf of Mexico")
+        self.assertEqual(ensure_string(None), "")
+        self.assertEqual(ensure_string([]), "")
+        self.assertEqual(ensure_string(42), "42")
+
+    def test_skips_reasoning_tool_and_media_blocks(self):
+        """Test that only text blocks contribute to the answer."""
+        content = [
+            {"type": "thinking", "thinking": "The user asks about a gulf..."},
+            {"type": "reasoning", "summary": [{"type": "summary_text", "text": "hidden"}]},
+            {"type": "tool_use", "id": "t1", "name": "search", "input": {"q": "gulf"}},
+            {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            {"text": "hidden", "thought": True},
+            {"type": "text", "text": "Gulf of "},
+            "Mexico",
+            SimpleNamespace(type="thinking", thinking="hidden"),
+            SimpleNamespace(type="text", text="."),
+        ]
+        self.assertEqual(ensure_string(content), "Gulf of Mexico.")
+
+    def test_nested_blocks(self):
+        """Test that nested content lists are flattened."""
+        content = [
+            {"type": "message", "content": [{"type": "text", "text": "Gulf "}, ["of ", {"text": "Mexico"}]]},
+            SimpleNamespace(content=[{"type": "tool_result", "content": "hidden"}, " (Golfo de México)"]),
+            {"type": ["unhashable"], "text": "!"},
+        ]
+        self.assertEqual(ensure_string(content), "Gulf of Mexico (Golfo de México)!")
+
+    def test_unknown_objects_are_stringified(self):
+        """Test the fallback for blocks without text or content."""
+        self.assertEqual(ensure_string([SimpleNamespace(value=1)]), "namespace(value=1)")
+        self.assertEqual(ensure_string(({"type": "text", "text": "a"}, {"type": "text", "text": None})), "a")
+
+    def test_micro_benchmark_runs(self):
+        """Test that the micro-benchmark covers every case and agrees on flat content."""
+        rows = run(blocks=8, repeat=1, number=1)
+        self.assertEqual([row["case"] for row in rows],
+                         ["string", "thinking + text", "dict blocks", "object blocks", "nested"])
+        self.assertTrue(all(row["same"] for row in rows[:4]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,20 +4,39 @@ CSV Updater for LLM Responses
 
 This script:
 1. Uses generate_llm_responses.py to get responses from all LLMs
-2. Updates the corresponding CSV files in public/data/ with today's results
+2. Updates the corresponding CSV files in public/data/ with today's results, all in one transaction
 3. Outputs information about the update process
 """
 
-import os
-import json
-import csv
+import argparse
 import time
 from datetime import datetime
 import generate_llm_responses
+from csv_store import CsvStore, CsvTransaction
+from canonical import load_clusters, save_clusters
+from columnar import update_columnar
+from drift import build_state, format_alert, load_drift, save_alerts, save_drift, update_drift
+from summary import build_stats, load_summary, save_summary, update_summary
+from models.clients import close_clients
+from models.instrumentation import request_records, summarize_records, to_openmetrics, write_jsonl
+from models.resilience import breaker_states
+from response_cache import open_cache
+from run_journal import open_journal
+from shards import parse_shard, read_partials, run_shard
 
-def update_csv_files():
+def update_csv_files(cache=None, stream=False, early_exit=False, run_id=None, journal=True, date=None,
+                     results=None):
     """
     Update CSV files with today's LLM responses.
+
+    Args:
+        cache: Optional ResponseCache so reruns on the same day don't re-query providers
+        stream: Stream the responses and report time-to-first-token per provider
+        early_exit: Stop each stream once the evaluator has a verdict
+        run_id: Id of the run journal (defaults to today's date, so a rerun the same day resumes)
+        journal: Keep a run journal, so an interrupted run picks up where it stopped
+        date: The date to write rows for (defaults to today)
+        results: Results to commit instead of asking the providers (e.g. merged shard results)
     
     Returns:
         Dict containing update statistics
@@ -25,10 +44,22 @@ def update_csv_files():
     start_time = time.time()
     
     # Get today's date in YYYY-MM-DD format
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    # Get LLM responses
-    results = generate_llm_responses.generate()
+    today = date or datetime.now().strftime("%Y-%m-%d")
+
+    # Resume an interrupted run: keep its date, replay its responses and skip what it already wrote
+    run = open_journal(run_id or today, today) if journal else None
+    replayed = dict(run.responses) if run else {}
+    committed = set(run.committed) if run else set()
+    if run:
+        today = run.date
+
+    # Get LLM responses from the providers that haven't answered yet
+    if results is None:
+        todo = [provider for provider in generate_llm_responses.MODELS
+                if not provider.startswith("#") and provider not in replayed]
+        results = generate_llm_responses.generate(cache=cache, stream=stream, early_exit=early_exit,
+                                                  providers=todo,
+                                                  on_result=run.record_response if run else None)
     
     # Initialize statistics
     stats = {
@@ -36,66 +67,202 @@ def update_csv_files():
         "updated_count": 0,
         "models": []
     }
+    if run:
+        stats["journal"] = {
+            "run_id": run.run_id,
+            "resumed": run.resumed,
+            "replayed": sorted(replayed),
+            "skipped": sorted(committed)
+        }
     
-    # Process each result
-    for result in results:
+    # Group the rows by provider (generate() returns one result per provider), in MODELS order
+    by_provider = {**replayed, **{result["llm"]: result for result in results}}
+    rows_by_llm = {}
+    for provider in generate_llm_responses.MODELS:
+        result = by_provider.get(provider)
         # Skip error results if any (though generate() defaults to not including them)
-        if "error" in result:
+        if result is None or "error" in result:
             continue
+        rows_by_llm.setdefault(result["llm"], []).append(result)
+
+    summary = load_summary()
+    drift = load_drift()
+    clusters = load_clusters()
+    alerts = []
+
+    # Buffer today's rows and write every CSV together (rerunning on the same day replaces them)
+    transaction = CsvTransaction()
+    for llm, rows in rows_by_llm.items():
+        if llm in committed:
+            # Written before the interruption; the summary may have been saved before that write
+            history = CsvStore(llm).read_rows()
+            summary["providers"][llm] = build_stats(history)
+            drift["providers"][llm] = build_state(history, clusters, llm)
+            continue
+        if run:
+            # Write-ahead: the response is in the journal before the CSV changes
+            for row in rows:
+                run.record_response(row)
+        transaction.upsert(llm, today, rows)
+    written = transaction.commit()
+
+    for llm, commit in written.items():
+        rows = rows_by_llm[llm]
+
+        # Keep the columnar copy of the history in sync for analytics
+        update_columnar(llm, today, rows, expected_rows=commit["rows_before"], clusters=clusters)
+
+        # Fold the new rows into the precomputed aggregates
+        update_summary(summary, llm, today, rows, expected_rows=commit["rows_before"])
+
+        # Watch for answer, accuracy and model version changes
+        alerts.extend(update_drift(drift, clusters, llm, today, rows, expected_rows=commit["rows_before"]))
+        if run:
+            run.record_commit(llm)
 
-        llm = result["llm"]
-        model = result["model"]
-        answer = result["answer"]
-        correct = result["correct"]
-        
-        # Define the CSV file path
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                               "public", "data", f"{llm}.csv")
-        
-        # Check if file exists
-        file_exists = os.path.isfile(csv_path)
-        
-        # Open the CSV file in append mode
-        with open(csv_path, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            
-            # Write header if file doesn't exist
-            if not file_exists:
-                writer.writerow(["date", "answer", "model", "correct"])
-            
-            # Write the new row
-            writer.writerow([today, answer, model, str(correct).lower()])
-        
         # Update statistics
         stats["updated_count"] += 1
-        stats["models"].append({
-            "llm": llm,
-            "model": model,
-            "correct": correct
-        })
+        for row in rows:
+            model_stats = {
+                "llm": llm,
+                "model": row["model"],
+                "correct": row["correct"]
+            }
+            for key in ("ttft", "latency", "stopped_early"):
+                if key in row:
+                    model_stats[key] = row[key]
+            stats["models"].append(model_stats)
+
+    if rows_by_llm:
+        save_summary(summary)
+        save_drift(drift)
+        save_clusters(clusters)
+    save_alerts(today, alerts)
+    stats["alerts"] = alerts
+    if run:
+        run.mark_complete()
     
     # Calculate execution time
     execution_time = time.time() - start_time
     stats["execution_time"] = round(execution_time, 2)
+
+    # Record how each provider's circuit breaker ended the run
+    stats["circuit_breakers"] = breaker_states()
+
+    if cache is not None:
+        stats["cache"] = cache.stats()
+
+    # Per-provider latency, token and cost totals for this run's requests
+    stats["requests"] = summarize_records(request_records())
     
     return stats
 
+def write_metrics(path, metrics_format="jsonl"):
+    """
+    Write this run's per-request measurements.
+
+    Args:
+        path: File to write; JSON lines are appended so the file keeps the history across runs,
+            OpenMetrics text is overwritten (e.g. for a Prometheus textfile collector)
+        metrics_format: "jsonl" or "openmetrics"
+    """
+    records = request_records()
+    if metrics_format == "openmetrics":
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(to_openmetrics(records))
+    else:
+        write_jsonl(path, records)
+
 def main():
     """Main function to run the script."""
+    parser = argparse.ArgumentParser(description="Update the CSV files with today's LLM responses")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the response cache")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached responses but store the new ones")
+    parser.add_argument("--stream", action="store_true", help="Stream the responses and report time-to-first-token")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="With --stream, stop each response as soon as the evaluator has a verdict")
+    parser.add_argument("--metrics", help="Write per-request latency, token and cost measurements to this file")
+    parser.add_argument("--metrics-format", choices=["jsonl", "openmetrics"], default="jsonl",
+                        help="Format of the --metrics file (default: jsonl)")
+    parser.add_argument("--run-id", help="Run journal id (defaults to today's date, so a rerun resumes)")
+    parser.add_argument("--no-journal", action="store_true", help="Don't keep a run journal")
+    parser.add_argument("--shard", type=parse_shard, metavar="INDEX/COUNT",
+                        help="Only ask this shard of the providers (e.g. 2/4) and write a partial result file")
+    parser.add_argument("--partial-dir", default="partial", help="Directory for --shard's partial results")
+    parser.add_argument("--merge", metavar="DIR", help="Commit the partial results in DIR instead of asking")
+    parser.add_argument("--date", help="Date to write the rows for, YYYY-MM-DD (defaults to today; give every "
+                                       "shard the same date so a run crossing midnight still merges)")
+    args = parser.parse_args()
+
+    cache = open_cache(no_cache=args.no_cache, refresh=args.refresh)
+
     try:
+        if args.shard:
+            # Ask this shard's providers; the merge step writes the CSV files
+            partial = run_shard(*args.shard, args.partial_dir, cache, stream=args.stream,
+                                early_exit=args.early_exit, date=args.date)
+            answered = [result["llm"] for result in partial["results"]]
+            if args.metrics:
+                write_metrics(args.metrics, args.metrics_format)
+            return (f"Shard {args.shard[0]}/{args.shard[1]} ({partial['date']}): "
+                    f"{len(answered)}/{len(partial['providers'])} providers answered ({', '.join(answered)})")
+
+        merged = None
+        if args.merge:
+            merged = read_partials(args.merge)
+
         # Update CSV files
-        stats = update_csv_files()
+        stats = update_csv_files(cache, stream=args.stream, early_exit=args.early_exit,
+                                 run_id=args.run_id, journal=not args.no_journal,
+                                 date=merged["date"] if merged else args.date,
+                                 results=merged["results"] if merged else None)
+        if args.metrics:
+            write_metrics(args.metrics, args.metrics_format)
         
         # Print update information
         print(f"\n===== CSV Update Summary ({stats['date']}) =====")
         print(f"Updated {stats['updated_count']} CSV files")
         print(f"Execution time: {stats['execution_time']} seconds")
+        if "cache" in stats:
+            print(f"Response cache: {stats['cache']['hits']} hits, {stats['cache']['misses']} misses")
+        if merged and merged["missing"]:
+            print(f"Missing partial results from shards {', '.join(map(str, merged['missing']))}")
+        if stats.get("journal", {}).get("resumed"):
+            journal = stats["journal"]
+            print(f"Resumed run {journal['run_id']}: replayed {', '.join(journal['replayed']) or 'none'}, "
+                  f"skipped {', '.join(journal['skipped']) or 'none'}")
         
+        if stats["alerts"]:
+            print("\nAlerts:")
+            for alert in stats["alerts"]:
+                print(f"  {format_alert(alert)}")
+
         # Print model-specific information
         print("\nModel details:")
         for model_info in stats["models"]:
             correct_status = "✓" if model_info["correct"] else "✗"
-            print(f"  {model_info['llm']} ({model_info['model']}): {correct_status}")
+            timing = ""
+            if model_info.get("ttft") is not None:
+                timing = f" [ttft {model_info['ttft']:.2f}s, total {model_info['latency']:.2f}s"
+                timing += ", stopped early]" if model_info.get("stopped_early") else "]"
+            print(f"  {model_info['llm']} ({model_info['model']}): {correct_status}{timing}")
+
+        # Print request measurements
+        if stats["requests"]:
+            print("\nRequests:")
+            for llm, request in stats["requests"].items():
+                cost = f"${request['cost']:.6f}" if request["cost"] is not None else "n/a"
+                print(f"  {llm}: {request['wall']:.2f}s wall ({request['invoke']:.2f}s in provider calls, "
+                      f"{request['attempts']} attempts), {request['input_tokens']} in / "
+                      f"{request['output_tokens']} out tokens, cost {cost}")
+
+        # Print circuit breaker information for providers that had trouble
+        troubled = {llm: b for llm, b in stats["circuit_breakers"].items() if b["failures"] or b["rejected"]}
+        if troubled:
+            print("\nCircuit breakers:")
+            for llm, breaker in troubled.items():
+                print(f"  {llm}: {breaker['state']} ({breaker['failures']} failures, "
+                      f"{breaker['rejected']} rejected, {breaker['trips']} trips)")
         
         # Return a summary message for commit message
         return (f"Updated {stats['updated_count']} LLM responses on {stats['date']} "
@@ -105,6 +272,12 @@ def main():
         print(f"Error updating CSV files: {e}")
         return f"Error updating CSV files: {e}"
 
+    finally:
+        # Release pooled HTTP connections held by the cached chat clients
+        close_clients()
+        if cache is not None:
+            cache.close()
+
 if __name__ == "__main__":
     result_message = main()
     print(f"\nResult: {result_message}")
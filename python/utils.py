@@ -3,12 +3,114 @@
 Utility functions for LLM response processing.
 """
 
-from typing import Any
+from typing import Any, Callable, Dict, Optional
+
+# Content block types that never hold answer text: reasoning, tool calls and media
+SKIPPED_BLOCK_TYPES = frozenset({
+    "thinking", "redacted_thinking", "reasoning",
+    "tool_use", "server_tool_use", "tool_call", "tool_call_chunk", "function_call", "tool_result",
+    "web_search_tool_result", "image", "image_url", "input_image", "audio", "input_audio",
+    "file", "document", "media",
+})
+
+
+def _untyped_block(block: Dict[str, Any]) -> str:
+    # Gemini marks thought summaries with "thought" instead of a block type
+    if block.get("thought"):
+        return ""
+    text = block.get("text")
+    if isinstance(text, str):
+        return text
+    content = block.get("content")
+    if isinstance(content, (list, tuple)):
+        return _join(content)
+    return content if isinstance(content, str) else ""
+
+
+def _dict_text(block: Dict[str, Any]) -> str:
+    try:
+        field = _TEXT_FIELDS.get(block.get("type"), _UNTYPED)
+    except TypeError:  # An unhashable "type"
+        field = _UNTYPED
+    if field is _UNTYPED:
+        return _untyped_block(block)
+    if field is None:
+        return ""
+    text = block.get(field)
+    return text if isinstance(text, str) else ""
+
+
+def _object_text(block: Any) -> str:
+    kind = getattr(block, "type", None)
+    if isinstance(kind, str) and kind in SKIPPED_BLOCK_TYPES:
+        return ""
+    text = getattr(block, "text", None)
+    if isinstance(text, str):
+        return text
+    content = getattr(block, "content", None)
+    if content is not None:
+        return _join(content) if isinstance(content, (list, tuple)) else str(content)
+    return str(block)
+
+
+def _extractor_for(cls: type) -> Callable[[Any], str]:
+    for base, extractor in ((str, str), (dict, _dict_text), (list, _join), (tuple, _join)):
+        if issubclass(cls, base):
+            return extractor
+    return _object_text
+
+
+# Key holding the text per dict block "type" (None: skip the block);
+# blocks with other types or none are handled by _untyped_block
+_UNTYPED = object()
+_TEXT_FIELDS: Dict[Any, Optional[str]] = {
+    **{kind: None for kind in SKIPPED_BLOCK_TYPES},
+    "text": "text",
+    "output_text": "text",
+}
+
+# Text extractor per block class, filled in the first time a class is seen
+_EXTRACTORS: Dict[type, Callable[[Any], str]] = {}
+
+
+def _join(blocks: Any) -> str:
+    text_fields = _TEXT_FIELDS
+    extractors = _EXTRACTORS
+    parts = []
+    for block in blocks:
+        cls = block.__class__
+        # Plain strings and text/skipped dict blocks are the bulk of real responses,
+        # so they are handled inline; everything else goes through the class table
+        if cls is str:
+            parts.append(block)
+            continue
+        if cls is dict:
+            try:
+                field = text_fields.get(block.get("type"), _UNTYPED)
+            except TypeError:
+                field = _UNTYPED
+            if field is None:
+                continue
+            if field is not _UNTYPED:
+                text = block.get(field)
+                if text.__class__ is str:
+                    parts.append(text)
+                continue
+        extractor = extractors.get(cls)
+        if extractor is None:
+            extractor = extractors[cls] = _extractor_for(cls)
+        parts.append(extractor(block))
+    return "".join(parts)
+
 
 def ensure_string(content: Any) -> str:
     """
     Robustly convert LLM content (string, list of blocks, etc.) into a single string.
 
+    Blocks are dispatched on their class through a lookup table. Text is taken from
+    "text", nested "content" is flattened, and reasoning, tool-use and media blocks
+    (SKIPPED_BLOCK_TYPES) are dropped without being stringified.
+
     Args:
         content: The content to convert
 
@@ -22,21 +124,6 @@ def ensure_string(content: Any) -> str:
         return content
 
     if isinstance(content, (list, tuple)):
-        parts = []
-        for block in content:
-            if isinstance(block, str):
-                parts.append(block)
-            elif isinstance(block, dict):
-                # Handle dictionary blocks, common in some providers
-                parts.append(block.get("text", ""))
-            elif hasattr(block, "text"):
-                # Handle object blocks with a .text attribute
-                parts.append(block.text)
-            elif hasattr(block, "content"):
-                # Handle object blocks with a .content attribute
-                parts.append(block.content)
-            else:
-                parts.append(str(block))
-        return "".join(parts)
+        return _join(content)
 
     return str(content)